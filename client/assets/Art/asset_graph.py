@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+素材依赖图
+汇总各生成脚本通过 asset_jobs() 声明的素材任务，并为每个任务计算指纹，
+供监听构建等工具判断哪些素材需要重新生成
+
+任务字典字段:
+  path       输出路径（相对 Art 目录）
+  category   素材类别（ui / cats / items / scenes / preview / placeholders）
+  name, size 素材名与边长
+  func, args 模块内渲染函数名与参数，渲染函数返回 PIL.Image 或 PNG 字节
+  overwrite  为 False 时只在目标不存在时生成（占位图）
+  strip_func 可选，按行条带渲染的函数名（参数为 args + (y0, y1)），配合 mode 支持流式写出
+  overrides  为 True 时替换其他模块声明的同一路径（如九宫格替换占位图）；其余路径冲突均报错
+  atlas      为 False 时流水线不将其打入图集（如自带帧布局的 SDF 图集）
+  module     所属生成模块，由 build_asset_graph() 填入
+"""
+
+import importlib.util
+import json
+import sys
+import types
+from functools import lru_cache
+from pathlib import Path
+
+ART_DIR = Path(__file__).resolve().parent
+CONFIG_FILE = ART_DIR / 'art_config.json'
+
+# 参与依赖图的生成模块（模块名 -> 源文件）
+GENERATOR_MODULES = {
+    'generate_assets': ART_DIR / 'generate_assets.py',
+    'create_demo_assets': ART_DIR / 'create_demo_assets.py',
+    'generate_placeholder_assets': ART_DIR.parents[2] / 'scripts' / 'generate_placeholder_assets.py',
+    'nine_slice': ART_DIR / 'nine_slice.py',
+    'button_states': ART_DIR / 'button_states.py',
+    'localized_assets': ART_DIR / 'localized_assets.py',
+    'tileable_textures': ART_DIR / 'tileable_textures.py',
+    'fooocus_queue': ART_DIR / 'fooocus_queue.py',
+}
+
+# 参与流水线与分片构建的生成模块（演示素材依赖外部转换工具，不纳入）
+BUILD_MODULES = [name for name in GENERATOR_MODULES if name != 'create_demo_assets']
+
+def load_config(path=CONFIG_FILE):
+    """加载 art_config.json"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_generator(name, reload=False):
+    """按源文件加载生成模块；reload=True 时重新执行模块代码"""
+    module = sys.modules.get(name)
+    if module is not None and not reload:
+        return module
+
+    spec = importlib.util.spec_from_file_location(name, GENERATOR_MODULES[name])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[name] = module
+    return module
+
+def build_asset_graph(config, modules):
+    """返回 {素材路径: 任务} 字典，路径相对 Art 目录；结果与模块顺序无关"""
+    graph = {}
+    for name, module in modules.items():
+        for job in module.asset_jobs(config):
+            job['module'] = name
+            existing = graph.get(job['path'])
+            if existing is not None:
+                # 恰好一方声明 overrides 时由它替换另一方，否则无法判断归属
+                if bool(job.get('overrides')) == bool(existing.get('overrides')):
+                    raise ValueError(f"素材 {job['path']} 同时由 {existing['module']} 与 {name} 生成，"
+                                     f"需由其中一方声明 overrides")
+                if existing.get('overrides'):
+                    continue
+            graph[job['path']] = job
+    return graph
+
+def asset_key(job):
+    """与尺寸无关的素材键：目录 + 素材名，如 UI/gold_coin/gold_coin"""
+    return f"{Path(job['path']).parent.as_posix()}/{job['name']}"
+
+def _code_bytes(code):
+    """代码对象的稳定摘要输入（不含行号，移动函数位置不会改变结果）"""
+    parts = [code.co_code, repr(code.co_names).encode('utf-8')]
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            parts.append(_code_bytes(const))
+        else:
+            parts.append(repr(const).encode('utf-8'))
+    return b'\0'.join(parts)
+
+def _referenced_names(code):
+    """代码对象（含嵌套函数）引用的全局名称"""
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names.extend(_referenced_names(const))
+    return names
+
+def _local_module_file(value):
+    """Art 目录下的模块（或其中定义的函数/类）的源文件，其他对象为 None"""
+    if not isinstance(value, types.ModuleType):
+        value = sys.modules.get(getattr(value, '__module__', None) or '')
+    path = getattr(value, '__file__', None)
+    if not path:
+        return None
+    path = Path(path).resolve()
+    return path if path.parent == ART_DIR else None
+
+@lru_cache(maxsize=None)
+def _source_digest(path, mtime_ns, size):
+    """源文件的摘要与其导入的 Art 目录模块（含函数内的延迟导入）；按 mtime/大小缓存"""
+    import ast
+    import hashlib
+    source = Path(path).read_bytes()
+    imports = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            imports.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            imports.add(node.module.split('.')[0])
+    local = tuple(sorted(str(ART_DIR / f'{name}.py') for name in imports if (ART_DIR / f'{name}.py').is_file()))
+    return hashlib.sha1(source).hexdigest(), local
+
+def _file_digest(path):
+    stat = Path(path).stat()
+    return _source_digest(str(path), stat.st_mtime_ns, stat.st_size)
+
+def code_dependencies(func):
+    """渲染函数经由引用（全局名、导入的函数、函数内 import）用到的其他 Art 目录模块的源文件，含传递依赖"""
+    own = _local_module_file(func)
+    namespace = func.__globals__
+    found = set()
+    seen = set()
+    stack = [func]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        for name in _referenced_names(current.__code__):
+            value = namespace.get(name)
+            value = getattr(value, '__wrapped__', value)
+            if isinstance(value, types.FunctionType) and value.__module__ == func.__module__:
+                stack.append(value)
+            elif isinstance(value, (types.ModuleType, types.FunctionType, type)):
+                path = _local_module_file(value)
+                if path:
+                    found.add(str(path))
+            elif value is None and (ART_DIR / f'{name}.py').is_file():
+                found.add(str(ART_DIR / f'{name}.py'))  # 函数内 import 的模块不在模块全局中
+
+    files = set()
+    pending = list(found)
+    while pending:
+        path = pending.pop()
+        if path in files or (own and path == str(own)):
+            continue
+        files.add(path)
+        pending.extend(_file_digest(path)[1])
+    return sorted(files)
+
+def code_digest(func):
+    """计算函数及其引用的同模块函数、常量的摘要；引用到的其他 Art 目录模块按整个源文件计入
+    （这些模块中的常量、效果参数等变化同样使指纹失效）"""
+    import hashlib
+    namespace = func.__globals__
+    digest = hashlib.sha1()
+    seen = set()
+    stack = [func]
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        digest.update(_code_bytes(current.__code__))
+        for name in _referenced_names(current.__code__):
+            # lru_cache 等包装器按被包装的函数计算
+            value = namespace.get(name)
+            value = getattr(value, '__wrapped__', value)
+            if isinstance(value, types.FunctionType):
+                if value.__module__ == func.__module__:
+                    stack.append(value)
+            elif isinstance(value, (str, int, float, tuple, list, dict, set, frozenset)):
+                digest.update(f'{name}={value!r}'.encode('utf-8'))
+    for path in code_dependencies(func):
+        digest.update(f'{Path(path).name}={_file_digest(path)[0]}'.encode('utf-8'))
+    return digest.hexdigest()
+
+def job_fingerprint(job, module):
+    """任务指纹：渲染函数代码 + 参数，任一变化即需重新生成"""
+    import hashlib
+    digest = hashlib.sha1()
+    digest.update(code_digest(getattr(module, job['func'])).encode('utf-8'))
+    digest.update(repr(job['args']).encode('utf-8'))
+    return digest.hexdigest()
+
+def render_image(job, module):
+    """在内存中执行单个素材任务，返回 PIL.Image 或 PNG 字节"""
+    return getattr(module, job['func'])(*job['args'])
+
+def render_job(job, module, sink):
+    """执行单个素材任务并写入 sink；job['overwrite'] 为 False 时跳过已存在的素材。
+    返回是否实际写入"""
+    if not job.get('overwrite', True) and sink.exists(job['path']):
+        return False
+    sink.put(job['path'], render_image(job, module))
+    return True
+
+def stream_job(job, module, output_path, budget_bytes):
+    """按条带流式渲染并写出声明了 strip_func 的任务，峰值内存受 budget_bytes 限制"""
+    import png_stream
+    strip_func = getattr(module, job['strip_func'])
+    png_stream.stream_render(output_path, job['size'], job['size'], job['mode'],
+                             lambda y0, y1: strip_func(*job['args'], y0, y1), budget_bytes)
+
+def render_all(graph, modules, sink):
+    """将依赖图中的全部任务渲染到 sink 并关闭 sink，返回实际写入的数量"""
+    written = 0
+    for job in graph.values():
+        if render_job(job, modules[job['module']], sink):
+            written += 1
+    sink.close()
+    return written
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+素材目录对账索引
+一次递归 os.scandir 扫描 Art 目录下的全部图片，记录 名称/大小/mtime/哈希/尺寸，
+保存在 build/asset_index.json；大小与 mtime 未变的文件沿用上次的哈希与尺寸，不重新读取。
+
+索引与配置（extract_image_paths）及素材依赖图对账，将素材分为:
+  missing           配置或依赖图中有、磁盘上没有
+  orphaned          磁盘上有、配置与依赖图中都没有
+  stale             上次由本工具生成时的任务指纹与当前指纹不同（生成代码或参数已变化），
+                    或声明 overrides 的任务尚未生成、磁盘上仍是被替换模块的文件
+  placeholder-only  仍是灰底占位图（尚无正式美术）
+  wrong-dimension   图片尺寸与任务声明的尺寸不符
+
+--fix 将 missing（以及 stale）列表直接交给各生成模块渲染，并在索引中记录指纹。
+
+用法: python asset_index.py [--fix] [--class missing] [--json]
+"""
+
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+
+import asset_graph
+
+BUILD_DIR = asset_graph.ART_DIR / 'build'
+INDEX_FILE = BUILD_DIR / 'asset_index.json'
+
+IMG_EXTS = {'.png', '.jpg', '.jpeg', '.webp'}
+
+# 不参与扫描的目录（构建输出、黄金图与工具代码）
+SKIP_DIRS = {'build', 'golden', '__pycache__', 'catcafe_assets'}
+
+CLASSES = ('missing', 'orphaned', 'stale', 'placeholder-only', 'wrong-dimension')
+
+# generate_placeholder_assets.render_placeholder 的底色
+PLACEHOLDER_COLOR = (200, 200, 200)
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def scan_tree(root=asset_graph.ART_DIR):
+    """一次递归 scandir，返回 {相对路径: (大小, mtime_ns)}，只收集图片"""
+    found = {}
+    stack = [(Path(root), '')]
+    while stack:
+        directory, prefix = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append((entry.path, f'{prefix}{entry.name}/'))
+                elif os.path.splitext(entry.name)[1].lower() in IMG_EXTS:
+                    stat = entry.stat()
+                    found[prefix + entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+def image_dimensions(path, head):
+    """读取图片宽高：PNG 直接解析 IHDR，其他格式按需用 Pillow 读取文件头"""
+    if head[:8] == PNG_SIGNATURE and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    from PIL import Image
+    with Image.open(path) as img:
+        return img.size
+
+def is_placeholder(path):
+    """灰底占位图：四角与左右边缘中点均为占位底色"""
+    from PIL import Image
+    with Image.open(path) as img:
+        rgb = img.convert('RGB')
+        width, height = rgb.size
+        probes = [(0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1),
+                  (0, height // 2), (width - 1, height // 2)]
+        return all(rgb.getpixel(point) == PLACEHOLDER_COLOR for point in probes)
+
+def describe_file(path, size, mtime_ns):
+    """读取单个文件的哈希、尺寸与占位图标记"""
+    data = Path(path).read_bytes()
+    width, height = image_dimensions(path, data[:24])
+    return {'size': size, 'mtime_ns': mtime_ns, 'sha1': hashlib.sha1(data).hexdigest(),
+            'width': width, 'height': height, 'placeholder': is_placeholder(path)}
+
+def load_index(path=INDEX_FILE):
+    """读取上次的索引，不存在时为空"""
+    if not Path(path).exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)['files']
+
+def save_index(index, path=INDEX_FILE):
+    """写出索引"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'files': index}, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+def build_index(previous=None, root=asset_graph.ART_DIR):
+    """扫描目录并更新索引，返回 (索引, 重新读取的文件数)"""
+    previous = load_index() if previous is None else previous
+    index = {}
+    rehashed = 0
+    for rel_path, (size, mtime_ns) in scan_tree(root).items():
+        entry = previous.get(rel_path)
+        if entry and entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+            index[rel_path] = entry
+            continue
+        index[rel_path] = describe_file(Path(root) / rel_path, size, mtime_ns)
+        rehashed += 1
+    return index, rehashed
+
+def configured_paths(config):
+    """配置中声明的全部图片（相对 Art 目录）"""
+    placeholders = asset_graph.load_generator('generate_placeholder_assets')
+    paths = set()
+    for path in placeholders.extract_image_paths(config):
+        if path.suffix.lower() in IMG_EXTS:
+            paths.add((path.relative_to('Art') if path.parts[:1] == ('Art',) else path).as_posix())
+    return paths
+
+def expected_dimensions(job):
+    """任务声明的 (宽, 高)；占位图任务的尺寸只是默认值，不参与比对"""
+    if job['module'] == 'generate_placeholder_assets':
+        return None
+    return job.get('width', job['size']), job.get('height', job['size'])
+
+def reconcile(index, graph, config, modules):
+    """返回 {类别: [路径]}"""
+    expected = configured_paths(config) | set(graph)
+    result = {name: [] for name in CLASSES}
+    for path in sorted(expected):
+        entry = index.get(path)
+        if entry is None:
+            result['missing'].append(path)
+            continue
+        job = graph.get(path)
+        if entry['placeholder']:
+            result['placeholder-only'].append(path)
+        if job is None:
+            continue
+        recorded = entry.get('fingerprint')
+        if recorded != asset_graph.job_fingerprint(job, modules[job['module']]):
+            # 替换其他模块的任务没有指纹记录时，磁盘上的文件来自被替换的生成器（如占位图），尺寸无需比对
+            if recorded or job.get('overrides'):
+                result['stale'].append(path)
+                continue
+        dimensions = expected_dimensions(job)
+        if dimensions and (entry['width'], entry['height']) != tuple(dimensions):
+            result['wrong-dimension'].append(path)
+    result['orphaned'] = sorted(set(index) - expected)
+    return result
+
+def fix(paths, index, graph, modules):
+    """渲染指定素材并在索引中记录指纹，返回实际生成的数量"""
+    from asset_sinks import FileSink
+    sink = FileSink(asset_graph.ART_DIR)
+    written = 0
+    for path in paths:
+        job = graph.get(path)
+        if job is None:
+            continue  # 只在配置中出现、没有生成模块负责的素材
+        module = modules[job['module']]
+        sink.put(path, asset_graph.render_image(job, module))
+        stat = (asset_graph.ART_DIR / path).stat()
+        index[path] = describe_file(asset_graph.ART_DIR / path, stat.st_size, stat.st_mtime_ns)
+        index[path]['fingerprint'] = asset_graph.job_fingerprint(job, module)
+        written += 1
+    return written
+
+def missing_jobs(graph, root=asset_graph.ART_DIR):
+    """依赖图中磁盘上缺失的任务：一次扫描目录，替代逐个路径的 exists() 检查"""
+    on_disk = scan_tree(root)
+    return [job for path, job in graph.items() if path not in on_disk]
+
+def main():
+    """主函数"""
+    # 延迟导入：status 命令只用到 missing_jobs，不应拖慢命令行启动
+    import argparse
+    parser = argparse.ArgumentParser(description='扫描素材目录并与配置、依赖图对账')
+    parser.add_argument('--fix', action='store_true', help='生成缺失与过期的素材')
+    parser.add_argument('--class', dest='only', choices=CLASSES, action='append', help='只列出指定类别')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出对账结果')
+    args = parser.parse_args()
+
+    config = asset_graph.load_config()
+    modules = {name: asset_graph.load_generator(name) for name in asset_graph.GENERATOR_MODULES}
+    graph = asset_graph.build_asset_graph(config, modules)
+    previous = load_index()
+    index, rehashed = build_index(previous)
+    # 指纹只由 --fix 写入，沿用上次记录（文件内容变化时作废）
+    for path, entry in index.items():
+        old = previous.get(path)
+        if old and old.get('fingerprint') and old['sha1'] == entry['sha1']:
+            entry['fingerprint'] = old['fingerprint']
+
+    result = reconcile(index, graph, config, modules)
+    if args.fix:
+        written = fix(result['missing'] + result['stale'], index, graph, modules)
+        print(f"🔧 已生成 {written} 个素材")
+        result = reconcile(index, graph, config, modules)
+    save_index(index)
+
+    shown = args.only or CLASSES
+    if args.json:
+        print(json.dumps({name: result[name] for name in shown}, ensure_ascii=False, indent=2))
+        return
+    for name in shown:
+        for path in result[name]:
+            print(f"{name:<18}{path}")
+    print(f"\n索引 {len(index)} 个文件（重新读取 {rehashed} 个）: {INDEX_FILE}")
+    print('  '.join(f"{name} {len(result[name])}" for name in CLASSES))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+素材引用分析（死素材剔除）
+扫描 client/assets/Scripts/**/*.ts 中的字符串字面量，与素材依赖图求交集：
+素材名（如 getAssetPath('ui', 'gold_coin') 中的 'gold_coin'）、文件名或路径被引用的素材保留，
+其余素材不再参与渲染、图集与打包。
+
+以下素材同样视为被引用:
+  - 场景预加载清单（preload_manifest.py）选中的素材，客户端按清单加载
+  - 白名单中的素材：DYNAMIC_ALLOWLIST 或 art_config.json 的 "assetAllowlist"，
+    为 fnmatch 模式，匹配素材路径或素材名，用于运行时拼接的动态键
+
+用法: python asset_refs.py [--unreferenced] [--category ui]
+"""
+
+import argparse
+import re
+from fnmatch import fnmatch
+from pathlib import Path
+
+import asset_graph
+
+SCRIPTS_DIR = asset_graph.ART_DIR.parent / 'Scripts'
+
+# 运行时拼接名称、无法静态扫描到的素材（fnmatch 模式）
+DYNAMIC_ALLOWLIST = [
+    'Characters/Cats/*/*',      # 猫咪品种来自服务端数据（get_animals），按名称动态加载
+]
+
+# 单引号、双引号与不含插值的模板字符串
+STRING_LITERAL = re.compile(r"""'([^'\\\n]*)'|"([^"\\\n]*)"|`([^`$\\]*)`""")
+
+def scan_references(scripts_dir=SCRIPTS_DIR):
+    """返回 {字符串字面量: [引用位置 '文件:行号']}"""
+    references = {}
+    for path in sorted(Path(scripts_dir).rglob('*.ts')):
+        text = path.read_text(encoding='utf-8', errors='replace')
+        for match in STRING_LITERAL.finditer(text):
+            literal = next(group for group in match.groups() if group is not None)
+            if not literal or ' ' in literal:
+                continue
+            line = text.count('\n', 0, match.start()) + 1
+            references.setdefault(literal, []).append(f'{path.relative_to(scripts_dir)}:{line}')
+    return references
+
+def reference_keys(job):
+    """素材可能被脚本引用的键：素材名、文件名（含/不含扩展名）与路径"""
+    path = Path(job['path'])
+    return {job['name'], path.stem, path.name, job['path'], f"Art/{job['path']}"}
+
+def allowlist_patterns(config):
+    """默认白名单与配置中的白名单"""
+    return DYNAMIC_ALLOWLIST + list(config.get('assetAllowlist', []))
+
+def preload_paths(config):
+    """预加载清单选中的素材路径与素材键"""
+    import preload_manifest
+    paths = set()
+    for profile in config.get('preload', preload_manifest.SCENE_PRELOAD).values():
+        for selectors in profile.values():
+            for selector in selectors:
+                paths.update(preload_manifest.resolve_selector(config, selector))
+    return paths
+
+def classify(graph, config, references=None):
+    """返回 {素材路径: 引用原因或 None}；原因为引用位置、'preload' 或 'allowlist'"""
+    references = scan_references() if references is None else references
+    patterns = allowlist_patterns(config)
+    preloaded = preload_paths(config)
+    reasons = {}
+    for path, job in graph.items():
+        hits = [location for key in reference_keys(job) for location in references.get(key, [])]
+        if hits:
+            reasons[path] = hits[0]
+        elif path in preloaded or asset_graph.asset_key(job) in preloaded:
+            reasons[path] = 'preload'
+        elif any(fnmatch(path, pattern) or fnmatch(job['name'], pattern) for pattern in patterns):
+            reasons[path] = 'allowlist'
+        else:
+            reasons[path] = None
+    return reasons
+
+def prune_graph(graph, config, verbose=True):
+    """剔除未被引用的素材，返回新的依赖图；找不到脚本目录时不剔除"""
+    if not SCRIPTS_DIR.is_dir():
+        print(f"⚠️  未找到客户端脚本目录 {SCRIPTS_DIR}，跳过死素材剔除")
+        return graph
+    reasons = classify(graph, config)
+    live = {path: job for path, job in graph.items() if reasons[path]}
+    if verbose and graph:
+        removed = len(graph) - len(live)
+        print(f"🧹 死素材剔除: 保留 {len(live)} / {len(graph)}，剔除 {removed}（{removed / len(graph):.0%}）")
+    return live
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='扫描客户端脚本中的素材引用')
+    parser.add_argument('--unreferenced', action='store_true', help='只列出未被引用的素材')
+    parser.add_argument('--category', help='只显示指定类别')
+    args = parser.parse_args()
+
+    config = asset_graph.load_config()
+    modules = {name: asset_graph.load_generator(name) for name in asset_graph.GENERATOR_MODULES}
+    graph = asset_graph.build_asset_graph(config, modules)
+    reasons = classify(graph, config)
+
+    counts = {}
+    for path, job in graph.items():
+        if args.category and job['category'] != args.category:
+            continue
+        stats = counts.setdefault(job['category'], [0, 0])
+        stats[0 if reasons[path] else 1] += 1
+        if reasons[path] is None or not args.unreferenced:
+            print(f"{'✅' if reasons[path] else '❌'} {path}  {reasons[path] or ''}")
+
+    print(f"\n{'类别':<12}{'引用':>8}{'未引用':>8}")
+    for category, (live, dead) in counts.items():
+        print(f"{category:<14}{live:>8}{dead:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+素材输出目标（Sink）
+渲染函数只返回内存中的图像或 PNG 字节，由 Sink 决定写到哪里：
+文件系统、zip 包、图集、内容寻址存储或纯内存。各阶段可以直接串联，无需中间文件。
+
+所有 Sink 提供相同接口:
+  put(path, data)   写入一个文件，data 为 PIL.Image（按 PNG 编码）或已编码的字节
+  exists(path)      该路径是否已存在
+  close()           结束写入（图集、索引等在此时落盘）
+"""
+
+import hashlib
+import io
+import json
+import struct
+from pathlib import Path
+
+def encode_png(data, optimize=False):
+    """将图像编码为 PNG 字节；已是字节时原样返回"""
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    buffer = io.BytesIO()
+    data.save(buffer, format='PNG', optimize=optimize)
+    return buffer.getvalue()
+
+def decode_image(data):
+    """将 PNG 字节解码为图像；已是图像时原样返回"""
+    if not isinstance(data, (bytes, bytearray)):
+        return data
+    from PIL import Image
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return img
+
+def png_info(data):
+    """PNG 字节 -> (宽, 高, 是否含透明通道)，只解析文件头"""
+    width, height = struct.unpack('>II', data[16:24])
+    color_type = data[25]
+    # 调色板图像的透明度在 IDAT 之前的 tRNS 块中
+    has_alpha = color_type in (4, 6) or (color_type == 3 and data.find(b'tRNS', 0, data.find(b'IDAT')) >= 0)
+    return width, height, has_alpha
+
+def pack_shelves(sizes, page_size, padding=2):
+    """按行（shelf）装箱：sizes 为 {路径: (宽, 高)}，返回 [{路径: (x, y, w, h)}, ...]（每页一个字典）"""
+    pages = []
+    frames = {}
+    x = y = shelf_height = 0
+    # 按高度降序装箱，行内空隙最小
+    order = sorted(sizes, key=lambda p: (-sizes[p][1], -sizes[p][0], p))
+    for path in order:
+        width, height = sizes[path]
+        if max(width, height) + padding * 2 > page_size:
+            raise ValueError(f"{path} 尺寸 {(width, height)} 超过图集页大小 {page_size}")
+        width += padding * 2
+        height += padding * 2
+        if x + width > page_size:
+            x, y, shelf_height = 0, y + shelf_height, 0
+        if y + height > page_size:
+            pages.append(frames)
+            frames = {}
+            x = y = shelf_height = 0
+        frames[path] = (x + padding, y + padding, width - padding * 2, height - padding * 2)
+        x += width
+        shelf_height = max(shelf_height, height)
+    if frames:
+        pages.append(frames)
+    return pages
+
+class FileSink:
+    """写入文件系统目录"""
+
+    def __init__(self, root, verbose=True):
+        self.root = Path(root)
+        self.verbose = verbose
+
+    def put(self, path, data):
+        output_path = self.root / path
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(encode_png(data))
+        if self.verbose:
+            print(f"Created: {path}")
+
+    def exists(self, path):
+        return (self.root / path).exists()
+
+    def close(self):
+        pass
+
+class MemorySink:
+    """保存在内存字典中，供测试与预览服务使用"""
+
+    def __init__(self):
+        self.files = {}
+
+    def put(self, path, data):
+        self.files[path] = encode_png(data)
+
+    def exists(self, path):
+        return path in self.files
+
+    def close(self):
+        pass
+
+# zip 条目使用固定时间戳，相同内容的包逐字节一致（增量补丁依赖于此）
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+class ZipSink:
+    """直接写入 zip 包（PNG 已压缩，采用 STORED 避免重复压缩）"""
+
+    def __init__(self, zip_path):
+        # 延迟导入：生成脚本的 asset_jobs() 会用到本模块的 pack_shelves，不应拖慢命令行启动
+        import zipfile
+        self.zip_path = Path(zip_path)
+        self.zip_path.parent.mkdir(parents=True, exist_ok=True)
+        self.archive = zipfile.ZipFile(self.zip_path, 'w', compression=zipfile.ZIP_STORED)
+        self.names = set()
+
+    def put(self, path, data):
+        import zipfile
+        info = zipfile.ZipInfo(path, date_time=ZIP_TIMESTAMP)
+        info.external_attr = 0o644 << 16
+        self.archive.writestr(info, encode_png(data))
+        self.names.add(path)
+
+    def exists(self, path):
+        return path in self.names
+
+    def close(self):
+        self.archive.close()
+
+class ContentStoreSink:
+    """内容寻址存储：按 SHA-256 去重保存，index.json 记录路径到哈希的映射
+    （对象文件名保留原扩展名）"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.index = {}
+
+    def object_path(self, digest, suffix='.png'):
+        return self.root / 'objects' / digest[:2] / f'{digest}{suffix}'
+
+    def put(self, path, data):
+        payload = encode_png(data)
+        digest = hashlib.sha256(payload).hexdigest()
+        object_path = self.object_path(digest, Path(path).suffix)
+        if not object_path.exists():
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            object_path.write_bytes(payload)
+        self.index[path] = digest
+
+    def exists(self, path):
+        return path in self.index
+
+    def close(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+class AtlasSink:
+    """图集打包：收集素材，close() 时按行（shelf）装箱成若干页，
+    页面图像与 atlas.json 元数据写入下游 Sink"""
+
+    def __init__(self, output, name='atlas', page_size=1024, padding=2):
+        self.output = output
+        self.name = name
+        self.page_size = page_size
+        self.padding = padding
+        self.images = {}
+
+    def put(self, path, data):
+        img = decode_image(data)
+        if max(img.size) + self.padding * 2 > self.page_size:
+            raise ValueError(f"{path} 尺寸 {img.size} 超过图集页大小 {self.page_size}")
+        self.images[path] = img
+
+    def exists(self, path):
+        return path in self.images
+
+    def pack(self):
+        """计算装箱结果，返回 [{路径: (x, y, w, h)}, ...]（每页一个字典）"""
+        sizes = {path: img.size for path, img in self.images.items()}
+        return pack_shelves(sizes, self.page_size, self.padding)
+
+    def close(self):
+        from PIL import Image
+
+        metadata = {'pageSize': self.page_size, 'pages': [], 'frames': {}}
+        for index, frames in enumerate(self.pack()):
+            page_name = f'{self.name}_{index}.png'
+            page = Image.new('RGBA', (self.page_size, self.page_size), (0, 0, 0, 0))
+            for path, (x, y, w, h) in frames.items():
+                page.paste(self.images[path].convert('RGBA'), (x, y))
+                metadata['frames'][path] = {'page': index, 'x': x, 'y': y, 'w': w, 'h': h}
+            metadata['pages'].append(page_name)
+            self.output.put(page_name, page)
+
+        payload = json.dumps(metadata, ensure_ascii=False, indent=2, sort_keys=True)
+        self.output.put(f'{self.name}.json', payload.encode('utf-8'))
+        self.output.close()
+
+class TeeSink:
+    """同时写入多个 Sink"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+
+    def put(self, path, data):
+        payload = encode_png(data)
+        for sink in self.sinks:
+            sink.put(path, payload)
+
+    def exists(self, path):
+        return any(sink.exists(path) for sink in self.sinks)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
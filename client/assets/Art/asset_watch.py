@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+素材监听构建脚本
+常驻进程：生成模块、字体和素材依赖图保持在内存中，
+监听 art_config.json、生成脚本及其导入的 Art 目录模块（如 sprite_effects），改动后只重新生成受影响的素材，
+并提供本地 HTTP 预览页面
+
+用法: python asset_watch.py [--port 8765] [--interval 0.2] [--no-initial-build]
+"""
+
+import argparse
+import html
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import asset_graph
+from asset_sinks import FileSink, MemorySink, TeeSink
+
+CONTENT_TYPES = {
+    '.png': 'image/png',
+    '.svg': 'image/svg+xml',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.webp': 'image/webp',
+}
+
+class WatchState:
+    """监听进程的内存状态：已加载模块、配置、依赖图与任务指纹"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.modules = {}
+        self.config = {}
+        self.graph = {}
+        self.fingerprints = {}
+        self.built = {}  # 素材路径 -> 最近一次生成时间
+        self.generation = 0
+        # 生成结果同时写盘并保留在内存中，预览服务直接从内存读取
+        self.memory = MemorySink()
+        self.sink = TeeSink(FileSink(asset_graph.ART_DIR, verbose=False), self.memory)
+
+    def load_all(self):
+        """首次加载全部生成模块与配置"""
+        for name in asset_graph.GENERATOR_MODULES:
+            self.modules[name] = asset_graph.load_generator(name)
+        self.config = asset_graph.load_config()
+
+    def reload(self, changed_files):
+        """重新加载改动过的模块/配置，加载失败时保留旧版本。
+        依赖模块改动后全部生成模块随之重新加载（from ... import 绑定的函数需要更新）"""
+        generator_files = set(asset_graph.GENERATOR_MODULES.values())
+        helpers_changed = False
+        for path in sorted(set(changed_files) - generator_files - {asset_graph.CONFIG_FILE}):
+            module = sys.modules.get(path.stem)
+            if module is None:
+                continue  # 尚未导入，首次导入时即为新代码
+            try:
+                importlib.reload(module)
+                helpers_changed = True
+                print(f"🔄 重新加载依赖模块: {path.stem}")
+            except Exception as e:
+                print(f"❌ 模块 {path.stem} 加载失败，继续使用旧版本: {e}")
+        for name, path in asset_graph.GENERATOR_MODULES.items():
+            if path in changed_files or helpers_changed:
+                try:
+                    self.modules[name] = asset_graph.load_generator(name, reload=True)
+                    print(f"🔄 重新加载模块: {name}")
+                except Exception as e:
+                    print(f"❌ 模块 {name} 加载失败，继续使用旧版本: {e}")
+        if asset_graph.CONFIG_FILE in changed_files:
+            try:
+                self.config = asset_graph.load_config()
+                print("🔄 重新加载配置: art_config.json")
+            except json.JSONDecodeError as e:
+                print(f"❌ 配置文件格式无效，继续使用旧配置: {e}")
+
+    def rebuild(self, force=False):
+        """重算依赖图，只渲染指纹变化的任务；返回 (渲染数量, 耗时毫秒)"""
+        start = time.perf_counter()
+        graph = asset_graph.build_asset_graph(self.config, self.modules)
+        fingerprints = {
+            path: asset_graph.job_fingerprint(job, self.modules[job['module']])
+            for path, job in graph.items()
+        }
+        dirty = [path for path, fp in fingerprints.items()
+                 if force or self.fingerprints.get(path) != fp]
+
+        rendered = 0
+        for path in dirty:
+            job = graph[path]
+            try:
+                if not asset_graph.render_job(job, self.modules[job['module']], self.sink):
+                    continue
+            except Exception as e:
+                print(f"❌ 生成失败 {path}: {e}")
+                fingerprints.pop(path)
+                continue
+            rendered += 1
+            with self.lock:
+                self.built[path] = time.time()
+
+        with self.lock:
+            for path in set(self.graph) - set(graph):
+                self.built.pop(path, None)
+                self.memory.files.pop(path, None)
+            self.graph = graph
+            self.fingerprints = fingerprints
+            self.generation += 1
+        return rendered, (time.perf_counter() - start) * 1000
+
+def watched_files():
+    """需要监听的文件列表：配置、生成脚本与 Art 目录下的其他模块（渲染函数的依赖）"""
+    generator_files = set(asset_graph.GENERATOR_MODULES.values())
+    helpers = sorted(path for path in asset_graph.ART_DIR.glob('*.py')
+                     if path not in generator_files and path.name != 'asset_watch.py')
+    return [asset_graph.CONFIG_FILE, *asset_graph.GENERATOR_MODULES.values(), *helpers]
+
+def snapshot_mtimes(paths):
+    """读取文件修改时间（纳秒），文件不存在时记为 None"""
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtimes[path] = None
+    return mtimes
+
+def make_handler(state):
+    """创建绑定到监听状态的 HTTP 处理器"""
+
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/':
+                self._send_index()
+            elif self.path == '/status':
+                with state.lock:
+                    body = json.dumps({'generation': state.generation, 'built': state.built})
+                self._send(200, 'application/json', body.encode('utf-8'))
+            elif self.path.startswith('/assets/'):
+                self._send_asset(self.path[len('/assets/'):])
+            else:
+                self._send(404, 'text/plain', b'not found')
+
+        def _send_index(self):
+            with state.lock:
+                items = sorted(state.built.items(), key=lambda item: -item[1])
+            rows = []
+            for path, built_at in items:
+                stamp = time.strftime('%H:%M:%S', time.localtime(built_at))
+                quoted = html.escape(path)
+                rows.append(f'<li><img src="/assets/{quoted}?t={built_at}" height="64"> '
+                            f'{quoted} <small>{stamp}</small></li>')
+            body = ('<!DOCTYPE html><html><head><meta charset="utf-8">'
+                    '<meta http-equiv="refresh" content="2"><title>素材预览</title></head>'
+                    f'<body><h1>素材预览 ({len(rows)})</h1><ul>{"".join(rows)}</ul></body></html>')
+            self._send(200, 'text/html; charset=utf-8', body.encode('utf-8'))
+
+        def _send_asset(self, rel_path):
+            rel_path = rel_path.split('?', 1)[0]
+            content_type = CONTENT_TYPES.get(Path(rel_path).suffix.lower(), 'application/octet-stream')
+            with state.lock:
+                payload = state.memory.files.get(rel_path)
+            if payload is not None:
+                self._send(200, content_type, payload)
+                return
+
+            full_path = (asset_graph.ART_DIR / rel_path).resolve()
+            if asset_graph.ART_DIR not in full_path.parents or not full_path.is_file():
+                self._send(404, 'text/plain', b'not found')
+                return
+            self._send(200, content_type, full_path.read_bytes())
+
+        def _send(self, status, content_type, body):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return PreviewHandler
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='监听配置与生成脚本，增量重新生成素材')
+    parser.add_argument('--host', default='127.0.0.1', help='预览服务监听地址')
+    parser.add_argument('--port', type=int, default=8765, help='预览服务端口，0 表示不启动')
+    parser.add_argument('--interval', type=float, default=0.2, help='文件轮询间隔（秒）')
+    parser.add_argument('--no-initial-build', action='store_true',
+                        help='启动时不全量生成，只记录当前指纹')
+    args = parser.parse_args()
+
+    print("=== 素材监听构建 ===")
+    os.chdir(asset_graph.ART_DIR)
+
+    state = WatchState()
+    state.load_all()
+    if args.no_initial_build:
+        state.graph = asset_graph.build_asset_graph(state.config, state.modules)
+        state.fingerprints = {
+            path: asset_graph.job_fingerprint(job, state.modules[job['module']])
+            for path, job in state.graph.items()
+        }
+        print(f"已记录 {len(state.fingerprints)} 个素材指纹")
+    else:
+        rendered, elapsed = state.rebuild(force=True)
+        print(f"✅ 初始生成 {rendered} 个素材，用时 {elapsed:.0f} ms")
+
+    if args.port:
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(state))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🌐 预览地址: http://{args.host}:{server.server_address[1]}/")
+
+    print(f"👀 正在监听 {len(watched_files())} 个文件，Ctrl+C 退出")
+    mtimes = snapshot_mtimes(watched_files())
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = snapshot_mtimes(watched_files())
+            changed = {path for path, mtime in current.items() if mtimes.get(path) != mtime}
+            if not changed:
+                continue
+            mtimes = current
+            state.reload(changed)
+            rendered, elapsed = state.rebuild()
+            print(f"✅ 重新生成 {rendered} 个素材，用时 {elapsed:.0f} ms")
+    except KeyboardInterrupt:
+        print("\n已停止监听")
+
+if __name__ == "__main__":
+    main()
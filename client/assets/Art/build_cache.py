@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+内容寻址构建缓存
+以 (渲染函数及其引用的代码与常量、任务参数（配置子树/尺寸/风格）、Pillow 版本、字体) 的哈希为键，
+缓存渲染好的 PNG。字体由生成模块的 job_font(job) 给出（任务实际使用的字体文件，可缺省），
+其路径与内容摘要计入缓存键：各机器按 arial.ttf、DejaVu 或 CATCAFE_ASSET_FONT 解析到不同字体时互不命中。不同 CI 机器从相同配置与代码生成素材时直接取回结果，无需重新渲染。
+
+后端可替换:
+  本地目录      /path/to/cache                  objects/ab/<键>.png
+  HTTP 存储     http://host:port/prefix          GET/PUT <前缀>/<键>.png，404 视为未命中
+
+生成脚本通过 --cache 参数或环境变量 CATCAFE_ASSET_CACHE 启用缓存。
+
+用法:
+  python build_cache.py serve --root build/cache-server [--port 8770]   # 本地替身 HTTP 存储
+  python build_cache.py key                                             # 打印全部素材的缓存键
+"""
+
+import argparse
+import hashlib
+import os
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import asset_graph
+from asset_sinks import encode_png
+
+CACHE_ENV = 'CATCAFE_ASSET_CACHE'
+
+# 缓存格式版本，编码方式变化时递增以使旧缓存失效
+CACHE_VERSION = 1
+
+SERVER_ROOT = asset_graph.ART_DIR / 'build' / 'cache-server'
+
+@lru_cache(maxsize=None)
+def _font_digest(path, mtime_ns, size):
+    """字体文件内容摘要（按修改时间与大小缓存）"""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def font_key(job, module):
+    """任务所用字体的 '路径 摘要'，模块未提供 job_font 或使用 Pillow 自带字体时为空"""
+    job_font = getattr(module, 'job_font', None)
+    path = job_font(job) if job_font else None
+    if not path:
+        return ''
+    stat = os.stat(path)
+    return f'{path} {_font_digest(path, stat.st_mtime_ns, stat.st_size)}'
+
+def cache_key(job, module):
+    """任务的缓存键（与输出路径无关，同参数、同字体的素材共享缓存）"""
+    from PIL import __version__ as pil_version
+    digest = hashlib.sha256()
+    digest.update(f'v{CACHE_VERSION}|pillow {pil_version}|{job["module"]}.{job["func"]}|'.encode('utf-8'))
+    digest.update(f'font {font_key(job, module)}|'.encode('utf-8'))
+    digest.update(asset_graph.job_fingerprint(job, module).encode('utf-8'))
+    return digest.hexdigest()
+
+class DirectoryCache:
+    """本地（或网络共享）目录缓存"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, key):
+        return self.root / 'objects' / key[:2] / f'{key}.png'
+
+    def get(self, key):
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key, data):
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 先写临时文件再替换，并发写入同一键时读者不会看到半个文件
+        temp_path = path.with_name(f'{path.name}.{os.getpid()}.part')
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+
+    def __str__(self):
+        return str(self.root)
+
+class HTTPCache:
+    """简单 HTTP 对象存储；网络错误视为未命中，不中断构建"""
+
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.offline = False
+
+    def _url(self, key):
+        return f'{self.base_url}/{key[:2]}/{key}.png'
+
+    def get(self, key):
+        from urllib.error import HTTPError, URLError
+        from urllib.request import urlopen
+        if self.offline:
+            return None
+        try:
+            with urlopen(self._url(key), timeout=self.timeout) as response:
+                return response.read()
+        except HTTPError as e:
+            if e.code != 404:
+                print(f"⚠️  缓存读取失败 {e.code}: {self._url(key)}")
+            return None
+        except (URLError, OSError) as e:
+            print(f"⚠️  缓存服务不可用，本次构建不再访问: {e}")
+            self.offline = True
+            return None
+
+    def put(self, key, data):
+        from urllib.error import URLError
+        from urllib.request import Request, urlopen
+        if self.offline:
+            return
+        request = Request(self._url(key), data=data, method='PUT',
+                          headers={'Content-Type': 'image/png'})
+        try:
+            with urlopen(request, timeout=self.timeout):
+                pass
+        except (URLError, OSError) as e:
+            print(f"⚠️  缓存上传失败，本次构建不再访问: {e}")
+            self.offline = True
+
+    def __str__(self):
+        return self.base_url
+
+def open_cache(spec):
+    """按参数创建缓存后端：http(s):// 开头为 HTTP 存储，否则为目录；spec 为空返回 None"""
+    if not spec:
+        return None
+    if spec.startswith(('http://', 'https://')):
+        return HTTPCache(spec)
+    return DirectoryCache(spec)
+
+class CacheStats:
+    """按类别统计缓存命中情况"""
+
+    def __init__(self):
+        self.categories = {}
+        self.fetched_bytes = 0
+
+    def record(self, category, hit, size=0):
+        stats = self.categories.setdefault(category, [0, 0])
+        stats[0 if hit else 1] += 1
+        if hit:
+            self.fetched_bytes += size
+
+    def report(self, cache):
+        """打印命中率报告"""
+        hits = sum(h for h, _ in self.categories.values())
+        total = hits + sum(m for _, m in self.categories.values())
+        rate = hits / total if total else 0
+        print(f"\n📦 构建缓存 {cache}: 命中 {hits}/{total}（{rate:.0%}），"
+              f"取回 {self.fetched_bytes / 1024:.0f} KB")
+        for category, (category_hits, misses) in self.categories.items():
+            print(f"  {category:<13}命中 {category_hits:>4}  未命中 {misses:>4}")
+
+def cached_render(job, module, cache, stats):
+    """先查缓存，未命中时渲染并回填，返回 PNG 字节"""
+    key = cache_key(job, module)
+    data = cache.get(key)
+    if data is not None:
+        stats.record(job['category'], True, len(data))
+        return data
+    data = encode_png(asset_graph.render_image(job, module))
+    cache.put(key, data)
+    stats.record(job['category'], False)
+    return data
+
+def cached_stream(job, module, cache, stats, output_path, budget_bytes):
+    """声明 strip_func 的任务：命中时直接写出，未命中时按条带流式渲染到 output_path 后回填"""
+    key = cache_key(job, module)
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    data = cache.get(key)
+    if data is not None:
+        output_path.write_bytes(data)
+        stats.record(job['category'], True, len(data))
+        return
+    asset_graph.stream_job(job, module, output_path, budget_bytes)
+    cache.put(key, output_path.read_bytes())
+    stats.record(job['category'], False)
+
+def build_with_cache(module, config, cache, sink, exclude=(), stream_budget=None):
+    """经由缓存生成模块的全部素材到 sink，打印命中率并返回统计。
+    exclude 中的类别不生成；给出 stream_budget（字节）且 sink 为 FileSink 时，
+    场景背景等声明 strip_func 的任务按条带流式写出，峰值内存不超过该预算"""
+    stats = CacheStats()
+    # 直接运行脚本时模块名为 __main__，按源文件名取模块名以保持缓存键一致
+    module_name = Path(module.__file__).stem
+    for job in module.asset_jobs(config):
+        job['module'] = module_name
+        if job['category'] in exclude:
+            continue
+        if not job.get('overwrite', True) and sink.exists(job['path']):
+            continue
+        if stream_budget is not None and job.get('strip_func') and hasattr(sink, 'root'):
+            cached_stream(job, module, cache, stats, sink.root / job['path'], stream_budget)
+            print(f"Created: {job['path']}")
+            continue
+        sink.put(job['path'], cached_render(job, module, cache, stats))
+    sink.close()
+    stats.report(cache)
+    return stats
+
+def make_handler(root):
+    """本地替身存储：GET/HEAD/PUT <前缀>/<键>.png"""
+
+    class CacheHandler(BaseHTTPRequestHandler):
+        def _path(self):
+            parts = [part for part in self.path.split('?', 1)[0].split('/') if part]
+            # 只接受 <两位前缀>/<键>.png，防止路径穿越
+            if len(parts) != 2 or len(parts[0]) != 2 or not parts[1].startswith(parts[0]) or not parts[1].endswith('.png') \
+                    or not parts[1][:-4].isalnum():
+                return None
+            return Path(root) / 'objects' / parts[0] / parts[1]
+
+        def do_GET(self):
+            path = self._path()
+            if path is None or not path.is_file():
+                self._send(404, b'not found')
+                return
+            self._send(200, path.read_bytes(), 'image/png')
+
+        def do_HEAD(self):
+            path = self._path()
+            self.send_response(200 if path is not None and path.is_file() else 404)
+            self.end_headers()
+
+        def do_PUT(self):
+            path = self._path()
+            if path is None:
+                self._send(400, b'bad key')
+                return
+            data = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            DirectoryCache(root).put(path.stem, data)
+            self._send(201, b'')
+
+        def _send(self, status, body, content_type='text/plain'):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return CacheHandler
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='内容寻址构建缓存')
+    parser.add_argument('command', choices=['serve', 'key'])
+    parser.add_argument('--root', type=Path, default=SERVER_ROOT, help='替身存储的数据目录（serve）')
+    parser.add_argument('--host', default='127.0.0.1', help='监听地址（serve）')
+    parser.add_argument('--port', type=int, default=8770, help='监听端口（serve）')
+    args = parser.parse_args()
+
+    if args.command == 'key':
+        config = asset_graph.load_config()
+        modules = {name: asset_graph.load_generator(name) for name in asset_graph.GENERATOR_MODULES}
+        for path, job in asset_graph.build_asset_graph(config, modules).items():
+            print(f"{cache_key(job, modules[job['module']])}  {path}")
+        return
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.root))
+    print(f"🌐 构建缓存服务: http://{args.host}:{server.server_address[1]}/ （数据目录 {args.root}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+按钮状态条带生成脚本
+每种按钮只绘制一次普通状态底图（nine_slice.render_nine_slice），其余状态
+（pressed/disabled/highlight）由颜色变换派生：去饱和、亮度与可选的 3x4 颜色矩阵
+合成为一个矩阵，以 Image.convert 的矩阵模式在 C 层一次处理整张底图，
+透明度单独缩放。全部状态横向写入同一张条带 UI/<按钮>_states.png，
+帧位置与九宫格内边距随任务（job['states']）写入流水线的 index.json 与 UI/button_states.json。
+配置中各状态的文件（ui.buttons.<按钮>.pressed 等）由本模块从条带裁出，替换同路径的占位图；
+普通状态由 nine_slice 生成。
+
+变换表默认取 DEFAULT_STATE_TRANSFORMS，可在 art_config.json 的
+ui.stateTransforms 中覆盖：键为状态名（对所有按钮生效）或 '<按钮>.<状态>'。
+字段:
+  desaturate  去饱和程度 0~1
+  brightness  亮度倍数
+  matrix      额外的 3x4 颜色矩阵（12 个数，按行 R/G/B，最后一列为偏移）
+  alpha       透明度倍数
+
+用法: python button_states.py
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import nine_slice
+
+# 状态变换默认值（art_config.json 的 ui.stateTransforms 逐字段覆盖）
+DEFAULT_STATE_TRANSFORMS = {
+    'normal': {},
+    'pressed': {'brightness': 0.85},
+    'disabled': {'desaturate': 0.8, 'brightness': 1.05, 'alpha': 0.6},
+    'highlight': {'brightness': 1.12},
+}
+
+# 条带内帧间距（像素），避免九宫格拉伸时采样到相邻帧
+STRIP_PADDING = 2
+
+# ITU-R BT.601 亮度系数
+LUMA = (0.299, 0.587, 0.114)
+
+IDENTITY = (1, 0, 0, 0,
+            0, 1, 0, 0,
+            0, 0, 1, 0)
+
+METADATA_PATH = 'UI/button_states.json'
+
+def multiply_matrices(a, b):
+    """3x4 颜色矩阵相乘：先 b 后 a"""
+    result = []
+    for row in range(3):
+        ar = a[row * 4:row * 4 + 4]
+        for col in range(4):
+            value = sum(ar[k] * b[k * 4 + col] for k in range(3))
+            result.append(value + (ar[3] if col == 3 else 0))
+    return tuple(result)
+
+def state_matrix(transform):
+    """变换字段 -> 合成后的 3x4 颜色矩阵（顺序：颜色矩阵、去饱和、亮度）"""
+    matrix = tuple(transform.get('matrix', IDENTITY))
+    amount = transform.get('desaturate', 0)
+    if amount:
+        keep = 1 - amount
+        desaturate = []
+        for row in range(3):
+            desaturate.extend(LUMA[col] * amount + (keep if col == row else 0) for col in range(3))
+            desaturate.append(0)
+        matrix = multiply_matrices(tuple(desaturate), matrix)
+    brightness = transform.get('brightness', 1)
+    if brightness != 1:
+        matrix = tuple(value * brightness for value in matrix)
+    return matrix
+
+def apply_state(base, matrix, alpha):
+    """对底图应用颜色矩阵与透明度倍数"""
+    from PIL import Image
+    matrix = tuple(matrix)
+    rgb = base.convert('RGB')
+    if matrix != IDENTITY:
+        rgb = rgb.convert('RGB', matrix)
+    a = base.getchannel('A')
+    if alpha != 1:
+        a = a.point(lambda value: int(value * alpha + 0.5))
+    return Image.merge('RGBA', (*rgb.split(), a))
+
+def render_state_strip(render_args, states):
+    """绘制一次底图，按 states [(状态, 矩阵, 透明度)] 横向拼成条带"""
+    from PIL import Image
+    base = nine_slice.render_nine_slice(*render_args)
+    width, height = base.size
+    strip = Image.new('RGBA', (strip_width(width, len(states)), height), (0, 0, 0, 0))
+    for index, (_, matrix, alpha) in enumerate(states):
+        strip.paste(apply_state(base, matrix, alpha), (index * (width + STRIP_PADDING), 0))
+    return strip
+
+def freeze(value):
+    """列表递归转为元组（任务参数经 JSON 传递后元组会变为列表，缓存键需要可哈希）"""
+    return tuple(freeze(item) for item in value) if isinstance(value, (list, tuple)) else value
+
+@lru_cache(maxsize=None)
+def cached_strip(render_args, states):
+    """按参数缓存的条带（调用方不得修改返回的图像）"""
+    return render_state_strip(render_args, states)
+
+def render_state_frame(render_args, states, index):
+    """从条带裁出第 index 帧，同一按钮的各状态文件共用一次条带渲染"""
+    strip = cached_strip(freeze(render_args), freeze(states))
+    frame = strip.height
+    x = index * (frame + STRIP_PADDING)
+    return strip.crop((x, 0, x + frame, frame))
+
+def strip_width(frame_width, count):
+    """条带宽度：帧宽之和加帧间距（首尾无边距）"""
+    return count * frame_width + (count - 1) * STRIP_PADDING
+
+def state_transforms(config, button, state):
+    """合并默认值、全局状态覆盖与 '<按钮>.<状态>' 覆盖"""
+    overrides = config.get('ui', {}).get('stateTransforms', {})
+    transform = dict(DEFAULT_STATE_TRANSFORMS.get(state, {}))
+    transform.update(overrides.get(state, {}))
+    transform.update(overrides.get(f'{button}.{state}', {}))
+    return transform
+
+def strip_specs(config):
+    """{条带路径: (按钮, 底图路径, 渲染参数, [(状态, 文件名, 矩阵, 透明度)])}"""
+    slices = nine_slice.slice_specs(config)
+    ui = config.get('ui', {})
+    base = ui.get('basePath', 'Art/UI/')
+    specs = {}
+    for button, files in ui.get('buttons', {}).items():
+        normal_path = nine_slice.art_relative(base + files.get('normal', ''))
+        if normal_path not in slices:
+            continue  # 只处理有九宫格底图的按钮
+        states = []
+        for state, file_name in files.items():
+            transform = state_transforms(config, button, state)
+            states.append((state, file_name, state_matrix(transform), transform.get('alpha', 1)))
+        specs[nine_slice.art_relative(f'{base}{button}_states.png')] = (
+            button, normal_path, slices[normal_path][1], states)
+    return specs
+
+def strip_metadata(render_args, states):
+    """条带帧信息 {'insets', 'frames': {状态: 帧}}；帧的 file 为配置中的状态文件名"""
+    slices = nine_slice.slice_metadata(render_args[3])
+    frame = slices['width']
+    return {
+        'insets': slices['insets'],
+        'frames': {state: {'file': file_name, 'x': index * (frame + STRIP_PADDING), 'y': 0,
+                           'w': frame, 'h': frame}
+                   for index, (state, file_name, _, _) in enumerate(states)},
+    }
+
+def asset_jobs(config):
+    """列出按钮状态条带任务，以及从条带裁出的各状态文件（普通状态除外，路径相对 Art 目录）"""
+    base = config.get('ui', {}).get('basePath', 'Art/UI/')
+    jobs = []
+    for path, (button, _, render_args, states) in strip_specs(config).items():
+        frame = render_args[3] * 2 + nine_slice.CENTER_TEXELS
+        width = strip_width(frame, len(states))
+        strip_args = (render_args, [(state, matrix, alpha) for state, _, matrix, alpha in states])
+        jobs.append({'path': path, 'category': 'ui', 'name': f'{button}_states',
+                     'size': max(width, frame), 'width': width, 'height': frame,
+                     'func': 'render_state_strip', 'args': strip_args,
+                     'states': strip_metadata(render_args, states)})
+        for index, (state, file_name, _, _) in enumerate(states):
+            if state == 'normal':
+                continue  # 普通状态即九宫格底图，由 nine_slice 负责
+            jobs.append({'path': nine_slice.art_relative(base + file_name), 'category': 'ui',
+                         'name': file_name.rsplit('.', 1)[0], 'size': frame,
+                         'func': 'render_state_frame', 'args': (*strip_args, index), 'overrides': True})
+    return jobs
+
+def build_metadata(config):
+    """全部条带的帧信息 {条带路径: 信息}"""
+    return {job['path']: job['states'] for job in asset_jobs(config) if 'states' in job}
+
+def main():
+    """主函数"""
+    print("=== 按钮状态条带生成 ===")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    with open('art_config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    for job in asset_jobs(config):
+        os.makedirs(os.path.dirname(job['path']), exist_ok=True)
+        if job['func'] == 'render_state_frame':
+            render_state_frame(*job['args']).save(job['path'])
+            print(f"Created: {job['path']} ({job['size']}x{job['size']})")
+            continue
+        render_state_strip(*job['args']).save(job['path'])
+        states = ', '.join(state for state, _, _ in job['args'][1])
+        print(f"Created: {job['path']} ({job['width']}x{job['height']}: {states})")
+
+    with open(METADATA_PATH, 'w', encoding='utf-8') as f:
+        json.dump(build_metadata(config), f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Created: {METADATA_PATH}")
+
+if __name__ == "__main__":
+    main()
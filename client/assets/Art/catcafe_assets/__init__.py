@@ -0,0 +1,4 @@
+"""
+猫咪咖啡馆素材工具统一入口
+用法: python -m catcafe_assets <命令> [参数...]，在 client/assets/Art 目录下运行
+"""
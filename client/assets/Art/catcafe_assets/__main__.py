@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+素材工具统一命令行
+子命令及其依赖（Pillow 等）都在执行时才导入，list/status 等命令不加载图像库
+
+用法: python -m catcafe_assets <命令> [参数...]
+"""
+
+import importlib
+import os
+import sys
+from pathlib import Path
+
+ART_DIR = Path(__file__).resolve().parent.parent
+
+# 命令 -> (模块, 函数, 说明)；模块在执行该命令时才导入，None 表示本模块内置命令
+COMMANDS = {
+    'build': ('generate_assets', 'main', '生成 UI/角色/道具/场景素材'),
+    'placeholders': ('generate_placeholder_assets', 'main', '为配置中缺失的图片生成占位图'),
+    'demo': ('create_demo_assets', 'main', '生成可爱风格猫咪预览图'),
+    'structure': ('create_structure', 'main', '创建素材目录结构与说明文件'),
+    'complete': ('complete_asset_generation', 'main', '补充全部遗漏素材的占位文件'),
+    'watch': ('asset_watch', 'main', '监听配置与脚本，增量生成并本地预览'),
+    'golden': ('golden_check', 'main', '金标准图像回归检查'),
+    'pipeline': ('pipeline', 'main', 'DAG 调度的渲染/裁剪/图集/压缩/打包流水线'),
+    'shard': ('shard_build', 'main', '分片构建：共享目录工作队列，支持多机与任务窃取'),
+    'cache': ('build_cache', 'main', '构建缓存：本地替身 HTTP 存储 / 打印缓存键'),
+    'preload': ('preload_manifest', 'main', '生成各场景分级预加载清单'),
+    'refs': ('asset_refs', 'main', '扫描客户端脚本的素材引用，列出死素材'),
+    'release': ('release', 'main', '存档素材版本，生成/应用/校验增量补丁'),
+    'nineslice': ('nine_slice', 'main', '生成九宫格面板/按钮纹理与切片信息'),
+    'buttons': ('button_states', 'main', '由按钮底图派生各状态并写入状态条带'),
+    'reconcile': ('asset_index', 'main', '扫描素材目录并对账：缺失/孤立/过期/占位/尺寸不符'),
+    'fooocus': ('fooocus_queue', 'main', 'Fooocus 批量 AI 生成队列 / 本地替身服务'),
+    'l10n': ('localized_assets', 'main', '在缓存的无文字底图上合成各语言文字素材'),
+    'tiles': ('tileable_textures', 'main', '生成可平铺的天气/水面/视差纹理'),
+    'lqip': ('lqip', 'main', '计算图片的低质量占位缩略图、BlurHash 与主色'),
+    'hitmask': ('hit_masks', 'main', '打印角色精灵的 1 位点击检测掩码'),
+    'vram': ('texture_budget', 'main', '按场景/质量等级/平台估算纹理显存并检查预算'),
+    'list': (None, 'list_assets', '列出全部素材任务'),
+    'status': (None, 'show_status', '按类别统计素材生成情况'),
+    'check-startup': (None, 'check_startup', '检查 list/status 的导入耗时预算'),
+}
+
+# check-startup 的默认导入耗时预算（毫秒，不含解释器自身启动的导入）
+STARTUP_BUDGET_MS = 50
+
+# 受导入耗时预算约束的快速命令
+STARTUP_COMMANDS = ('list', 'status')
+
+# 快速命令禁止导入的重型模块
+HEAVY_MODULES = ('PIL', 'numpy')
+
+def load_module(name):
+    """导入命令所在模块；生成脚本通过 asset_graph 按文件加载"""
+    import asset_graph
+    if name in asset_graph.GENERATOR_MODULES:
+        return asset_graph.load_generator(name)
+    return importlib.import_module(name)
+
+def load_graph():
+    """加载配置与全部生成模块，返回依赖图"""
+    import asset_graph
+    config = asset_graph.load_config()
+    modules = {name: asset_graph.load_generator(name) for name in asset_graph.GENERATOR_MODULES}
+    return asset_graph.build_asset_graph(config, modules)
+
+def list_assets():
+    """列出全部素材任务: 类别、尺寸、路径"""
+    category = sys.argv[1] if len(sys.argv) > 1 else None
+    for job in load_graph().values():
+        if category is None or job['category'] == category:
+            print(f"{job['category']:<13}{job['size']:>6}  {job['path']}")
+
+def show_status():
+    """按类别统计已生成与缺失的素材数量"""
+    import asset_index
+    graph = load_graph()
+    missing = {job['path'] for job in asset_index.missing_jobs(graph)}
+    counts = {}
+    for path, job in graph.items():
+        stats = counts.setdefault(job['category'], [0, 0])
+        stats[1 if path in missing else 0] += 1
+
+    print(f"{'类别':<12}{'已生成':>8}{'缺失':>8}")
+    for category, (present, missing) in counts.items():
+        print(f"{category:<14}{present:>8}{missing:>8}")
+
+def measure_imports(args):
+    """以 -X importtime 运行 Python，返回 (返回码, [(自身耗时us, 模块名)], 总耗时ms, stderr)"""
+    import re
+    import subprocess
+    import time
+
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                            cwd=ART_DIR, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    imports = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+\d+ \| *(\S+)', line)
+        if match:
+            imports.append((int(match.group(1)), match.group(2)))
+    return result.returncode, imports, wall_ms, result.stderr
+
+def interpreter_modules():
+    """解释器自身启动时导入的模块（不计入命令的导入耗时）"""
+    _, baseline, _, _ = measure_imports(['-c', 'pass'])
+    return {name for _, name in baseline}
+
+def measure_command(command, baseline):
+    """运行一个快速命令，返回 (返回码, [(自身耗时us, 模块名)], 导入耗时ms, 重型模块, 总耗时ms, stderr)；
+    baseline 为 interpreter_modules() 的结果"""
+    returncode, imports, wall_ms, stderr = measure_imports(['-m', 'catcafe_assets', command])
+    imports = [(self_us, name) for self_us, name in imports if name not in baseline]
+    import_ms = sum(self_us for self_us, _ in imports) / 1000
+    heavy = sorted({name for _, name in imports if name.split('.')[0] in HEAVY_MODULES})
+    return returncode, imports, import_ms, heavy, wall_ms, stderr
+
+def check_startup():
+    """以 -X importtime 运行 list/status，超出导入预算或加载了重型模块时失败"""
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else STARTUP_BUDGET_MS
+    baseline = interpreter_modules()
+
+    failed = False
+    for command in STARTUP_COMMANDS:
+        returncode, imports, import_ms, heavy, wall_ms, stderr = measure_command(command, baseline)
+        ok = returncode == 0 and import_ms <= budget_ms and not heavy
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {command}: 导入 {import_ms:.1f} ms / 预算 {budget_ms:.0f} ms，"
+              f"总耗时 {wall_ms:.0f} ms")
+        if heavy:
+            print(f"   不应导入: {', '.join(heavy)}")
+        if returncode != 0:
+            print(f"   命令失败: {stderr.strip().splitlines()[-1]}")
+        for self_us, name in sorted(imports, reverse=True)[:5]:
+            print(f"   {self_us / 1000:6.1f} ms  {name}")
+
+    if failed:
+        raise SystemExit(1)
+
+def print_usage():
+    """打印命令列表"""
+    print("用法: python -m catcafe_assets <命令> [参数...]\n")
+    print("命令:")
+    for name, (_, _, description) in COMMANDS.items():
+        print(f"  {name:<15}{description}")
+
+def main(argv=None):
+    """主函数"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help', 'help'):
+        print_usage()
+        return
+    if argv[0] not in COMMANDS:
+        print(f"未知命令: {argv[0]}\n")
+        print_usage()
+        raise SystemExit(2)
+
+    # 各脚本以 Art 目录为工作目录并从中导入模块
+    os.chdir(ART_DIR)
+    if str(ART_DIR) not in sys.path:
+        sys.path.insert(0, str(ART_DIR))
+
+    name, rest = argv[0], argv[1:]
+    module_name, func_name, _ = COMMANDS[name]
+    sys.argv = [f'catcafe_assets {name}', *rest]
+    if module_name is None:
+        globals()[func_name]()
+    else:
+        getattr(load_module(module_name), func_name)()
+
+if __name__ == "__main__":
+    main()
@@ -90,16 +90,7 @@ def generate_missing_ui_assets():
     """生成遗漏的UI素材"""
     print("🎨 生成遗漏的UI素材...")
     
-    # 按钮素材
-    buttons = {
-        'primary_normal': '主要按钮-普通状态',
-        'primary_pressed': '主要按钮-按下状态',
-        'primary_disabled': '主要按钮-禁用状态',
-        'primary_highlight': '主要按钮-高亮状态',
-        'secondary_normal': '次要按钮-普通状态',
-        'secondary_pressed': '次要按钮-按下状态',
-        'secondary_disabled': '次要按钮-禁用状态'
-    }
+    # 按钮素材由 nine_slice.py（普通状态）与 button_states.py（其余状态，从状态条带裁出）生成
     
     # 图标素材
     icons = {
@@ -113,13 +104,7 @@ def generate_missing_ui_assets():
         'info_circle': '信息圆圈图标'
     }
     
-    # 面板素材
-    panels = {
-        'info_panel': '信息面板',
-        'dialog_box': '对话框',
-        'popup_window': '弹出窗口',
-        'drawer_panel': '抽屉面板'
-    }
+    # 面板素材由 nine_slice.py 生成九宫格纹理，客户端按切片内边距拉伸到任意尺寸
     
     # 进度条素材
     progress_bars = {
@@ -132,7 +117,7 @@ def generate_missing_ui_assets():
     sizes = ['64', '128', '256']
     
     # 生成所有UI素材
-    all_ui_assets = {**buttons, **icons, **panels, **progress_bars}
+    all_ui_assets = {**icons, **progress_bars}
     
     for asset_name, description in all_ui_assets.items():
         asset_dir = f"UI/{asset_name}"
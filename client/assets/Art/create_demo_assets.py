@@ -6,14 +6,15 @@
 """
 
 import os
-import subprocess
-import base64
 import json
 from pathlib import Path
 
 # --- 全局配置 ---
 CONFIG_FILE = 'art_config.json'
 
+# 猫咪演示图的烘焙投影（原 SVG feGaussianBlur 滤镜的参数）
+CAT_DEMO_SHADOW = [{'type': 'shadow', 'sigma': 3, 'offset': (2, 3), 'color': '#000000', 'opacity': 0.3}]
+
 def load_config():
     """加载并返回JSON配置文件"""
     try:
@@ -30,32 +31,37 @@ def ensure_dir(path):
     """确保目录存在"""
     os.makedirs(path, exist_ok=True)
 
-def create_simple_svg_png(svg_content, output_path, size):
-    """创建简单的SVG并尝试转换为PNG"""
-    # 创建SVG文件
-    svg_path = output_path.replace('.png', '.svg')
-    with open(svg_path, 'w', encoding='utf-8') as f:
-        f.write(svg_content)
-    
-    # 尝试使用系统工具转换SVG到PNG
+def svg_to_png_bytes(svg_content, size):
+    """通过管道调用系统工具将SVG栅格化为PNG字节，失败时返回None"""
+    import subprocess
+    svg_bytes = svg_content.encode('utf-8')
     try:
         # 尝试使用imagemagick
-        subprocess.run(['convert', svg_path, '-resize', f'{size}x{size}', output_path], 
-                      check=True, capture_output=True)
-        os.remove(svg_path)  # 清理SVG文件
-        return True
-    except:
+        result = subprocess.run(['convert', 'svg:-', '-resize', f'{size}x{size}', 'png:-'],
+                                input=svg_bytes, check=True, capture_output=True)
+        return result.stdout
+    except (OSError, subprocess.CalledProcessError):
         try:
             # 尝试使用inkscape
-            subprocess.run(['inkscape', svg_path, '--export-png', output_path, 
-                           '--export-width', str(size), '--export-height', str(size)], 
-                          check=True, capture_output=True)
-            os.remove(svg_path)
-            return True
-        except:
-            # 如果转换失败，保留SVG文件作为占位符
-            os.rename(svg_path, output_path.replace('.png', '_demo.svg'))
-            return False
+            result = subprocess.run(['inkscape', '--pipe', '--export-type=png', '--export-filename=-',
+                                     f'--export-width={size}', f'--export-height={size}'],
+                                    input=svg_bytes, check=True, capture_output=True)
+            return result.stdout
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+def create_simple_svg_png(svg_content, output_path, size):
+    """创建简单的SVG并尝试转换为PNG"""
+    png_bytes = svg_to_png_bytes(svg_content, size)
+    if png_bytes is None:
+        # 如果转换失败，保留SVG文件作为占位符
+        with open(output_path.replace('.png', '_demo.svg'), 'w', encoding='utf-8') as f:
+            f.write(svg_content)
+        return False
+    
+    with open(output_path, 'wb') as f:
+        f.write(png_bytes)
+    return True
 
 def create_gold_coin_demo(output_path, size):
     """创建金币演示素材"""
@@ -89,36 +95,25 @@ def create_diamond_demo(output_path, size):
     return create_simple_svg_png(svg_content, output_path, size)
 
 def create_kawaii_cat_svg(size, style_profile):
-    """创建可爱风格的猫咪SVG内容 (V3, 模仿AI手绘感)"""
+    """创建可爱风格的猫咪SVG内容 (V3, 模仿AI手绘感)；投影在栅格化后烘焙（CAT_DEMO_SHADOW）"""
     palette = style_profile['palette']
     line_style = style_profile['line_style']
     
     body_color = palette.get('creamy_yellow', '#FFFACD')
     line_color = line_style.get('color', '#6D6D6D')
-    shadow_color = "#000000"
     line_width = 2.5
 
     center = size // 2
     
     svg_content = f'''<svg width="{size}" height="{size}" viewBox="0 0 {size} {size}" xmlns="http://www.w3.org/2000/svg">
   <defs>
-    <filter id="soft-shadow" x="-50%" y="-50%" width="200%" height="200%">
-      <feGaussianBlur in="SourceAlpha" stdDeviation="3" result="blur"/>
-      <feOffset in="blur" dx="2" dy="3" result="offsetBlur"/>
-      <feFlood flood-color="{shadow_color}" flood-opacity="0.3" result="offsetColor"/>
-      <feComposite in="offsetColor" in2="offsetBlur" operator="in" result="offsetBlur"/>
-      <feMerge>
-        <feMergeNode/>
-        <feMergeNode in="SourceGraphic"/>
-      </feMerge>
-    </filter>
      <radialGradient id="bodyGradient" cx="50%" cy="50%" r="50%" fx="50%" fy="50%">
       <stop offset="0%" style="stop-color:white; stop-opacity:0.3" />
       <stop offset="100%" style="stop-color:{body_color}; stop-opacity:1" />
     </radialGradient>
   </defs>
   
-  <g filter="url(#soft-shadow)">
+  <g>
     <!-- 身体: 肥嘟嘟的椭圆 -->
     <ellipse cx="{center}" cy="{center + 20}" rx="{size // 3}" ry="{size // 4}" fill="url(#bodyGradient)" />
     
@@ -144,10 +139,26 @@ def create_kawaii_cat_svg(size, style_profile):
 </svg>'''
     return svg_content
 
+def render_cat_demo(size, style_profile):
+    """在内存中渲染猫咪演示素材（含烘焙投影），返回图像"""
+    from asset_sinks import decode_image
+    from sprite_effects import apply_effects
+    png_bytes = svg_to_png_bytes(create_kawaii_cat_svg(size, style_profile), size)
+    if png_bytes is None:
+        raise RuntimeError("未找到可用的SVG转换工具（ImageMagick 或 Inkscape）")
+    return apply_effects(decode_image(png_bytes), CAT_DEMO_SHADOW)
+
 def create_cat_demo(output_path, size, style_profile):
     """创建猫咪演示素材"""
-    svg_content = create_kawaii_cat_svg(size, style_profile)
-    return create_simple_svg_png(svg_content, output_path, size)
+    try:
+        img = render_cat_demo(size, style_profile)
+    except RuntimeError:
+        # 转换失败时保留SVG文件作为占位符（不含投影）
+        with open(output_path.replace('.png', '_demo.svg'), 'w', encoding='utf-8') as f:
+            f.write(create_kawaii_cat_svg(size, style_profile))
+        return False
+    img.save(output_path)
+    return True
 
 def create_coffee_cup_demo(output_path, size):
     """创建咖啡杯演示素材"""
@@ -172,12 +183,19 @@ def create_coffee_cup_demo(output_path, size):
     return create_simple_svg_png(svg_content, output_path, size)
 
 def create_simple_button_demo(output_path, size, color, text):
-    """创建简单按钮演示素材"""
-    svg_content = f'''<svg width="{size}" height="{size//2}" viewBox="0 0 {size} {size//2}" xmlns="http://www.w3.org/2000/svg">
-  <rect x="4" y="4" width="{size-8}" height="{size//2-8}" rx="8" ry="8" fill="{color}" stroke="#666" stroke-width="2"/>
-  <text x="{size//2}" y="{size//4+4}" text-anchor="middle" font-family="sans-serif" font-size="{size//8}" font-weight="bold" fill="white">{text}</text>
-</svg>'''
-    return create_simple_svg_png(svg_content, output_path, size)
+    """创建简单按钮演示素材：九宫格纹理按切片内边距拉伸到按钮尺寸，再叠加文字"""
+    from PIL import ImageDraw
+    import localized_assets
+    import nine_slice
+    radius = 8
+    texture = nine_slice.render_nine_slice(color, '#666666', 2, radius)
+    insets = nine_slice.slice_metadata(radius)['insets']
+    img = nine_slice.stretch_nine_slice(texture, insets, size, size // 2)
+    draw = ImageDraw.Draw(img)
+    font = localized_assets.get_font('zh-CN', size // 8)
+    draw.text((size // 2, size // 4), text, fill='white', font=font, anchor='mm')
+    img.save(output_path)
+    return True
 
 def create_scene_background_demo(output_path, size, color1, color2):
     """创建场景背景演示素材"""
@@ -280,6 +298,18 @@ def generate_demo_assets():
     
     return demo_assets
 
+def asset_jobs(config):
+    """列出 main() 生成的素材任务（路径相对 Art 目录）"""
+    active_style_name = config.get('globalStyle')
+    style_profile = config.get('styleProfile', {}).get(active_style_name)
+    if not style_profile:
+        return []
+    
+    size = 256
+    path = "Characters/Cats/PREVIEW/cat_preview_v1.png"
+    return [{'path': path, 'category': 'preview', 'name': 'cat_preview', 'size': size,
+             'func': 'render_cat_demo', 'args': (size, style_profile)}]
+
 def create_demo_report(demo_assets):
     """创建演示报告"""
     report_content = f"""# 演示素材生成报告
@@ -346,6 +376,12 @@ const orangeCatPath = resourceManager.getAssetPath('cats', 'orange_cat');
 
 def main():
     """主函数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='生成可爱风格猫咪预览图')
+    parser.add_argument('--cache', default=os.environ.get('CATCAFE_ASSET_CACHE'),
+                        help='构建缓存目录或 HTTP 地址（默认读取 CATCAFE_ASSET_CACHE）')
+    args = parser.parse_args()
+
     print("=== 可爱风格预览生成脚本 (V1) ===")
     
     # --- 切换工作目录 ---
@@ -368,6 +404,19 @@ def main():
     
     # --- 生成单张猫咪预览图 ---
     print("\n[1/1] 正在生成猫咪预览图...")
+
+    # 缓存命中时无需 ImageMagick/Inkscape
+    if args.cache:
+        import sys
+        import build_cache
+        from asset_sinks import FileSink
+        try:
+            build_cache.build_with_cache(sys.modules[__name__], config,
+                                         build_cache.open_cache(args.cache), FileSink('.'))
+            print("\n✅ 预览图生成成功!")
+            return
+        except RuntimeError as e:
+            print(f"⚠️  缓存未命中且无法渲染（{e}），改用原有流程")
     
     cat_name = "cat_preview"
     size = 256
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Fooocus 批量生成队列
+将素材依赖图中的任务与当前 styleProfile 组合成提示词请求，提交到本地
+Fooocus 兼容 HTTP 接口（Fooocus-API 的 POST /v1/generation/text-to-image）:
+  - 并发数有上限（--concurrency），未完成的请求数超过 --max-pending 时暂停提交（背压）
+  - 网络错误、429 与 5xx 按指数退避重试，优先遵循 Retry-After（秒数或 HTTP 日期）
+  - 结果按 (提示词 + 种子 + 参数) 的哈希缓存在 build/fooocus/objects/，同一请求不会生成两次
+
+生成结果登记在 build/fooocus/results.json。本模块同时是生成模块（asset_graph.GENERATOR_MODULES
+中排在最后）：已生成的素材以 load_generated 任务覆盖同路径的占位图任务，
+按任务尺寸居中裁剪缩放后，照常进入流水线的裁剪/图集/压缩/打包阶段。
+
+默认只为没有程序化渲染器的素材（占位图任务）生成。
+
+用法:
+  python fooocus_queue.py mock [--port 8888] [--fail-rate 0.2]   # 本地替身服务
+  python fooocus_queue.py generate [--url http://127.0.0.1:8888] [--category ui] [--limit 10]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+
+import asset_graph
+
+FOOOCUS_ENV = 'CATCAFE_FOOOCUS_URL'
+DEFAULT_URL = 'http://127.0.0.1:8888'
+ENDPOINT = '/v1/generation/text-to-image'
+
+# 直接运行脚本时 __name__ 为 __main__，依赖图中按文件名登记
+MODULE_NAME = Path(__file__).stem
+
+GENERATED_DIR = asset_graph.ART_DIR / 'build' / 'fooocus'
+RESULTS_FILE = GENERATED_DIR / 'results.json'
+
+# 可重试的 HTTP 状态码
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Fooocus 支持的生成分辨率（宽*高），按目标宽高比选最接近的
+ASPECT_RATIOS = ['1024*1024', '1152*896', '896*1152', '1216*832', '832*1216',
+                 '1344*768', '768*1344', '1536*640', '640*1536']
+
+# 类别 -> 提示词主体
+CATEGORY_SUBJECTS = {
+    'ui': 'mobile game UI element',
+    'characters': 'cute cat character, full body, game sprite',
+    'items': 'game item icon',
+    'scenes': 'game background scene, no characters',
+    'effects': 'game visual effect sprite',
+}
+
+NEGATIVE_PROMPT = 'text, watermark, signature, photo, realistic, blurry, lowres, jpeg artifacts, extra limbs'
+
+def style_keywords(config):
+    """当前 styleProfile -> 英文风格关键词"""
+    name = config.get('globalStyle', '')
+    style = config.get('styleProfile', {}).get(name, {})
+    keywords = [f"{name.replace('_', ' ')} style"]
+    palette = style.get('palette', {})
+    if palette:
+        keywords.append('pastel palette ' + ' '.join(sorted(set(palette.values()))))
+    for value in (style.get('shapes', {}).get('default'), style.get('line_style', {}).get('type'),
+                  style.get('effects', {}).get('glow')):
+        if value:
+            keywords.append(value.replace('_', ' '))
+    return keywords
+
+def subject_for(job):
+    """素材任务 -> 提示词主体；占位图任务按顶层目录推断类别"""
+    category = job['category']
+    if category == 'placeholders':
+        category = Path(job['path']).parts[0].lower()
+    subject = CATEGORY_SUBJECTS.get(category, 'game asset')
+    return f"{job['name'].replace('_', ' ')}, {subject}"
+
+def job_dimensions(job):
+    """任务的 (宽, 高)"""
+    return job.get('width', job['size']), job.get('height', job['size'])
+
+def aspect_ratio(width, height):
+    """选择宽高比最接近的生成分辨率"""
+    target = width / height
+    return min(ASPECT_RATIOS, key=lambda ratio: abs(int(ratio.split('*')[0]) / int(ratio.split('*')[1]) - target))
+
+def seed_for(path, config):
+    """按路径派生的固定种子，可在 art_config.json 的 fooocus.seeds 中覆盖"""
+    seeds = config.get('fooocus', {}).get('seeds', {})
+    if path in seeds:
+        return seeds[path]
+    return int(hashlib.sha1(path.encode('utf-8')).hexdigest()[:8], 16)
+
+def build_request(job, config):
+    """素材任务 + 风格 -> Fooocus-API 请求体"""
+    settings = config.get('fooocus', {})
+    return {
+        'prompt': ', '.join([subject_for(job), *style_keywords(config), 'white background']),
+        'negative_prompt': settings.get('negative_prompt', NEGATIVE_PROMPT),
+        'style_selections': settings.get('style_selections', ['Fooocus V2', 'Fooocus Enhance']),
+        'performance_selection': settings.get('performance', 'Speed'),
+        'aspect_ratios_selection': aspect_ratio(*job_dimensions(job)),
+        'image_number': 1,
+        'image_seed': seed_for(job['path'], config),
+        'require_base64': True,
+        'async_process': False,
+    }
+
+def request_key(payload):
+    """请求的缓存键（提示词、种子与全部参数）"""
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def retry_after(value):
+    """Retry-After 头 -> 等待秒数；支持秒数与 HTTP 日期两种形式，缺失或无法解析时为 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import time
+    from datetime import timezone
+    from email.utils import parsedate_to_datetime
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)  # '-0000' 时区按 UTC 处理
+    return max(0.0, when.timestamp() - time.time())
+
+class FooocusClient:
+    """Fooocus 兼容接口客户端，带重试与指数退避"""
+
+    def __init__(self, base_url, timeout=300, retries=3, backoff=1.0):
+        self.url = base_url.rstrip('/') + ENDPOINT
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+
+    def generate(self, payload):
+        """提交请求，返回生成图像的原始字节"""
+        import base64
+        import time
+        from urllib.error import HTTPError, URLError
+        from urllib.request import Request, urlopen
+
+        body = json.dumps(payload).encode('utf-8')
+        for attempt in range(self.retries + 1):
+            request = Request(self.url, data=body, method='POST',
+                              headers={'Content-Type': 'application/json'})
+            try:
+                with urlopen(request, timeout=self.timeout) as response:
+                    results = json.loads(response.read())
+                return base64.b64decode(results[0]['base64'])
+            except HTTPError as e:
+                if e.code not in RETRY_STATUS or attempt == self.retries:
+                    raise
+                delay = retry_after(e.headers.get('Retry-After'))
+                if delay is None:
+                    delay = self.backoff * 2 ** attempt
+            except (URLError, OSError):
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+            time.sleep(delay)
+
+def run_queue(requests, client, cache, concurrency=2, max_pending=8):
+    """requests 为 [(路径, 请求体)]，返回 ({路径: 缓存键}, {路径: 错误})。
+    缓存命中不提交；相同请求只提交一次；未完成请求达到 max_pending 时阻塞提交方"""
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    slots = threading.BoundedSemaphore(max_pending)
+    results = {}
+    errors = {}
+    in_flight = {}   # 缓存键 -> Future
+    waiting = {}     # 缓存键 -> [路径]
+
+    def work(key, payload):
+        try:
+            cache.put(key, client.generate(payload))
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for path, payload in requests:
+            key = request_key(payload)
+            if key not in in_flight and cache.get(key) is not None:
+                results[path] = key
+                continue
+            waiting.setdefault(key, []).append(path)
+            if key not in in_flight:
+                slots.acquire()
+                in_flight[key] = executor.submit(work, key, payload)
+        for key, future in in_flight.items():
+            error = future.exception()
+            for path in waiting[key]:
+                if error is None:
+                    results[path] = key
+                else:
+                    errors[path] = error
+    return results, errors
+
+def fit_image(data, width, height):
+    """居中裁剪到目标宽高比后缩放，返回 RGBA 图像"""
+    import io
+    from PIL import Image
+    img = Image.open(io.BytesIO(data)).convert('RGBA')
+    scale = max(width / img.width, height / img.height)
+    crop_w, crop_h = round(width / scale), round(height / scale)
+    left, top = (img.width - crop_w) // 2, (img.height - crop_h) // 2
+    return img.crop((left, top, left + crop_w, top + crop_h)).resize((width, height), Image.LANCZOS)
+
+def load_generated(key, width, height):
+    """读取已生成的图像并适配任务尺寸"""
+    from build_cache import DirectoryCache
+    data = DirectoryCache(GENERATED_DIR).get(key)
+    if data is None:
+        raise FileNotFoundError(f"生成结果不存在: {key}（重新运行 fooocus_queue.py generate）")
+    return fit_image(data, width, height)
+
+def load_results():
+    """读取结果登记 {路径: {key, category, name, width, height}}"""
+    if not RESULTS_FILE.exists():
+        return {}
+    with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def asset_jobs(config):
+    """已生成的素材任务（覆盖同路径的占位图任务）"""
+    jobs = []
+    for path, entry in load_results().items():
+        jobs.append({'path': path, 'category': entry['category'], 'name': entry['name'],
+                     'size': max(entry['width'], entry['height']),
+                     'width': entry['width'], 'height': entry['height'],
+                     'func': 'load_generated', 'args': (entry['key'], entry['width'], entry['height']),
+                     'overrides': True})
+    return jobs
+
+def select_targets(graph, args):
+    """按参数挑选要生成的任务；默认只选占位图任务"""
+    targets = []
+    for path, job in graph.items():
+        # 已由其他模块显式替换的素材（九宫格、平铺纹理等）不再生成，否则两者冲突
+        if job['module'] == MODULE_NAME or job.get('overrides') or Path(path).suffix.lower() != '.png':
+            continue
+        if not args.all and job['module'] != 'generate_placeholder_assets':
+            continue
+        if args.category and job['category'] != args.category:
+            continue
+        if args.path and not fnmatch(path, args.path):
+            continue
+        targets.append(job)
+    return targets[:args.limit] if args.limit else targets
+
+def generate(args):
+    """generate 命令"""
+    from build_cache import DirectoryCache
+
+    config = asset_graph.load_config()
+    modules = {name: asset_graph.load_generator(name) for name in asset_graph.GENERATOR_MODULES
+               if name != MODULE_NAME}
+    targets = select_targets(asset_graph.build_asset_graph(config, modules), args)
+    requests = [(job['path'], build_request(job, config)) for job in targets]
+    if args.dry_run:
+        for path, payload in requests:
+            print(f"{request_key(payload)[:12]}  {path}\n    {payload['prompt']}")
+        return
+
+    print(f"=== Fooocus 批量生成 ===\n接口 {args.url}，{len(requests)} 个素材，并发 {args.concurrency}")
+    cache = DirectoryCache(GENERATED_DIR)
+    client = FooocusClient(args.url, retries=args.retries)
+    results, errors = run_queue(requests, client, cache, args.concurrency, args.max_pending)
+
+    registry = load_results()
+    for job in targets:
+        if job['path'] in results:
+            width, height = job_dimensions(job)
+            registry[job['path']] = {'key': results[job['path']], 'category': job['category'],
+                                     'name': job['name'], 'width': width, 'height': height}
+    GENERATED_DIR.mkdir(parents=True, exist_ok=True)
+    with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+    for path, error in errors.items():
+        print(f"❌ {path}: {error}")
+    print(f"✅ 完成 {len(results)} / {len(requests)}，登记于 {RESULTS_FILE}")
+    if errors:
+        raise SystemExit(1)
+
+def make_mock_handler(fail_rate, latency, max_inflight):
+    """替身服务：按提示词与种子绘制确定性的渐变图，模拟失败与过载"""
+    import random
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler
+
+    lock = threading.Lock()
+    state = {'inflight': 0}
+
+    def render(payload):
+        import base64
+        import io
+        from PIL import Image, ImageDraw
+        width, height = (int(value) for value in payload['aspect_ratios_selection'].split('*'))
+        digest = hashlib.sha1(f"{payload['prompt']}|{payload['image_seed']}".encode('utf-8')).digest()
+        img = Image.linear_gradient('L').resize((width // 8, height // 8))
+        img = Image.merge('RGB', [img.point(lambda v, c=c: (v * c) // 255) for c in digest[:3]])
+        draw = ImageDraw.Draw(img)
+        draw.ellipse([img.width // 4, img.height // 4, img.width * 3 // 4, img.height * 3 // 4],
+                     fill=tuple(digest[3:6]))
+        buffer = io.BytesIO()
+        img.resize((width, height)).save(buffer, format='PNG')
+        return base64.b64encode(buffer.getvalue()).decode('ascii')
+
+    class MockHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != ENDPOINT:
+                self._send(404, {'detail': 'not found'})
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            with lock:
+                busy = state['inflight'] >= max_inflight
+                if not busy:
+                    state['inflight'] += 1
+            if busy:
+                self._send(429, {'detail': 'queue full'}, {'Retry-After': '1'})
+                return
+            try:
+                time.sleep(latency)
+                if random.random() < fail_rate:
+                    self._send(503, {'detail': 'worker error'})
+                    return
+                self._send(200, [{'base64': render(payload), 'seed': str(payload['image_seed']),
+                                  'finish_reason': 'SUCCESS'}])
+            finally:
+                with lock:
+                    state['inflight'] -= 1
+
+        def _send(self, status, body, headers=None):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockHandler
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='Fooocus 批量生成队列')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    gen = sub.add_parser('generate', help='提交生成任务')
+    gen.add_argument('--url', default=os.environ.get(FOOOCUS_ENV, DEFAULT_URL),
+                     help=f'Fooocus 接口地址（默认读取 {FOOOCUS_ENV}）')
+    gen.add_argument('--concurrency', type=int, default=2, help='同时进行的请求数')
+    gen.add_argument('--max-pending', type=int, default=8, help='未完成请求数上限（背压）')
+    gen.add_argument('--retries', type=int, default=3, help='单个请求的重试次数')
+    gen.add_argument('--all', action='store_true', help='包括已有程序化渲染器的素材')
+    gen.add_argument('--category', help='只生成指定类别')
+    gen.add_argument('--path', help='只生成匹配的路径（fnmatch 模式）')
+    gen.add_argument('--limit', type=int, help='最多生成的数量')
+    gen.add_argument('--dry-run', action='store_true', help='只打印提示词')
+
+    mock = sub.add_parser('mock', help='启动本地替身服务')
+    mock.add_argument('--host', default='127.0.0.1')
+    mock.add_argument('--port', type=int, default=8888)
+    mock.add_argument('--fail-rate', type=float, default=0.0, help='随机返回 503 的比例')
+    mock.add_argument('--latency', type=float, default=0.2, help='每次生成的耗时（秒）')
+    mock.add_argument('--max-inflight', type=int, default=2, help='超过时返回 429')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        generate(args)
+        return
+
+    from http.server import ThreadingHTTPServer
+    server = ThreadingHTTPServer((args.host, args.port),
+                                 make_mock_handler(args.fail_rate, args.latency, args.max_inflight))
+    print(f"🌐 Fooocus 替身服务: http://{args.host}:{server.server_address[1]}{ENDPOINT}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n已停止")
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,125 @@
 """
 
 import os
-import sys
-import subprocess
-from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
-import colorsys
+from functools import lru_cache, partial
+
+# Pillow 在渲染函数内按需导入，列出任务、查看状态等命令无需加载图像库
+
+# 图标类素材尺寸（UI、角色、道具）
+ICON_SIZES = [64, 128, 256]
+
+# 场景背景尺寸
+SCENE_SIZES = [512, 1024, 2048]
+
+# 场景生成时每个工作进程的默认内存预算（MB）
+DEFAULT_WORKER_MEMORY_MB = 64
+
+# SDF 图标：以 SDF_SOURCE_SIZE 绘制蒙版计算距离场，缩小为 SDF_CELL_SIZE 的单元，
+# 距离截断为 SDF_SPREAD 像素（按单元尺寸计）
+SDF_SOURCE_SIZE = 256
+SDF_CELL_SIZE = 64
+SDF_SPREAD = 4
+SDF_PADDING = 2
+SDF_ATLAS_PATH = 'UI/SDF/ui_icons_sdf.png'
+
+UI_ASSETS = {
+    'gold_coin': {'color': '#FFD700', 'text': '金'},
+    'diamond': {'color': '#4169E1', 'text': '钻'},
+    'coffee_cup': {'color': '#8B4513', 'text': '咖'},
+    'fish': {'color': '#87CEEB', 'text': '鱼'},
+    'settings': {'color': '#808080', 'text': '设'},
+    'help': {'color': '#32CD32', 'text': '?'},
+    'close': {'color': '#DC143C', 'text': 'X'},
+    'back': {'color': '#4682B4', 'text': '←'},
+}
+
+CAT_VARIANTS = {
+    'orange_cat': {'body': '#FFA500', 'accent': '#FF8C00'},
+    'white_cat': {'body': '#F5F5F5', 'accent': '#E0E0E0'},
+    'black_cat': {'body': '#2F2F2F', 'accent': '#1C1C1C'},
+    'gray_cat': {'body': '#808080', 'accent': '#696969'},
+    'sakura_cat': {'body': '#FFB6C1', 'accent': '#FF69B4'},
+    'princess_cat': {'body': '#DDA0DD', 'accent': '#9370DB'},
+}
+
+# 猫咪区域（标签图中的序号即下标，0 为背景）；accent 为预留区域，当前底图未绘制
+CAT_REGIONS = ('background', 'body', 'accent', 'eyes', 'nose')
+
+# 配色中未给出的区域颜色
+CAT_REGION_DEFAULTS = {'eyes': '#90EE90', 'nose': '#FFB6C1'}
+
+# 按色相派生配色时的基准猫
+CAT_HUE_BASE = 'orange_cat'
+
+ITEM_ASSETS = {
+    'coffee_beans': {'color': '#8B4513', 'text': '豆'},
+    'milk': {'color': '#FFFAF0', 'text': '奶'},
+    'sugar': {'color': '#FFFFFF', 'text': '糖'},
+    'cat_cookie': {'color': '#DEB887', 'text': '饼'},
+    'skill_book': {'color': '#4169E1', 'text': '书'},
+    'destiny_watch': {'color': '#FFD700', 'text': '表'},
+}
+
+SCENE_BACKGROUNDS = {
+    'coffee_shop_bg': ((255, 248, 220), (222, 184, 135)),  # 米色到棕色
+    'fishing_area_bg': ((135, 206, 235), (70, 130, 180)),  # 天蓝到钢蓝
+    'main_menu_bg': ((255, 239, 213), (255, 218, 185)),     # 桃色渐变
+}
 
 def ensure_dir(path):
     """确保目录存在"""
     os.makedirs(path, exist_ok=True)
 
-def create_simple_icon(size, color, text, output_path):
-    """创建简单的图标"""
+# 图标文字字体：环境变量指定字体文件，设为 PILLOW_DEFAULT_FONT 时固定使用 Pillow 自带字体
+# （金标准检查据此固定字体，结果与机器上是否安装 Arial 无关）
+FONT_ENV = 'CATCAFE_ASSET_FONT'
+PILLOW_DEFAULT_FONT = 'default'
+
+@lru_cache(maxsize=None)
+def system_fonts():
+    """系统字体目录中的字体文件 {文件名: 路径}（查找范围与 Pillow 的 ImageFont.truetype 一致）"""
+    import sys
+    if sys.platform == 'win32':
+        dirs = [os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts')]
+    elif sys.platform == 'darwin':
+        dirs = ['/Library/Fonts', '/System/Library/Fonts', os.path.expanduser('~/Library/Fonts')]
+    else:
+        data_dirs = [os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share'),
+                     *(os.environ.get('XDG_DATA_DIRS') or '/usr/share').split(':')]
+        dirs = [os.path.join(directory, 'fonts') for directory in data_dirs]
+    found = {}
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                found.setdefault(name, os.path.join(root, name))
+    return found
+
+def find_font(name):
+    """按 ImageFont.truetype 的顺序定位字体文件：先按路径，再按文件名在系统字体目录中查找"""
+    if os.path.isfile(name):
+        return os.path.abspath(name)
+    return system_fonts().get(name)
+
+def resolved_font():
+    """get_font 使用的字体文件，None 为 Pillow 自带字体"""
+    pinned = os.environ.get(FONT_ENV)
+    if pinned == PILLOW_DEFAULT_FONT:
+        return None
+    path = find_font(pinned or "arial.ttf")
+    if path is None and pinned:
+        raise SystemExit(f"无法加载 {FONT_ENV} 指定的字体: {pinned}")
+    return path
+
+@lru_cache(maxsize=None)
+def get_font(font_size):
+    """按字号加载字体并缓存，避免每个图标重复读取字体文件"""
+    from PIL import ImageFont
+    path = resolved_font()
+    return ImageFont.truetype(path, font_size) if path else ImageFont.load_default()
+
+def render_simple_icon(size, color, text):
+    """在内存中绘制简单的图标"""
+    from PIL import Image, ImageDraw
     img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
     
@@ -26,11 +133,7 @@ def create_simple_icon(size, color, text, output_path):
     
     # 添加文字
     if text:
-        try:
-            font_size = size // 6
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except:
-            font = ImageFont.load_default()
+        font = get_font(size // 6)
         
         bbox = draw.textbbox((0, 0), text, font=font)
         text_width = bbox[2] - bbox[0]
@@ -41,13 +144,113 @@ def create_simple_icon(size, color, text, output_path):
         
         draw.text((x, y), text, fill='white', font=font)
     
-    img.save(output_path)
+    return img
+
+def outline_font():
+    """get_outline_font 使用的矢量字体文件，均未安装时为 None"""
+    for font_name in ("arial.ttf", "DejaVuSans-Bold.ttf"):
+        path = find_font(font_name)
+        if path:
+            return path
+    return None
+
+@lru_cache(maxsize=None)
+def get_outline_font(font_size):
+    """SDF 蒙版用的矢量字体：位图默认字体无法缩放，缩小后笔画会丢失"""
+    from PIL import ImageFont
+    path = outline_font()
+    if path:
+        return ImageFont.truetype(path, font_size)
+    try:
+        return ImageFont.load_default(font_size)  # Pillow >= 10.1
+    except TypeError:
+        return ImageFont.load_default()
+
+def render_icon_mask(size, text):
+    """绘制 render_simple_icon 的单色形状蒙版：圆形为 255，文字镂空为 0"""
+    from PIL import Image, ImageDraw
+    mask = Image.new('L', (size, size), 0)
+    draw = ImageDraw.Draw(mask)
+    
+    margin = size // 10
+    draw.ellipse([margin, margin, size-margin, size-margin], fill=255)
+    
+    if text:
+        font = get_outline_font(size // 6)
+        bbox = draw.textbbox((0, 0), text, font=font)
+        x = (size - (bbox[2] - bbox[0])) // 2
+        y = (size - (bbox[3] - bbox[1])) // 2
+        draw.text((x, y), text, fill=0, font=font)
+    
+    return mask
+
+def sdf_atlas_layout():
+    """SDF 图集布局：返回 (页面边长, {图标名: (x, y, w, h)})，页面取能放下全部单元的最小 2 的幂"""
+    from asset_sinks import pack_shelves
+    sizes = {name: (SDF_CELL_SIZE, SDF_CELL_SIZE) for name in UI_ASSETS}
+    page_size = 1
+    while page_size < SDF_CELL_SIZE + SDF_PADDING * 2:
+        page_size *= 2
+    while True:
+        try:
+            pages = pack_shelves(sizes, page_size, SDF_PADDING)
+        except ValueError:
+            pages = []
+        if len(pages) == 1:
+            return page_size, pages[0]
+        page_size *= 2
+
+def sdf_atlas_metadata():
+    """SDF 图集元数据：页面尺寸、距离场参数与各图标的帧"""
+    page_size, frames = sdf_atlas_layout()
+    return {'pageSize': page_size, 'cellSize': SDF_CELL_SIZE, 'distanceRange': SDF_SPREAD, 'threshold': 0.5,
+            'frames': {name: {'x': x, 'y': y, 'w': w, 'h': h, 'color': UI_ASSETS[name]['color']}
+                       for name, (x, y, w, h) in frames.items()}}
+
+def render_sdf_icon_atlas():
+    """每个 UI 图标只渲染一次距离场，合成单通道图集"""
+    from PIL import Image
+    import sdf_icons
+    page_size, frames = sdf_atlas_layout()
+    page = Image.new('L', (page_size, page_size), 0)
+    for name, (x, y, _, _) in frames.items():
+        mask = render_icon_mask(SDF_SOURCE_SIZE, UI_ASSETS[name]['text'])
+        page.paste(sdf_icons.render_sdf(mask, SDF_CELL_SIZE, SDF_SPREAD), (x, y))
+    return page
+
+def write_sdf_metadata():
+    """写出 SDF 图集元数据（与图集同名的 .json）"""
+    import json
+    metadata_path = SDF_ATLAS_PATH.replace('.png', '.json')
+    ensure_dir(os.path.dirname(metadata_path))
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(sdf_atlas_metadata(), f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Created: {metadata_path}")
+
+def generate_sdf_icon_atlas():
+    """生成 SDF 图标图集与元数据（替代每个图标三种尺寸的位图）"""
+    print("生成SDF图标图集...")
+    
+    page = render_sdf_icon_atlas()
+    ensure_dir(os.path.dirname(SDF_ATLAS_PATH))
+    page.save(SDF_ATLAS_PATH, optimize=True)
+    print(f"Created: {SDF_ATLAS_PATH}")
+    write_sdf_metadata()
+    print(f"{len(UI_ASSETS)} 个图标: {len(UI_ASSETS) * len(ICON_SIZES)} 张位图 → 1 张 "
+          f"{page.width}x{page.height} 单通道图集")
+
+def create_simple_icon(size, color, text, output_path):
+    """创建简单的图标"""
+    render_simple_icon(size, color, text).save(output_path)
     print(f"Created: {output_path}")
 
-def create_cat_icon(size, color_scheme, output_path):
-    """创建猫咪图标"""
-    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+@lru_cache(maxsize=None)
+def render_cat_regions(size):
+    """绘制猫咪区域标签图（P 模式，像素值为 CAT_REGIONS 中的序号，0 为透明背景），按尺寸缓存"""
+    from PIL import Image, ImageDraw
+    img = Image.new('P', (size, size), 0)
     draw = ImageDraw.Draw(img)
+    body, eyes, nose = (CAT_REGIONS.index(name) for name in ('body', 'eyes', 'nose'))
     
     center = size // 2
     
@@ -55,7 +258,7 @@ def create_cat_icon(size, color_scheme, output_path):
     head_radius = size // 3
     draw.ellipse([center - head_radius, center - head_radius, 
                   center + head_radius, center + head_radius], 
-                 fill=color_scheme['body'])
+                 fill=body)
     
     # 猫耳朵
     ear_size = head_radius // 2
@@ -63,134 +266,232 @@ def create_cat_icon(size, color_scheme, output_path):
     draw.polygon([center - head_radius + ear_size//2, center - head_radius,
                   center - head_radius//2, center - head_radius - ear_size,
                   center - head_radius//4, center - head_radius], 
-                 fill=color_scheme['body'])
+                 fill=body)
     # 右耳
     draw.polygon([center + head_radius//4, center - head_radius,
                   center + head_radius//2, center - head_radius - ear_size,
                   center + head_radius - ear_size//2, center - head_radius], 
-                 fill=color_scheme['body'])
+                 fill=body)
     
     # 眼睛
     eye_size = size // 20
     draw.ellipse([center - head_radius//2, center - head_radius//3,
                   center - head_radius//2 + eye_size*2, center - head_radius//3 + eye_size*3],
-                 fill='#90EE90')
+                 fill=eyes)
     draw.ellipse([center + head_radius//2 - eye_size*2, center - head_radius//3,
                   center + head_radius//2, center - head_radius//3 + eye_size*3],
-                 fill='#90EE90')
+                 fill=eyes)
     
     # 鼻子
     nose_size = size // 40
     draw.polygon([center, center,
                   center - nose_size, center + nose_size,
                   center + nose_size, center + nose_size],
-                 fill='#FFB6C1')
+                 fill=nose)
     
-    img.save(output_path)
+    return img
+
+def recolor_regions(regions, color_scheme):
+    """按区域调色板（LUT）整图着色：一次 P -> RGBA 转换，不重新绘制"""
+    from PIL import ImageColor
+    palette = [0, 0, 0, 0]
+    for name in CAT_REGIONS[1:]:
+        color = color_scheme.get(name) or CAT_REGION_DEFAULTS.get(name) or color_scheme['body']
+        palette.extend(ImageColor.getrgb(color)[:3] + (255,))
+    img = regions.copy()
+    img.putpalette(palette, 'RGBA')
+    return img.convert('RGBA')
+
+def render_cat_icon(size, color_scheme):
+    """在内存中绘制猫咪图标：缓存的区域标签图 + 配色查找表"""
+    return recolor_regions(render_cat_regions(size), color_scheme)
+
+def hue_shift(color, degrees):
+    """将颜色在 HSV 色相上旋转 degrees 度"""
+    import colorsys
+    from PIL import ImageColor
+    r, g, b = (value / 255 for value in ImageColor.getrgb(color)[:3])
+    h, s, v = colorsys.rgb_to_hsv(r, g, b)
+    r, g, b = colorsys.hsv_to_rgb((h + degrees / 360) % 1, s, v)
+    return '#{:02X}{:02X}{:02X}'.format(*(round(value * 255) for value in (r, g, b)))
+
+def cat_color_scheme(spec):
+    """配色定义 -> 各区域颜色；{'hue': 度数} 表示由 CAT_HUE_BASE 旋转色相，其余字段直接覆盖"""
+    scheme = {}
+    if 'hue' in spec:
+        base = CAT_VARIANTS[CAT_HUE_BASE]
+        scheme = {name: hue_shift(color, spec['hue']) for name, color in base.items()}
+    scheme.update({name: color for name, color in spec.items() if name in CAT_REGIONS})
+    return scheme
+
+def cat_variants(config=None):
+    """全部猫咪配色：CAT_VARIANTS 加上 art_config.json 中 characters.cats.colors 的配色"""
+    variants = dict(CAT_VARIANTS)
+    colors = (config or {}).get('characters', {}).get('cats', {}).get('colors', {})
+    for cat_name, spec in colors.items():
+        variants[cat_name] = cat_color_scheme(spec)
+    return variants
+
+def render_cat_sprite(size, color_scheme, effects):
+    """猫咪图标 + 烘焙的稀有度效果（辉光、闪光等，见 sprite_effects）"""
+    import sprite_effects
+    return sprite_effects.apply_effects(render_cat_icon(size, color_scheme), effects)
+
+def create_cat_icon(size, color_scheme, output_path, effects=()):
+    """创建猫咪图标"""
+    if effects:
+        render_cat_sprite(size, color_scheme, effects).save(output_path)
+    else:
+        render_cat_icon(size, color_scheme).save(output_path)
     print(f"Created: {output_path}")
 
 def generate_ui_assets():
     """生成UI素材"""
     print("生成UI素材...")
     
-    ui_assets = {
-        'gold_coin': {'color': '#FFD700', 'text': '金'},
-        'diamond': {'color': '#4169E1', 'text': '钻'},
-        'coffee_cup': {'color': '#8B4513', 'text': '咖'},
-        'fish': {'color': '#87CEEB', 'text': '鱼'},
-        'settings': {'color': '#808080', 'text': '设'},
-        'help': {'color': '#32CD32', 'text': '?'},
-        'close': {'color': '#DC143C', 'text': 'X'},
-        'back': {'color': '#4682B4', 'text': '←'},
-    }
-    
-    sizes = [64, 128, 256]
-    
-    for asset_name, config in ui_assets.items():
-        for size in sizes:
+    for asset_name, config in UI_ASSETS.items():
+        for size in ICON_SIZES:
             output_dir = f"UI/{asset_name}"
             ensure_dir(output_dir)
             output_path = f"{output_dir}/{asset_name}_{size}.png"
             create_simple_icon(size, config['color'], config['text'], output_path)
 
-def generate_cat_assets():
+def load_art_config():
+    """读取同目录的 art_config.json，不存在时为空配置"""
+    import json
+    config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'art_config.json')
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def generate_cat_assets(config=None):
     """生成猫咪素材"""
+    import sprite_effects
     print("生成猫咪素材...")
     
-    cat_variants = {
-        'orange_cat': {'body': '#FFA500', 'accent': '#FF8C00'},
-        'white_cat': {'body': '#F5F5F5', 'accent': '#E0E0E0'},
-        'black_cat': {'body': '#2F2F2F', 'accent': '#1C1C1C'},
-        'gray_cat': {'body': '#808080', 'accent': '#696969'},
-        'sakura_cat': {'body': '#FFB6C1', 'accent': '#FF69B4'},
-        'princess_cat': {'body': '#DDA0DD', 'accent': '#9370DB'},
-    }
-    
-    sizes = [64, 128, 256]
-    
-    for cat_name, colors in cat_variants.items():
-        for size in sizes:
+    for cat_name, colors in cat_variants(config).items():
+        for size in ICON_SIZES:
             output_dir = f"Characters/Cats/{cat_name}"
             ensure_dir(output_dir)
             output_path = f"{output_dir}/{cat_name}_{size}.png"
-            create_cat_icon(size, colors, output_path)
+            create_cat_icon(size, colors, output_path, sprite_effects.rarity_effects(config, cat_name, size))
 
 def generate_item_assets():
     """生成道具素材"""
     print("生成道具素材...")
     
-    item_assets = {
-        'coffee_beans': {'color': '#8B4513', 'text': '豆'},
-        'milk': {'color': '#FFFAF0', 'text': '奶'},
-        'sugar': {'color': '#FFFFFF', 'text': '糖'},
-        'cat_cookie': {'color': '#DEB887', 'text': '饼'},
-        'skill_book': {'color': '#4169E1', 'text': '书'},
-        'destiny_watch': {'color': '#FFD700', 'text': '表'},
-    }
-    
-    sizes = [64, 128, 256]
-    
-    for item_name, config in item_assets.items():
-        for size in sizes:
+    for item_name, config in ITEM_ASSETS.items():
+        for size in ICON_SIZES:
             output_dir = f"Items/{item_name}"
             ensure_dir(output_dir)
             output_path = f"{output_dir}/{item_name}_{size}.png"
             create_simple_icon(size, config['color'], config['text'], output_path)
 
-def generate_scene_backgrounds():
-    """生成场景背景"""
+def gradient_row_color(y, size, color1, color2):
+    """第 y 行的渐变颜色"""
+    ratio = y / size
+    r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
+    g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
+    b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
+    return r, g, b
+
+def render_gradient_strip(size, color1, color2, y0, y1):
+    """在内存中绘制纵向渐变背景的 [y0, y1) 行条带"""
+    from PIL import Image
+    rows = b''.join(bytes(gradient_row_color(y, size, color1, color2)) * size for y in range(y0, y1))
+    return Image.frombytes('RGB', (size, y1 - y0), rows)
+
+def render_gradient_background(size, color1, color2):
+    """在内存中绘制纵向渐变背景"""
+    return render_gradient_strip(size, color1, color2, 0, size)
+
+def create_gradient_background(size, color1, color2, output_path):
+    """创建纵向渐变背景"""
+    render_gradient_background(size, color1, color2).save(output_path)
+    print(f"Created: {output_path}")
+
+def stream_gradient_background(size, color1, color2, output_path, strip_budget):
+    """按条带流式写出渐变背景，峰值内存不超过 strip_budget 字节"""
+    import png_stream
+    render_strip = partial(render_gradient_strip, size, color1, color2)
+    png_stream.stream_render(output_path, size, size, 'RGB', render_strip, strip_budget)
+    print(f"Created: {output_path}")
+    return output_path
+
+def generate_scene_backgrounds(worker_memory_mb=DEFAULT_WORKER_MEMORY_MB, memory_limit_mb=None):
+    """生成场景背景：流式编码，并发进程数同时受 CPU 核数与内存预算限制"""
+    import png_stream
     print("生成场景背景...")
     
-    def create_gradient_background(size, color1, color2, output_path):
-        img = Image.new('RGB', (size, size))
-        draw = ImageDraw.Draw(img)
-        
-        for y in range(size):
-            # 计算渐变
-            ratio = y / size
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            
-            draw.line([(0, y), (size, y)], fill=(r, g, b))
-        
-        img.save(output_path)
-        print(f"Created: {output_path}")
-    
-    backgrounds = {
-        'coffee_shop_bg': ((255, 248, 220), (222, 184, 135)),  # 米色到棕色
-        'fishing_area_bg': ((135, 206, 235), (70, 130, 180)),  # 天蓝到钢蓝
-        'main_menu_bg': ((255, 239, 213), (255, 218, 185)),     # 桃色渐变
-    }
-    
-    sizes = [512, 1024, 2048]
-    
-    for bg_name, (color1, color2) in backgrounds.items():
-        for size in sizes:
+    worker_budget = worker_memory_mb * 1024 * 1024
+    strip_budget = max(0, worker_budget - png_stream.WORKER_BASELINE_BYTES)
+    tasks = []
+    for bg_name, (color1, color2) in SCENE_BACKGROUNDS.items():
+        for size in SCENE_SIZES:
             output_dir = f"Scenes/{bg_name}"
             ensure_dir(output_dir)
             output_path = f"{output_dir}/{bg_name}_{size}.png"
-            create_gradient_background(size, color1, color2, output_path)
+            tasks.append((size, color1, color2, output_path, strip_budget))
+    
+    memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+    workers = png_stream.max_workers(worker_budget, len(tasks), memory_limit)
+    print(f"场景并发: {workers} 个进程，每进程内存预算 {worker_memory_mb} MB")
+    if workers == 1:
+        for task in tasks:
+            stream_gradient_background(*task)
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # 先提交大尺寸，缩短整体耗时
+        tasks.sort(key=lambda task: -task[0])
+        list(pool.map(stream_gradient_background, *zip(*tasks)))
+
+def asset_jobs(config=None):
+    """列出本脚本生成的全部素材任务（路径相对 Art 目录）"""
+    import sprite_effects
+    jobs = []
+    for asset_name, spec in UI_ASSETS.items():
+        for size in ICON_SIZES:
+            path = f"UI/{asset_name}/{asset_name}_{size}.png"
+            jobs.append({'path': path, 'category': 'ui', 'name': asset_name, 'size': size,
+                         'func': 'render_simple_icon', 'args': (size, spec['color'], spec['text'])})
+    for cat_name, colors in cat_variants(config).items():
+        for size in ICON_SIZES:
+            path = f"Characters/Cats/{cat_name}/{cat_name}_{size}.png"
+            job = {'path': path, 'category': 'cats', 'name': cat_name, 'size': size,
+                   'func': 'render_cat_icon', 'args': (size, colors)}
+            # 稀有度带辉光/闪光的猫咪在生成时烘焙效果
+            effects = sprite_effects.rarity_effects(config, cat_name, size)
+            if effects:
+                job.update(func='render_cat_sprite', args=(size, colors, effects))
+            jobs.append(job)
+    for item_name, spec in ITEM_ASSETS.items():
+        for size in ICON_SIZES:
+            path = f"Items/{item_name}/{item_name}_{size}.png"
+            jobs.append({'path': path, 'category': 'items', 'name': item_name, 'size': size,
+                         'func': 'render_simple_icon', 'args': (size, spec['color'], spec['text'])})
+    # SDF 图集自成一类（ui.sdf），--sdf 模式下替代 ui 类的图标位图；自带帧布局，不再打入流水线图集
+    metadata = sdf_atlas_metadata()
+    jobs.append({'path': SDF_ATLAS_PATH, 'category': 'ui.sdf', 'name': 'ui_icons_sdf',
+                 'size': metadata['pageSize'], 'func': 'render_sdf_icon_atlas', 'args': (),
+                 'atlas': False, 'sdf': metadata})
+    for bg_name, (color1, color2) in SCENE_BACKGROUNDS.items():
+        for size in SCENE_SIZES:
+            path = f"Scenes/{bg_name}/{bg_name}_{size}.png"
+            jobs.append({'path': path, 'category': 'scenes', 'name': bg_name, 'size': size,
+                         'func': 'render_gradient_background', 'args': (size, color1, color2),
+                         'strip_func': 'render_gradient_strip', 'mode': 'RGB'})
+    return jobs
+
+def job_font(job):
+    """任务绘制文字所用的字体文件（计入构建缓存键），不含文字时为 None"""
+    if job['func'] == 'render_sdf_icon_atlas':
+        return outline_font()
+    if job['func'] == 'render_simple_icon' and job['args'][2]:
+        return resolved_font()
+    return None
 
 def create_directory_structure():
     """创建完整的目录结构"""
@@ -345,17 +646,46 @@ const fallbackPaths = resourceManager.getAssetPathsWithFallback('cats', 'orange_
 
 def main():
     """主函数"""
+    import argparse
+    parser = argparse.ArgumentParser(description='生成 UI/角色/道具/场景素材')
+    parser.add_argument('--worker-memory-mb', type=int, default=DEFAULT_WORKER_MEMORY_MB,
+                        help='场景生成时每个工作进程的内存预算（MB）')
+    parser.add_argument('--memory-limit-mb', type=int, default=None,
+                        help='场景生成可用的总内存（MB），默认读取系统/cgroup 可用内存')
+    parser.add_argument('--sdf', action='store_true',
+                        help='UI 图标改为生成单张 SDF 图集（单通道距离场，任意尺寸清晰缩放）')
+    parser.add_argument('--cache', default=os.environ.get('CATCAFE_ASSET_CACHE'),
+                        help='构建缓存目录或 HTTP 地址（默认读取 CATCAFE_ASSET_CACHE）')
+    args = parser.parse_args()
+    
     print("=== 素材生成脚本 ===")
     print("正在生成《猫咪咖啡馆与外卖江湖》游戏素材...")
     
     # 创建目录结构
     create_directory_structure()
     
-    # 生成各类素材
-    generate_ui_assets()
-    generate_cat_assets()
-    generate_item_assets()
-    generate_scene_backgrounds()
+    # 生成各类素材（启用缓存时命中的素材直接取回，不再渲染）
+    if args.cache:
+        import sys
+        import build_cache
+        import png_stream
+        from asset_sinks import FileSink
+        # 场景背景未命中时仍按单进程内存预算流式写出；SDF 模式以 SDF 图集（ui.sdf）替代 UI 图标位图（ui）
+        strip_budget = max(0, args.worker_memory_mb * 1024 * 1024 - png_stream.WORKER_BASELINE_BYTES)
+        build_cache.build_with_cache(sys.modules[__name__], load_art_config(), build_cache.open_cache(args.cache),
+                                     FileSink('.'), exclude=('ui',) if args.sdf else ('ui.sdf',),
+                                     stream_budget=strip_budget)
+        if args.sdf:
+            write_sdf_metadata()
+    else:
+        # SDF 模式下 UI 图标由单张距离场图集提供
+        if args.sdf:
+            generate_sdf_icon_atlas()
+        else:
+            generate_ui_assets()
+        generate_cat_assets(load_art_config())
+        generate_item_assets()
+        generate_scene_backgrounds(args.worker_memory_mb, args.memory_limit_mb)
     
     # 创建使用指南
     create_usage_guide()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+金标准图像回归检查
+在内存中渲染 GOLDEN_MODULES 的全部素材（不写盘），与 golden/ 下的参考图比对：
+generate_assets（含 SDF 图集）、九宫格、按钮状态条带、本地化文字素材（只取 GOLDEN_LANGUAGES）与平铺纹理。
+比对使用感知差异：逐像素通道差取最大值，经轻微模糊抵消抗锯齿抖动后，
+统计平均差异与超阈像素比例，按素材类别分别设定容差。
+渲染与更新参考图时固定使用 Pillow 自带字体（含本地化素材），不受本机安装了哪些字体影响。
+
+用法:
+  python golden_check.py --update      # 以当前渲染结果作为参考图
+  python golden_check.py               # 比对，失败时生成 golden_diff/index.html
+"""
+
+import argparse
+import html
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps, ImageStat
+
+import asset_graph
+from asset_sinks import decode_image, encode_png
+
+GOLDEN_DIR = asset_graph.ART_DIR / 'golden'
+GALLERY_DIR = asset_graph.ART_DIR / 'golden_diff'
+
+# 参与比对的生成模块
+GOLDEN_MODULES = ['generate_assets', 'nine_slice', 'button_states', 'localized_assets', 'tileable_textures']
+
+# 参与比对的本地化语言（CJK 语言需要 CJK 字体，无法以 Pillow 自带字体固定）
+GOLDEN_LANGUAGES = ['en-US']
+
+# 差异值超过该阈值（0-255）的像素记为“可见差异”
+PIXEL_THRESHOLD = 24
+
+# 按类别的容差：mean 为平均感知差异上限，ratio 为可见差异像素比例上限
+TOLERANCES = {
+    'ui': {'mean': 1.0, 'ratio': 0.005},      # 含文字，字体栅格化差异较大
+    'ui.en-US': {'mean': 1.0, 'ratio': 0.005},
+    'items': {'mean': 1.0, 'ratio': 0.005},
+    'cats': {'mean': 0.5, 'ratio': 0.002},
+    'scenes': {'mean': 0.5, 'ratio': 0.0},    # 纯渐变，应逐像素一致
+}
+DEFAULT_TOLERANCE = {'mean': 0.5, 'ratio': 0.001}
+
+def perceptual_diff(expected, actual):
+    """返回 (平均差异, 可见差异像素比例, 差异图)"""
+    expected = expected.convert('RGBA')
+    actual = actual.convert('RGBA')
+    diff = ImageChops.difference(expected, actual)
+    r, g, b, a = diff.split()
+    diff = ImageChops.lighter(ImageChops.lighter(r, g), ImageChops.lighter(b, a))
+    diff = diff.filter(ImageFilter.BoxBlur(1))
+
+    histogram = diff.histogram()
+    visible = sum(histogram[PIXEL_THRESHOLD + 1:])
+    ratio = visible / (diff.width * diff.height)
+    return ImageStat.Stat(diff).mean[0], ratio, diff
+
+def check_job(job, golden_dir, update):
+    """渲染并比对单个素材，返回结果字典（在工作进程中执行）"""
+    module = asset_graph.load_generator(job['module'])
+    actual = decode_image(asset_graph.render_image(job, module))
+    golden_path = Path(golden_dir) / job['path']
+
+    if update:
+        golden_path.parent.mkdir(parents=True, exist_ok=True)
+        actual.save(golden_path)
+        return {'path': job['path'], 'status': 'updated'}
+
+    if not golden_path.exists():
+        return {'path': job['path'], 'status': 'missing'}
+
+    with Image.open(golden_path) as expected:
+        expected.load()
+    if expected.size != actual.size:
+        return {'path': job['path'], 'status': 'failed',
+                'reason': f'尺寸不一致 {expected.size} != {actual.size}',
+                'expected': encode_png(expected), 'actual': encode_png(actual)}
+
+    mean, ratio, diff = perceptual_diff(expected, actual)
+    tolerance = TOLERANCES.get(job['category'], DEFAULT_TOLERANCE)
+    result = {'path': job['path'], 'mean': mean, 'ratio': ratio}
+    if mean <= tolerance['mean'] and ratio <= tolerance['ratio']:
+        result['status'] = 'passed'
+        return result
+
+    heatmap = ImageOps.colorize(diff.point(lambda v: min(255, v * 8)), black='black', white='red')
+    result.update({'status': 'failed',
+                   'reason': f'平均差异 {mean:.3f}, 可见差异比例 {ratio:.4%}',
+                   'expected': encode_png(expected), 'actual': encode_png(actual),
+                   'diff': encode_png(heatmap)})
+    return result
+
+def write_gallery(failures, gallery_dir):
+    """将失败项的参考图、实际图与差异热力图输出为 HTML 画廊"""
+    shutil.rmtree(gallery_dir, ignore_errors=True)
+    gallery_dir.mkdir(parents=True)
+    rows = []
+    for index, result in enumerate(failures):
+        cells = []
+        for kind in ('expected', 'actual', 'diff'):
+            if kind in result:
+                name = f'{index:03d}_{kind}.png'
+                (gallery_dir / name).write_bytes(result[kind])
+                cells.append(f'<td><img src="{name}" style="max-width:256px"><br>{kind}</td>')
+            else:
+                cells.append('<td></td>')
+        rows.append(f'<tr><th>{html.escape(result["path"])}<br>'
+                    f'<small>{html.escape(result["reason"])}</small></th>{"".join(cells)}</tr>')
+    body = ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>金标准差异</title></head>'
+            f'<body><h1>金标准差异 ({len(failures)})</h1><table>{"".join(rows)}</table></body></html>')
+    (gallery_dir / 'index.html').write_text(body, encoding='utf-8')
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='金标准图像回归检查')
+    parser.add_argument('--update', action='store_true', help='以当前渲染结果覆盖参考图')
+    parser.add_argument('--golden-dir', type=Path, default=GOLDEN_DIR, help='参考图目录')
+    parser.add_argument('--gallery-dir', type=Path, default=GALLERY_DIR, help='差异画廊输出目录')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='并行进程数')
+    parser.add_argument('--filter', default='', help='只检查路径包含该字符串的素材')
+    args = parser.parse_args()
+
+    print("=== 金标准图像回归检查 ===")
+    config = asset_graph.load_config()
+    config.setdefault('localization', {})['supported_languages'] = GOLDEN_LANGUAGES
+    modules = {name: asset_graph.load_generator(name) for name in GOLDEN_MODULES}
+    # 固定参考图字体（在列出任务之前，本地化任务参数中的字体随之固定），工作进程继承该环境变量
+    generator = modules['generate_assets']
+    os.environ[generator.FONT_ENV] = generator.PILLOW_DEFAULT_FONT
+    jobs = [job for job in asset_graph.build_asset_graph(config, modules).values()
+            if args.filter in job['path']]
+
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(check_job, jobs, [str(args.golden_dir)] * len(jobs),
+                                [args.update] * len(jobs)))
+
+    if args.update:
+        print(f"✅ 已更新 {len(results)} 张参考图: {args.golden_dir}")
+        return
+
+    failures = [r for r in results if r['status'] == 'failed']
+    missing = [r for r in results if r['status'] == 'missing']
+    passed = len(results) - len(failures) - len(missing)
+    print(f"通过 {passed} / 失败 {len(failures)} / 缺少参考图 {len(missing)}")
+    for result in failures:
+        print(f"❌ {result['path']}: {result['reason']}")
+    for result in missing:
+        print(f"⚠️  缺少参考图: {result['path']}（运行 --update 生成）")
+
+    if failures:
+        write_gallery(failures, args.gallery_dir)
+        print(f"差异画廊: {args.gallery_dir / 'index.html'}")
+        raise SystemExit(1)
+    if missing:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
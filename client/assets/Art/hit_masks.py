@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+点击检测掩码
+为角色精灵（及其各动画帧）派生 1 位 alpha 掩码，写入图集元数据（atlas.json 各帧的 hitMask），
+客户端无需回读 RGBA 即可做 O(1) 的像素级点击检测。
+
+掩码覆盖裁剪后的帧（w x h），按 cell 像素一格降采样，格内任一像素 alpha ≥ 阈值即为可点击:
+  {'w': 列数, 'h': 行数, 'cell': 每格像素, 'stride': 每行字节数, 'bits': base64}
+bits 为逐行打包的位集（高位在前，每行补齐到整字节），第 row 行从 row * stride 字节开始。
+
+客户端检测（与 hit_test 相同）:
+  col = (px - offsetX) // cell，row = (py - offsetY) // cell   # px/py 为未裁剪精灵内坐标
+  越界为未命中，否则 bits[row * stride + col // 8] >> (7 - col % 8) & 1
+
+用法: python hit_masks.py <图片>... [--cell N]   # 打印掩码预览与大小
+"""
+
+import base64
+
+# 生成掩码的素材类别（角色）
+HIT_MASK_CATEGORIES = ('cats',)
+
+# 掩码长边的格数上限：256px 精灵每格 4px，64px 精灵逐像素
+MAX_CELLS = 64
+
+# alpha 不低于该值的像素可点击（排除辉光等半透明边缘）
+ALPHA_THRESHOLD = 128
+
+def cell_size(width, height, max_cells=MAX_CELLS):
+    """每格像素数，使掩码长边不超过 max_cells 格"""
+    return max(1, -(-max(width, height) // max_cells))
+
+def build_mask(img, cell=None):
+    """RGBA 图像 -> 掩码字典"""
+    from PIL import Image
+    alpha = img.convert('RGBA').getchannel('A').point(lambda a: 255 if a >= ALPHA_THRESHOLD else 0)
+    cell = cell or cell_size(*alpha.size)
+    cols, rows = -(-alpha.width // cell), -(-alpha.height // cell)
+    if cell > 1:
+        # 补齐到整格后按格取最大值：格内有可点击像素即命中。reduce 求的是格内平均，
+        # 在 L 模式下单个像素的 255 / cell² 会被舍入为 0，因此以浮点求平均后乘回格面积（即可点击像素数 × 255）
+        padded = Image.new('F', (cols * cell, rows * cell), 0)
+        padded.paste(alpha.convert('F'), (0, 0))
+        counts = padded.reduce(cell).point(lambda a: a * cell * cell)
+        alpha = counts.convert('L').point(lambda a: 255 if a else 0)
+    bits = alpha.convert('1').tobytes()
+    return {'w': cols, 'h': rows, 'cell': cell, 'stride': -(-cols // 8),
+            'bits': base64.b64encode(bits).decode('ascii')}
+
+def hit_test(mask, x, y):
+    """裁剪后帧内坐标 (x, y) 是否命中（客户端实现的参考，客户端只需解码一次 bits）"""
+    col, row = int(x) // mask['cell'], int(y) // mask['cell']
+    if not (0 <= col < mask['w'] and 0 <= row < mask['h']):
+        return False
+    bits = base64.b64decode(mask['bits'])
+    return bool(bits[row * mask['stride'] + col // 8] >> (7 - col % 8) & 1)
+
+def mask_paths(graph):
+    """依赖图中需要点击掩码的素材路径"""
+    return {path for path, job in graph.items() if job['category'] in HIT_MASK_CATEGORIES}
+
+def main():
+    """主函数"""
+    import argparse
+    from PIL import Image
+    parser = argparse.ArgumentParser(description='打印图片的点击检测掩码')
+    parser.add_argument('images', nargs='+', help='图片路径')
+    parser.add_argument('--cell', type=int, help='每格像素数（默认按长边不超过 64 格）')
+    args = parser.parse_args()
+
+    for path in args.images:
+        with Image.open(path) as img:
+            img = img.convert('RGBA')
+            bbox = img.getchannel('A').getbbox() or (0, 0, 1, 1)
+            mask = build_mask(img.crop(bbox), args.cell)
+        print(f"{path}: {mask['w']}x{mask['h']} 格，每格 {mask['cell']}px，"
+              f"{mask['stride'] * mask['h']} 字节（RGBA 回读需 {img.width * img.height * 4} 字节）")
+        for row in range(mask['h']):
+            print(''.join('#' if hit_test(mask, col * mask['cell'], row * mask['cell']) else '.'
+                          for col in range(mask['w'])))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+本地化文字素材
+图标与按钮的底图不含文字，每种底图只绘制一次并缓存；各语言的文字层
+（按语言从字体注册表选取字体）合成到缓存底图的副本上。
+新增一种语言只需文字合成，不再重新绘制底图。
+
+语言取自 art_config.json 的 localization.supported_languages，
+输出到 localization.text_config_path 下的 <语言>/UI/<素材>/<素材>_<尺寸>.png，
+任务类别为 ui.<语言>，流水线按语言各自打包（build/bundles/<等级>/ui.<语言>.zip）。
+
+中文/日文找不到含 CJK 字形的字体时，依赖图（流水线、分片构建等）跳过该语言并给出警告，
+不打包显示为方框的素材；单独运行本脚本时回退到 DejaVuSans/默认字体以便预览。
+
+用法: python localized_assets.py [--language ja-JP]
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import nine_slice
+from generate_assets import FONT_ENV, ICON_SIZES, PILLOW_DEFAULT_FONT, UI_ASSETS, render_simple_icon, system_fonts
+
+# 按钮宽度（高度为一半）
+BUTTON_SIZES = [128, 256]
+
+# 图标文字（语言 -> 文字），底色取 generate_assets.UI_ASSETS
+ICON_TEXT = {
+    'gold_coin': {'zh-CN': '金', 'en-US': 'G', 'ja-JP': '金'},
+    'diamond': {'zh-CN': '钻', 'en-US': 'D', 'ja-JP': 'ダ'},
+    'coffee_cup': {'zh-CN': '咖', 'en-US': 'C', 'ja-JP': 'コ'},
+    'fish': {'zh-CN': '鱼', 'en-US': 'F', 'ja-JP': '魚'},
+    'settings': {'zh-CN': '设', 'en-US': 'S', 'ja-JP': '設'},
+}
+
+# 按钮文字与样式（ui.buttons 的按钮类型，颜色同 nine_slice）
+BUTTON_TEXT = {
+    'confirm': {'style': 'primary', 'text': {'zh-CN': '确定', 'en-US': 'OK', 'ja-JP': '決定'}},
+    'cancel': {'style': 'secondary', 'text': {'zh-CN': '取消', 'en-US': 'Cancel', 'ja-JP': 'キャンセル'}},
+}
+
+# 语言 -> 候选字体（依次尝试；art_config.json 中 fonts 配置的中文字体优先用于 zh-CN）
+FONT_CANDIDATES = {
+    'zh-CN': ['NotoSansCJK-Bold.ttc', 'NotoSansSC-Bold.otf', 'wqy-zenhei.ttc', 'msyhbd.ttc', 'PingFang.ttc',
+              'Hiragino Sans GB.ttc'],
+    'ja-JP': ['NotoSansCJK-Bold.ttc', 'NotoSansJP-Bold.otf', 'meiryob.ttc', 'YuGothB.ttc',
+              'ヒラギノ角ゴシック W6.ttc'],
+    'en-US': ['arial.ttf'],
+}
+FALLBACK_FONTS = ['DejaVuSans-Bold.ttf']
+
+# 必须使用 CJK 字体的语言（回退字体不含其字形）
+CJK_LANGUAGES = ('zh-CN', 'ja-JP')
+
+# 文字占底图高度的比例
+TEXT_HEIGHT_RATIO = {'icon': 1 / 3, 'button': 0.45}
+
+ART_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def art_relative(path):
+    """配置中的路径以 Art/ 开头，转为相对 Art 目录"""
+    return path[len('Art/'):] if path.startswith('Art/') else path
+
+def configured_fonts(config, language):
+    """art_config.json 中为该语言配置的字体文件（相对 Art 目录，目前只有中文）；
+    与 Fonts 目录结构一致，每个字体位于 Chinese/<字体名>/<文件>"""
+    fonts = (config or {}).get('fonts', {})
+    file_name = fonts.get('chinese', {}).get('bold')
+    if language != 'zh-CN' or not file_name:
+        return []
+    stem = file_name.rsplit('.', 1)[0]
+    return [f"{art_relative(fonts.get('basePath', 'Art/Fonts/'))}Chinese/{stem}/{file_name}"]
+
+def font_path(language, configured=()):
+    """字体注册表：语言 -> 字体文件路径，均不存在时为 None。
+    只查找文件、不加载字体，构建依赖图时无需导入 Pillow。
+    CATCAFE_ASSET_FONT 设为 PILLOW_DEFAULT_FONT 时固定为 Pillow 自带字体（金标准检查）"""
+    if os.environ.get(FONT_ENV) == PILLOW_DEFAULT_FONT:
+        return None
+    # 配置中的字体相对 Art 目录，其余按字体名在系统字体目录中查找
+    for path in configured:
+        if os.path.isfile(os.path.join(ART_DIR, path)):
+            return os.path.join(ART_DIR, path)
+    fonts = system_fonts()
+    for name in [*FONT_CANDIDATES.get(language, []), *FALLBACK_FONTS]:
+        if name in fonts:
+            return fonts[name]
+    return None
+
+def missing_cjk_font(language, configured=()):
+    """CJK 语言只能回退到不含 CJK 字形的字体时为 True"""
+    if language not in CJK_LANGUAGES:
+        return False
+    path = font_path(language, tuple(configured))
+    return path is None or os.path.basename(path) in FALLBACK_FONTS
+
+@lru_cache(maxsize=None)
+def load_font(path, size):
+    """按字体文件与字号加载字体并缓存；path 为 None 时使用 Pillow 默认字体"""
+    from PIL import ImageFont
+    return ImageFont.truetype(path, size) if path else ImageFont.load_default(size)
+
+def get_font(language, size, configured=()):
+    """按语言与字号取字体"""
+    return load_font(font_path(language, tuple(configured)), size)
+
+def job_font(job):
+    """任务使用的字体文件（计入构建缓存键）"""
+    return job['args'][-1]
+
+@lru_cache(maxsize=None)
+def render_base(kind, color, width, height):
+    """不含文字的底图（按参数缓存，调用方不得修改返回的图像）"""
+    if kind == 'icon':
+        return render_simple_icon(width, color, '')
+    fill, border, border_width = color
+    return nine_slice.render_rounded_rect(width, height, fill, border, border_width, height // 2)
+
+def fit_font(draw, text, font_file, max_width, target_height):
+    """取目标字高的字体，过宽时逐步缩小"""
+    size = max(6, round(target_height))
+    while True:
+        font = load_font(font_file, size)
+        left, _, right, _ = draw.textbbox((0, 0), text, font=font)
+        if right - left <= max_width or size <= 6:
+            return font
+        size -= 1
+
+def render_localized(kind, color, width, height, text, font_file=None):
+    """缓存底图的副本 + 文字层；font_file 为按语言解析出的字体文件（None 为 Pillow 默认字体）"""
+    from PIL import Image, ImageDraw
+    # 任务参数经 JSON（分片构建）传递后元组会变为列表，缓存键需要可哈希
+    color = tuple(color) if isinstance(color, list) else color
+    img = render_base(kind, color, width, height).copy()
+    layer = Image.new('RGBA', img.size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    font = fit_font(draw, text, font_file, width * 0.8, height * TEXT_HEIGHT_RATIO[kind])
+    draw.text((width / 2, height / 2), text, fill='white', font=font, anchor='mm')
+    return Image.alpha_composite(img, layer)
+
+def button_color(config, style):
+    """按钮样式 -> (填充色, 描边色, 描边宽度)，与 nine_slice 的按钮一致"""
+    theme = nine_slice.active_style(config)
+    line = theme.get('line_style', {})
+    fill = theme.get('palette', {}).get(nine_slice.BUTTON_STYLES[style]['fill'], '#FFFFFF')
+    return fill, line.get('color', '#6D6D6D'), nine_slice.LINE_WIDTHS.get(line.get('thickness'), 2)
+
+def asset_jobs(config, allow_fallback=False):
+    """全部语言的本地化素材任务（路径相对 Art 目录）。
+    缺少 CJK 字体的语言默认跳过；allow_fallback 为 True 时改用回退字体（仅供预览）"""
+    localization = config.get('localization', {})
+    base = art_relative(localization.get('text_config_path', 'Art/Localization/'))
+    jobs = []
+    for language in localization.get('supported_languages', []):
+        configured = tuple(configured_fonts(config, language))
+        if missing_cjk_font(language, configured):
+            if not allow_fallback:
+                print(f"⚠️  未找到 {language} 的 CJK 字体，跳过该语言的素材（安装 Noto Sans CJK 或在 fonts 中配置字体）")
+                continue
+            print(f"⚠️  未找到 {language} 的 CJK 字体，回退到 {font_path(language, configured)}（CJK 字符会显示为方框）")
+        # 参数中放解析后的字体文件，换用其他字体时任务指纹随之变化
+        font_file = font_path(language, configured)
+        category = f'ui.{language}'
+        for name, texts in ICON_TEXT.items():
+            if language not in texts:
+                continue
+            for size in ICON_SIZES:
+                jobs.append({'path': f'{base}{language}/UI/{name}/{name}_{size}.png', 'category': category,
+                             'name': name, 'size': size, 'func': 'render_localized',
+                             'args': ('icon', UI_ASSETS[name]['color'], size, size, texts[language],
+                                      font_file)})
+        for name, spec in BUTTON_TEXT.items():
+            if language not in spec['text']:
+                continue
+            color = button_color(config, spec['style'])
+            for size in BUTTON_SIZES:
+                asset_name = f'button_{name}'
+                jobs.append({'path': f'{base}{language}/UI/{asset_name}/{asset_name}_{size}.png',
+                             'category': category, 'name': asset_name, 'size': size,
+                             'width': size, 'height': size // 2, 'func': 'render_localized',
+                             'args': ('button', color, size, size // 2, spec['text'][language],
+                                      font_file)})
+    return jobs
+
+def main():
+    """主函数"""
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description='生成各语言的文字素材')
+    parser.add_argument('--language', action='append', help='只生成指定语言（可重复）')
+    args = parser.parse_args()
+
+    print("=== 本地化文字素材生成 ===")
+    os.chdir(ART_DIR)
+    with open('art_config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    start = time.perf_counter()
+    counts = {}
+    for job in asset_jobs(config, allow_fallback=True):
+        language = job['category'].split('.', 1)[1]
+        if args.language and language not in args.language:
+            continue
+        os.makedirs(os.path.dirname(job['path']), exist_ok=True)
+        render_localized(*job['args']).save(job['path'])
+        counts[language] = counts.get(language, 0) + 1
+        print(f"Created: {job['path']}")
+
+    bases = render_base.cache_info()
+    print(f"\n底图绘制 {bases.misses} 次（复用 {bases.hits} 次），"
+          f"共 {sum(counts.values())} 个素材，用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+    for language, count in counts.items():
+        print(f"  {language:<8}{count:>4} 个（字体 {font_path(language, tuple(configured_fonts(config, language))) or '默认'}）")
+
+if __name__ == "__main__":
+    main()
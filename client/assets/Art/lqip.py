@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+低质量占位图（LQIP）
+为每张图片计算客户端在正式纹理下载完成前可立即绘制的占位信息，写入流水线的 index.json:
+  preview   最长边 16px 的模糊缩略图（PNG data URI，通常几百字节）
+  blurhash  BlurHash 字符串（默认 4x3 分量，约 28 个字符）
+  color     主色（#RRGGBB，忽略透明像素）
+
+计算先用 Pillow 将图片缩到不超过 32x32 再在纯 Python 中完成；BlurHash 的余弦基按
+(分量数, 边长) 缓存、按行可分离累加，sRGB→线性查表。流水线按包批量调用 describe_batch。
+透明像素在计算 BlurHash 前铺上主色，避免精灵的占位图边缘发黑。
+
+用法: python lqip.py <图片>... [--components 4x3]
+"""
+
+import base64
+import math
+from functools import lru_cache
+
+# BlurHash 默认分量数（横 x 纵）
+COMPONENTS = (4, 3)
+
+# 计算前的采样边长上限与缩略图最长边
+SAMPLE_SIZE = 32
+PREVIEW_SIZE = 16
+
+# 主色量化颜色数；alpha 低于阈值的像素不参与主色统计
+DOMINANT_COLORS = 8
+OPAQUE_ALPHA = 128
+
+BASE83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~'
+
+def encode_base83(value, length):
+    """整数 -> 定长 base83 字符串"""
+    return ''.join(BASE83[value // 83 ** (length - i) % 83] for i in range(1, length + 1))
+
+@lru_cache(maxsize=1)
+def srgb_to_linear_table():
+    """0-255 的 sRGB 分量 -> 线性值"""
+    table = []
+    for value in range(256):
+        v = value / 255
+        table.append(v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4)
+    return tuple(table)
+
+def linear_to_srgb(value):
+    """线性值 -> 0-255 的 sRGB 分量"""
+    v = min(1.0, max(0.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+@lru_cache(maxsize=None)
+def cosine_basis(components, length):
+    """各分量在每个像素位置的余弦基 cos(pi * i * x / length)（按分量数与边长缓存）"""
+    return tuple(tuple(math.cos(math.pi * i * x / length) for x in range(length))
+                 for i in range(components))
+
+def sample_image(img):
+    """缩小到不超过 SAMPLE_SIZE 的 RGBA 采样图（保持宽高比）"""
+    from PIL import Image
+    img = img.convert('RGBA')
+    scale = min(1.0, SAMPLE_SIZE / max(img.size))
+    size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(size, Image.BOX) if size != img.size else img
+
+def dominant_color(sample):
+    """主色：不透明像素量化后出现最多的颜色，全透明时为 None"""
+    from PIL import Image
+    alpha = sample.getchannel('A').point(lambda a: 255 if a >= OPAQUE_ALPHA else 0)
+    opaque = alpha.histogram()[255]
+    if not opaque:
+        return None
+    # 透明像素铺上不透明部分的平均色，量化时不会单独占用一个颜色
+    rgb = sample.convert('RGB')
+    average = tuple(round(sum(i * count for i, count in enumerate(band.histogram(alpha))) / opaque)
+                    for band in rgb.split())
+    background = Image.new('RGB', sample.size, average)
+    background.paste(rgb, mask=alpha)
+    quantized = background.quantize(DOMINANT_COLORS, method=Image.Quantize.FASTOCTREE)
+    counts = quantized.histogram(alpha)
+    best = max(range(len(counts)), key=counts.__getitem__)
+    return '#{:02X}{:02X}{:02X}'.format(*quantized.getpalette()[best * 3:best * 3 + 3])
+
+def blurhash(rgb, components=COMPONENTS):
+    """RGB 采样图 -> BlurHash 字符串"""
+    cx, cy = components
+    width, height = rgb.size
+    basis_x = cosine_basis(cx, width)
+    basis_y = cosine_basis(cy, height)
+    table = srgb_to_linear_table()
+    data = rgb.tobytes()
+
+    # 可分离累加：先按行求各横向分量，再按纵向基加权
+    factors = [[0.0, 0.0, 0.0] for _ in range(cx * cy)]
+    for y in range(height):
+        row = data[y * width * 3:(y + 1) * width * 3]
+        linear = [table[value] for value in row]
+        for i in range(cx):
+            weights = basis_x[i]
+            r = g = b = 0.0
+            for x in range(width):
+                w = weights[x]
+                r += w * linear[x * 3]
+                g += w * linear[x * 3 + 1]
+                b += w * linear[x * 3 + 2]
+            for j in range(cy):
+                w = basis_y[j][y]
+                factor = factors[j * cx + i]
+                factor[0] += w * r
+                factor[1] += w * g
+                factor[2] += w * b
+    for index, factor in enumerate(factors):
+        scale = (1 if index == 0 else 2) / (width * height)
+        factor[:] = [value * scale for value in factor]
+
+    dc, ac = factors[0], factors[1:]
+    result = encode_base83((cx - 1) + (cy - 1) * 9, 1)
+    if ac:
+        quantised_max = max(0, min(82, math.floor(max(abs(v) for f in ac for v in f) * 166 - 0.5)))
+        maximum = (quantised_max + 1) / 166
+        result += encode_base83(quantised_max, 1)
+    else:
+        maximum = 1
+        result += encode_base83(0, 1)
+    result += encode_base83((linear_to_srgb(dc[0]) << 16) + (linear_to_srgb(dc[1]) << 8)
+                            + linear_to_srgb(dc[2]), 4)
+    for factor in ac:
+        quantised = [max(0, min(18, math.floor(math.copysign(abs(v / maximum) ** 0.5, v) * 9 + 9.5)))
+                     for v in factor]
+        result += encode_base83(quantised[0] * 19 * 19 + quantised[1] * 19 + quantised[2], 2)
+    return result
+
+def preview_data_uri(sample):
+    """最长边 PREVIEW_SIZE 的缩略图（PNG data URI）"""
+    from PIL import Image
+    from asset_sinks import encode_png
+    scale = PREVIEW_SIZE / max(sample.size)
+    size = (max(1, round(sample.width * scale)), max(1, round(sample.height * scale)))
+    png = encode_png(sample.resize(size, Image.BOX), optimize=True)
+    return 'data:image/png;base64,' + base64.b64encode(png).decode('ascii')
+
+def describe(img, components=COMPONENTS):
+    """单张图片的占位信息"""
+    from PIL import Image
+    sample = sample_image(img)
+    color = dominant_color(sample)
+    # 透明像素铺上主色后计算 BlurHash
+    rgb = Image.new('RGB', sample.size, color or '#000000')
+    rgb.paste(sample, mask=sample.getchannel('A'))
+    return {'preview': preview_data_uri(sample), 'blurhash': blurhash(rgb, components), 'color': color}
+
+def describe_batch(paths, *pngs):
+    """流水线阶段：批量计算一组 PNG 的占位信息，返回 {路径: 信息}"""
+    from asset_sinks import decode_image
+    return {path: describe(decode_image(png)) for path, png in zip(paths, pngs)}
+
+def main():
+    """主函数"""
+    import argparse
+    import json
+    import time
+    from PIL import Image
+    parser = argparse.ArgumentParser(description='计算图片的 LQIP 缩略图、BlurHash 与主色')
+    parser.add_argument('images', nargs='+', help='图片路径')
+    parser.add_argument('--components', default='{}x{}'.format(*COMPONENTS), help='BlurHash 分量数，如 4x3')
+    args = parser.parse_args()
+    components = tuple(int(value) for value in args.components.lower().split('x'))
+    if len(components) != 2 or not all(1 <= value <= 9 for value in components):
+        raise SystemExit(f"分量数需为 1-9 x 1-9: {args.components}")
+
+    start = time.perf_counter()
+    result = {}
+    for path in args.images:
+        with Image.open(path) as img:
+            result[path] = describe(img, components)
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"\n{len(result)} 张图片，用时 {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
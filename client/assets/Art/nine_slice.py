@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+九宫格（Nine-slice）UI 素材生成脚本
+ui.panels 与 ui.buttons 的底板只生成一张最小纹理：四角、四边与中心各占一块，
+中心只保留 CENTER_TEXELS 像素用于拉伸。客户端按切片内边距（Cocos Creator
+Sprite 的 SLICED 模式 insetLeft/Right/Top/Bottom）绘制任意尺寸的面板，
+不再为 64/128/256 各烘焙一张整图。
+
+颜色、圆角与描边取自 art_config.json 当前 styleProfile；
+切片信息随任务（job['slices']）写入流水线的 index.json 与分片构建的 UI/nine_slice.json，
+单独运行本脚本时写入 UI/nine_slice.json。
+
+用法: python nine_slice.py
+"""
+
+import json
+import os
+
+# 中心拉伸区域的像素数
+CENTER_TEXELS = 2
+
+# 超采样倍数（ImageDraw 无抗锯齿，放大绘制后缩小）
+SUPERSAMPLE = 4
+
+# 按钮高度（像素），胶囊按钮的圆角为其一半
+BUTTON_HEIGHT = 48
+
+# 非胶囊形状的圆角半径
+CORNER_RADIUS = 12
+
+# styleProfile.line_style.thickness -> 描边宽度
+LINE_WIDTHS = {'thin': 1, 'medium': 2, 'thick': 3}
+
+# ui.panels 键 -> 调色板中的填充色/描边色
+PANEL_STYLES = {
+    'info': {'fill': 'primary_bg', 'border': 'secondary_accent'},
+    'dialog': {'fill': 'creamy_yellow', 'border': 'primary_accent'},
+    'popup': {'fill': 'soft_lavender', 'border': 'primary_accent'},
+    'drawer': {'fill': 'secondary_bg', 'border': 'secondary_accent'},
+}
+
+# ui.buttons 键 -> 调色板中的填充色（按钮描边使用 line_style.color）
+BUTTON_STYLES = {
+    'primary': {'fill': 'primary_accent'},
+    'secondary': {'fill': 'secondary_accent'},
+}
+
+METADATA_PATH = 'UI/nine_slice.json'
+
+def art_relative(path):
+    """配置中的路径以 Art/ 开头，转为相对 Art 目录"""
+    return path[len('Art/'):] if path.startswith('Art/') else path
+
+def active_style(config):
+    """当前风格配置"""
+    return config.get('styleProfile', {}).get(config.get('globalStyle'), {})
+
+def render_rounded_rect(width, height, fill, border, border_width, radius):
+    """超采样绘制铺满画布的圆角矩形"""
+    from PIL import Image, ImageDraw
+    scaled = (width * SUPERSAMPLE, height * SUPERSAMPLE)
+    img = Image.new('RGBA', scaled, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    draw.rounded_rectangle([0, 0, scaled[0] - 1, scaled[1] - 1], radius=radius * SUPERSAMPLE,
+                           fill=fill, outline=border, width=border_width * SUPERSAMPLE)
+    # 预乘 alpha 后缩小，避免透明像素的颜色渗入边缘
+    return img.convert('RGBa').resize((width, height), Image.BOX).convert('RGBA')
+
+def render_nine_slice(fill, border, border_width, radius):
+    """绘制九宫格纹理：边长为 2 * 圆角 + CENTER_TEXELS 的圆角矩形"""
+    size = radius * 2 + CENTER_TEXELS
+    return render_rounded_rect(size, size, fill, border, border_width, radius)
+
+def slice_metadata(radius):
+    """切片内边距与九块区域 [x, y, w, h]"""
+    size = radius * 2 + CENTER_TEXELS
+    spans = {'start': (0, radius), 'middle': (radius, CENTER_TEXELS), 'end': (radius + CENTER_TEXELS, radius)}
+    pieces = {}
+    for row_name, (y, h) in spans.items():
+        for col_name, (x, w) in spans.items():
+            pieces[f'{row_name}_{col_name}'] = [x, y, w, h]
+    return {'width': size, 'height': size,
+            'insets': {'left': radius, 'right': radius, 'top': radius, 'bottom': radius},
+            'pieces': pieces}
+
+def stretch_nine_slice(texture, insets, width, height):
+    """按切片内边距将九宫格纹理拉伸到 width x height（与客户端 SLICED 模式一致，供演示与预览）"""
+    from PIL import Image
+    src_w, src_h = texture.size
+    xs = ((0, insets['left'], src_w - insets['right'], src_w), (0, insets['left'], width - insets['right'], width))
+    ys = ((0, insets['top'], src_h - insets['bottom'], src_h), (0, insets['top'], height - insets['bottom'], height))
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    for row in range(3):
+        for col in range(3):
+            dst_w = xs[1][col + 1] - xs[1][col]
+            dst_h = ys[1][row + 1] - ys[1][row]
+            if dst_w <= 0 or dst_h <= 0:
+                continue
+            piece = texture.crop((xs[0][col], ys[0][row], xs[0][col + 1], ys[0][row + 1]))
+            img.paste(piece.resize((dst_w, dst_h), Image.NEAREST), (xs[1][col], ys[1][row]))
+    return img
+
+def slice_specs(config):
+    """{素材路径: (名称, 渲染参数)}：面板与各类按钮的普通状态"""
+    style = active_style(config)
+    palette = style.get('palette', {})
+    line = style.get('line_style', {})
+    border = line.get('color', '#6D6D6D')
+    border_width = LINE_WIDTHS.get(line.get('thickness'), 2)
+    shapes = style.get('shapes', {})
+
+    ui = config.get('ui', {})
+    base = ui.get('basePath', 'Art/UI/')
+    specs = {}
+    for key, file_name in ui.get('panels', {}).items():
+        colors = PANEL_STYLES.get(key, PANEL_STYLES['info'])
+        specs[art_relative(base + file_name)] = (
+            file_name.rsplit('.', 1)[0],
+            (palette.get(colors['fill'], '#FFFFFF'), palette.get(colors['border'], border),
+             border_width, CORNER_RADIUS))
+    button_radius = BUTTON_HEIGHT // 2 if shapes.get('buttons') == 'pill_shape' else CORNER_RADIUS
+    for key, states in ui.get('buttons', {}).items():
+        if key not in BUTTON_STYLES or 'normal' not in states:
+            continue
+        specs[art_relative(base + states['normal'])] = (
+            states['normal'].rsplit('.', 1)[0],
+            (palette.get(BUTTON_STYLES[key]['fill'], '#FFFFFF'), border, border_width, button_radius))
+    return specs
+
+def asset_jobs(config):
+    """列出九宫格素材任务（路径相对 Art 目录，覆盖同路径的占位图）"""
+    jobs = []
+    for path, (name, args) in slice_specs(config).items():
+        jobs.append({'path': path, 'category': 'ui', 'name': name, 'size': args[3] * 2 + CENTER_TEXELS,
+                     'func': 'render_nine_slice', 'args': args, 'overrides': True,
+                     'slices': slice_metadata(args[3])})
+    return jobs
+
+def build_metadata(config):
+    """全部九宫格素材的切片信息 {路径: 信息}"""
+    return {job['path']: job['slices'] for job in asset_jobs(config)}
+
+def main():
+    """主函数"""
+    print("=== 九宫格UI素材生成 ===")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    with open('art_config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    total_texels = 0
+    for job in asset_jobs(config):
+        os.makedirs(os.path.dirname(job['path']), exist_ok=True)
+        render_nine_slice(*job['args']).save(job['path'])
+        total_texels += job['size'] * job['size']
+        print(f"Created: {job['path']} ({job['size']}x{job['size']})")
+
+    with open(METADATA_PATH, 'w', encoding='utf-8') as f:
+        json.dump(build_metadata(config), f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Created: {METADATA_PATH}")
+    baked = len(asset_jobs(config)) * sum(size * size for size in (64, 128, 256))
+    print(f"九宫格纹理共 {total_texels} 像素（原三种尺寸整图 {baked} 像素）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+素材流水线（DAG 调度）
+每个素材按 render → trim → atlas → compress → bundle 拆成独立任务，任务声明依赖，
+依赖就绪即提交到进程池执行：某一页图集的成员渲染完成后即可压缩，无需等待全部素材。
+结束时输出关键路径耗时报告。
+
+同一素材的多个尺寸按质量等级（与 SimpleResourceManager 的 AssetQuality 一致）分包:
+  build/bundles/<low|medium|high|common>/<类别>.zip   只有一个尺寸的素材归入 common
+  build/manifest_<等级>.json                          该等级需要下载的包（含 common）
+  build/index.json                                    与等级无关的索引：素材 -> 各等级路径、包
+                                                      与低质量占位信息（lqip: 缩略图/BlurHash/主色），
+                                                      以及平铺方式（tiling）、九宫格切片内边距（slices）
+                                                      与按钮状态条带的帧（states）
+低端设备只下载 low 与 common，不会下载 2048px 场景图。
+占位信息（见 lqip.py）按包批量计算，每个包一个 lqip 任务，与裁剪/图集并行。
+角色精灵在图集阶段附带 1 位点击检测掩码（见 hit_masks.py），写入 atlas.json 各帧的 hitMask。
+
+结束时按场景/等级/平台检查纹理显存预算（见 texture_budget.py），超出时以非零状态退出。
+--profile / --trace-memory 为每个任务开启 cProfile / tracemalloc，输出折叠栈与各阶段 Top-N（见 profiling.py）。
+
+用法: python pipeline.py [--jobs N] [--out build] [--executor process|thread] [--skip-budget]
+                         [--profile] [--trace-memory] [--profile-top N]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import asset_graph
+import hit_masks
+import lqip
+from asset_sinks import ZipSink, decode_image, encode_png, pack_shelves, png_info
+
+BUILD_DIR = asset_graph.ART_DIR / 'build'
+
+# 边长不超过该值的素材打入图集，更大的（场景）、平铺纹理（job['tiling']）与 job['atlas'] 为 False 的单独输出
+ATLAS_MAX_SPRITE = 256
+
+ATLAS_PADDING = 2
+
+# 随任务写入 index.json 的素材元数据（平铺方式、九宫格切片、按钮状态条带的帧、SDF 图集的帧）
+INDEX_METADATA = ('tiling', 'slices', 'states', 'sdf')
+
+# 质量等级（低 → 高），只有一个尺寸的素材归入 COMMON_TIER，所有等级共用
+QUALITY_TIERS = ('low', 'medium', 'high')
+COMMON_TIER = 'common'
+
+# --- 各阶段任务（在工作进程中执行，参数与返回值均可序列化） ---
+
+def stage_render(module_name, job):
+    """渲染单个素材，返回 PNG 字节"""
+    module = asset_graph.load_generator(module_name)
+    return encode_png(asset_graph.render_image(job, module))
+
+def stage_trim(png):
+    """裁掉透明边，返回裁剪后的图像与原始尺寸/偏移"""
+    img = decode_image(png).convert('RGBA')
+    bbox = img.getchannel('A').getbbox() or (0, 0, 1, 1)
+    return {'png': encode_png(img.crop(bbox)), 'source': img.size, 'offset': bbox[:2]}
+
+def page_extent(slots, page_size):
+    """图集页实际占用的尺寸：宽高各取容纳全部槽位的最小 2 的幂，不超过 page_size"""
+    used = (max(x + w for _, (x, _, w, _) in slots) + ATLAS_PADDING,
+            max(y + h for _, (_, y, _, h) in slots) + ATLAS_PADDING)
+    return tuple(min(page_size, 1 << (extent - 1).bit_length()) for extent in used)
+
+def stage_atlas(page_size, slots, masked, *trimmed):
+    """将裁剪后的素材贴到预先分配的槽位，返回图集页与帧信息（masked 中的素材附带点击掩码）"""
+    from PIL import Image
+
+    # 未装满的页（如低等级的小尺寸精灵）按实际占用缩小，不再固定为 page_size
+    page = Image.new('RGBA', page_extent(slots, page_size), (0, 0, 0, 0))
+    frames = {}
+    for (path, (x, y, _, _)), item in zip(slots, trimmed):
+        img = decode_image(item['png'])
+        page.paste(img, (x, y))
+        frames[path] = {'x': x, 'y': y, 'w': img.width, 'h': img.height,
+                        'sourceW': item['source'][0], 'sourceH': item['source'][1],
+                        'offsetX': item['offset'][0], 'offsetY': item['offset'][1]}
+        if path in masked:
+            frames[path]['hitMask'] = hit_masks.build_mask(img)
+    return {'png': encode_png(page), 'frames': frames}
+
+def stage_compress(item):
+    """以最高压缩等级重新编码 PNG（无损）"""
+    png = item['png'] if isinstance(item, dict) else item
+    compressed = encode_png(decode_image(png), optimize=True)
+    if isinstance(item, dict):
+        return {**item, 'png': compressed}
+    return compressed
+
+def stage_bundle(bundle_path, names, *payloads):
+    """将压缩后的文件写入 zip 包，返回包的清单条目"""
+    sink = ZipSink(bundle_path)
+    entries = {}
+    atlas_frames = {}
+    for name, payload in zip(names, payloads):
+        if isinstance(payload, dict):
+            atlas_frames.update({path: {**frame, 'page': name} for path, frame in payload['frames'].items()})
+            payload = payload['png']
+        sink.put(name, payload)
+        width, height, has_alpha = png_info(payload)
+        entries[name] = {'bytes': len(payload), 'sha256': hashlib.sha256(payload).hexdigest(),
+                         'width': width, 'height': height, 'alpha': has_alpha}
+    if atlas_frames:
+        metadata = json.dumps({'frames': atlas_frames}, ensure_ascii=False, indent=2, sort_keys=True)
+        sink.put('atlas.json', metadata.encode('utf-8'))
+    sink.close()
+
+    data = Path(bundle_path).read_bytes()
+    # 相对 bundles 目录，如 low/ui.zip
+    return {'file': '/'.join(Path(bundle_path).parts[-2:]), 'bytes': len(data),
+            'sha256': hashlib.sha256(data).hexdigest(), 'entries': entries, 'frames': atlas_frames}
+
+# --- 任务图构建与调度 ---
+
+def assign_tiers(graph):
+    """按同一素材的尺寸排序分配质量等级，返回 {路径: 等级}"""
+    variants = {}
+    for path, job in graph.items():
+        variants.setdefault((job['category'], asset_graph.asset_key(job)), []).append(path)
+    tiers = {}
+    for paths in variants.values():
+        if len(paths) == 1:
+            tiers[paths[0]] = COMMON_TIER
+            continue
+        paths.sort(key=lambda p: graph[p]['size'])
+        for index, path in enumerate(paths):
+            # 尺寸数量与等级数不同时按比例映射，最小为 low、最大为 high
+            tiers[path] = QUALITY_TIERS[round(index * (len(QUALITY_TIERS) - 1) / (len(paths) - 1))]
+    return tiers
+
+def add_task(tasks, task_id, stage, func, args=(), deps=()):
+    """登记一个任务；任务函数以 (*args, *依赖结果) 调用"""
+    tasks[task_id] = {'stage': stage, 'func': func, 'args': args, 'deps': list(deps)}
+
+def plan_tasks(graph, out_dir, page_size):
+    """根据素材依赖图生成流水线任务（字典插入顺序即拓扑序）；包名为 '<等级>/<类别>'"""
+    tasks = {}
+    tiers = assign_tiers(graph)
+    masked = hit_masks.mask_paths(graph)
+    bundles = {}  # 包名 -> [(包内文件名, 任务id)]
+
+    sprites = {}  # 包名 -> {路径: (宽, 高)}
+    rendered = {}  # 包名 -> [路径]
+    for path, job in graph.items():
+        bundle = f"{tiers[path]}/{job['category']}"
+        add_task(tasks, f'render:{path}', 'render', stage_render, (job['module'], job))
+        rendered.setdefault(bundle, []).append(path)
+        if job['size'] <= ATLAS_MAX_SPRITE and job.get('atlas', True) and 'tiling' not in job:
+            add_task(tasks, f'trim:{path}', 'trim', stage_trim, deps=[f'render:{path}'])
+            sprites.setdefault(bundle, {})[path] = (job.get('width', job['size']), job.get('height', job['size']))
+        else:
+            add_task(tasks, f'compress:{path}', 'compress', stage_compress, deps=[f'render:{path}'])
+            bundles.setdefault(bundle, []).append((path, f'compress:{path}'))
+
+    # 槽位按未裁剪尺寸预先分配，裁剪后的图像必然放得下
+    for bundle, sizes in sprites.items():
+        tier, category = bundle.split('/')
+        for index, frames in enumerate(pack_shelves(sizes, page_size, ATLAS_PADDING)):
+            page_name = f'{category}_{tier}_{index}.png'
+            slots = list(frames.items())
+            add_task(tasks, f'atlas:{page_name}', 'atlas', stage_atlas,
+                     (page_size, slots, sorted(masked.intersection(frames))),
+                     deps=[f'trim:{path}' for path, _ in slots])
+            add_task(tasks, f'compress:{page_name}', 'compress', stage_compress,
+                     deps=[f'atlas:{page_name}'])
+            bundles.setdefault(bundle, []).append((page_name, f'compress:{page_name}'))
+
+    for bundle, paths in rendered.items():
+        add_task(tasks, f'lqip:{bundle}', 'lqip', lqip.describe_batch, (paths,),
+                 deps=[f'render:{path}' for path in paths])
+
+    for bundle, members in bundles.items():
+        names = [name for name, _ in members]
+        add_task(tasks, f'bundle:{bundle}', 'bundle', stage_bundle,
+                 (str(Path(out_dir) / 'bundles' / f'{bundle}.zip'), names),
+                 deps=[task_id for _, task_id in members])
+    return tasks
+
+def build_index(graph, bundles, placeholders=None):
+    """与等级无关的索引：{素材键: {等级: {path, bundle, lqip, tiling, slices, states, sdf}}}"""
+    tiers = assign_tiers(graph)
+    located = {}
+    for bundle, entry in bundles.items():
+        for name in entry['entries']:
+            located[name] = bundle
+        for path in entry.get('frames', {}):
+            located[path] = bundle
+    index = {}
+    for path, job in sorted(graph.items()):
+        entry = {'path': path, 'bundle': located[path]}
+        entry.update({key: job[key] for key in INDEX_METADATA if key in job})
+        if placeholders and path in placeholders:
+            entry['lqip'] = placeholders[path]
+        index.setdefault(asset_graph.asset_key(job), {})[tiers[path]] = entry
+    return {'tiers': [*QUALITY_TIERS, COMMON_TIER], 'assets': index}
+
+def write_json(path, data):
+    """按稳定顺序写出 JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Created: {path}")
+
+def _run_timed(func, args, profile=None):
+    """在工作进程中执行任务并记录起止时间；profile 为 (cpu, memory) 时同时返回剖析样本"""
+    start = time.time()
+    if profile:
+        import profiling
+        result, sample = profiling.profiled_call(func, args, *profile)
+    else:
+        result, sample = func(*args), None
+    return result, start, time.time(), sample
+
+def run_dag(tasks, executor, profile=None):
+    """依赖就绪即提交任务；返回 ({任务id: 结果}, {任务id: (开始, 结束)}, {任务id: 剖析样本})"""
+    waiting = {task_id: len(task['deps']) for task_id, task in tasks.items()}
+    dependents = {task_id: [] for task_id in tasks}
+    for task_id, task in tasks.items():
+        for dep in task['deps']:
+            dependents[dep].append(task_id)
+    # 结果在所有下游任务提交后释放，避免整批图像常驻内存
+    consumers = {task_id: len(children) for task_id, children in dependents.items()}
+
+    results = {}
+    timings = {}
+    samples = {}
+    running = {}
+
+    def submit(task_id):
+        task = tasks[task_id]
+        args = (*task['args'], *(results[dep] for dep in task['deps']))
+        running[executor.submit(_run_timed, task['func'], args, profile)] = task_id
+        for dep in task['deps']:
+            consumers[dep] -= 1
+            if consumers[dep] == 0:
+                del results[dep]
+
+    for task_id, count in waiting.items():
+        if count == 0:
+            submit(task_id)
+
+    while running:
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            task_id = running.pop(future)
+            result, start, end, sample = future.result()
+            timings[task_id] = (start, end)
+            if sample:
+                samples[task_id] = sample
+            results[task_id] = result
+            for child in dependents[task_id]:
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    submit(child)
+    return results, timings, samples
+
+def critical_path(tasks, timings):
+    """按实际耗时计算关键路径，返回 [(任务id, 耗时秒)]"""
+    finish = {}
+    previous = {}
+    for task_id, task in tasks.items():
+        start, end = timings[task_id]
+        best = max(task['deps'], key=lambda dep: finish[dep], default=None)
+        finish[task_id] = (end - start) + (finish[best] if best else 0)
+        previous[task_id] = best
+
+    path = []
+    task_id = max(finish, key=finish.get)
+    while task_id is not None:
+        start, end = timings[task_id]
+        path.append((task_id, end - start))
+        task_id = previous[task_id]
+    return path[::-1]
+
+def print_report(tasks, timings, wall_time):
+    """输出阶段耗时与关键路径报告"""
+    busy = sum(end - start for start, end in timings.values())
+    print(f"\n总耗时 {wall_time * 1000:.0f} ms，任务累计 {busy * 1000:.0f} ms，"
+          f"平均并行度 {busy / wall_time:.1f}")
+
+    stages = {}
+    for task_id, (start, end) in timings.items():
+        stats = stages.setdefault(tasks[task_id]['stage'], [0, 0.0])
+        stats[0] += 1
+        stats[1] += end - start
+    print("阶段耗时:")
+    for stage, (count, seconds) in stages.items():
+        print(f"  {stage:<10}{count:>5} 个任务 {seconds * 1000:>8.0f} ms")
+
+    path = critical_path(tasks, timings)
+    print(f"关键路径 ({sum(seconds for _, seconds in path) * 1000:.0f} ms):")
+    for task_id, seconds in path:
+        print(f"  {seconds * 1000:>8.1f} ms  {task_id}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='DAG 调度的素材流水线')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='并行工作数')
+    parser.add_argument('--out', type=Path, default=BUILD_DIR, help='输出目录')
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help='工作池类型')
+    parser.add_argument('--keep-unreferenced', action='store_true',
+                        help='不剔除客户端脚本未引用的素材')
+    parser.add_argument('--skip-budget', action='store_true', help='不检查纹理显存预算')
+    parser.add_argument('--profile', action='store_true', help='用 cProfile 剖析每个任务，输出 CPU 折叠栈')
+    parser.add_argument('--trace-memory', action='store_true', help='用 tracemalloc 记录每个任务的 Python 内存分配')
+    parser.add_argument('--profile-top', type=int, default=10, help='剖析报告每个阶段列出的条目数')
+    args = parser.parse_args()
+    if args.trace_memory and args.executor == 'thread':
+        # tracemalloc 为进程级，各线程的 start()/stop() 会互相打断，且并行任务的分配无法区分
+        parser.error('--trace-memory 需要进程池（去掉 --executor thread）')
+
+    print("=== 素材流水线 ===")
+    config = asset_graph.load_config()
+    modules = {name: asset_graph.load_generator(name) for name in asset_graph.BUILD_MODULES}
+    graph = asset_graph.build_asset_graph(config, modules)
+    if not args.keep_unreferenced:
+        import asset_refs
+        graph = asset_refs.prune_graph(graph, config)
+    page_size = config.get('performance', {}).get('sprite_atlas_size', 1024)
+    tasks = plan_tasks(graph, args.out, page_size)
+    print(f"{len(graph)} 个素材，{len(tasks)} 个任务，{args.jobs} 个工作{'进程' if args.executor == 'process' else '线程'}")
+
+    pool_class = ProcessPoolExecutor if args.executor == 'process' else ThreadPoolExecutor
+    start = time.time()
+    profile = (args.profile, args.trace_memory) if args.profile or args.trace_memory else None
+    with pool_class(max_workers=args.jobs) as executor:
+        results, timings, samples = run_dag(tasks, executor, profile)
+    wall_time = time.time() - start
+
+    bundles = {task_id.split(':', 1)[1]: result
+               for task_id, result in results.items() if task_id.startswith('bundle:')}
+    args.out.mkdir(parents=True, exist_ok=True)
+    write_json(args.out / 'manifest.json', {'bundles': bundles})
+    placeholders = {}
+    for task_id, result in results.items():
+        if task_id.startswith('lqip:'):
+            placeholders.update(result)
+    write_json(args.out / 'index.json', build_index(graph, bundles, placeholders))
+    for tier in QUALITY_TIERS:
+        selected = {name: entry for name, entry in bundles.items()
+                    if name.split('/')[0] in (tier, COMMON_TIER)}
+        write_json(args.out / f'manifest_{tier}.json', {'tier': tier, 'bundles': selected})
+        print(f"  {tier:<7}{len(selected):>3} 个包 {sum(e['bytes'] for e in selected.values()) / 1024:>8.0f} KB")
+
+    print_report(tasks, timings, wall_time)
+    if profile:
+        import profiling
+        profiling.report(tasks, samples, args.out, args.profile_top)
+
+    if not args.skip_budget:
+        import texture_budget
+        print("\n纹理显存预算:")
+        if not texture_budget.check(config, args.out):
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
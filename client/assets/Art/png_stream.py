@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+流式 PNG 编码
+按条带（strip）渲染并逐行压缩写出，峰值内存只取决于条带高度，
+与图像总尺寸无关；用于 2048px 等大尺寸场景图。
+同时提供按内存预算估算并发进程数的工具函数。
+"""
+
+import os
+import struct
+import zlib
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# 模式 -> (PNG 颜色类型, 通道数)
+COLOR_TYPES = {'L': (0, 1), 'RGB': (2, 3), 'RGBA': (6, 4)}
+
+# 压缩数据累积到该大小后写出一个 IDAT 块
+IDAT_CHUNK_SIZE = 64 * 1024
+
+# 单个工作进程的基础内存（解释器 + Pillow + zlib 缓冲），用于并发估算
+WORKER_BASELINE_BYTES = 48 * 1024 * 1024
+
+def _write_chunk(fp, tag, data):
+    """写出一个 PNG 数据块"""
+    fp.write(struct.pack('>I', len(data)))
+    fp.write(tag)
+    fp.write(data)
+    fp.write(struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+class PNGStreamWriter:
+    """逐行写入的 PNG 编码器（8 位，无隔行，行滤波类型 0）"""
+
+    def __init__(self, fp, width, height, mode='RGB', level=6):
+        color_type, channels = COLOR_TYPES[mode]
+        self.fp = fp
+        self.height = height
+        self.row_bytes = width * channels
+        self.rows_written = 0
+        self.compressor = zlib.compressobj(level)
+        self.pending = bytearray()
+
+        fp.write(PNG_SIGNATURE)
+        _write_chunk(fp, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+
+    def write_rows(self, data):
+        """写入若干完整行的原始像素字节"""
+        if len(data) % self.row_bytes:
+            raise ValueError(f"数据长度 {len(data)} 不是行字节数 {self.row_bytes} 的整数倍")
+        rows = len(data) // self.row_bytes
+        view = memoryview(data)
+        filtered = bytearray()
+        for offset in range(0, len(data), self.row_bytes):
+            filtered.append(0)
+            filtered += view[offset:offset + self.row_bytes]
+        self.pending += self.compressor.compress(filtered)
+        self.rows_written += rows
+        if len(self.pending) >= IDAT_CHUNK_SIZE:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if self.pending:
+            _write_chunk(self.fp, b'IDAT', bytes(self.pending))
+            self.pending.clear()
+
+    def close(self):
+        """写出剩余数据与 IEND"""
+        if self.rows_written != self.height:
+            raise ValueError(f"已写入 {self.rows_written} 行，应为 {self.height} 行")
+        self.pending += self.compressor.flush()
+        self._flush_pending()
+        _write_chunk(self.fp, b'IEND', b'')
+
+def strip_rows_for_budget(width, height, mode, budget_bytes):
+    """按内存预算计算条带行数（原始条带与加滤波字节的拷贝各占一份）"""
+    row_bytes = width * COLOR_TYPES[mode][1]
+    return max(1, min(height, budget_bytes // (row_bytes * 2)))
+
+def stream_render(output_path, width, height, mode, render_strip, budget_bytes):
+    """按条带调用 render_strip(y0, y1) 并流式写出 PNG。
+    render_strip 返回该条带的 PIL.Image 或原始像素字节；先写临时文件再原子替换"""
+    rows = strip_rows_for_budget(width, height, mode, budget_bytes)
+    temp_path = f'{output_path}.part'
+    with open(temp_path, 'wb') as fp:
+        writer = PNGStreamWriter(fp, width, height, mode)
+        for y0 in range(0, height, rows):
+            strip = render_strip(y0, min(height, y0 + rows))
+            writer.write_rows(strip.tobytes() if hasattr(strip, 'tobytes') else strip)
+        writer.close()
+    os.replace(temp_path, output_path)
+
+def available_memory():
+    """可用内存（字节）：取系统可用内存与 cgroup 限制中较小者，无法获取时返回 None"""
+    limits = []
+    try:
+        limits.append(os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE'))
+    except (AttributeError, ValueError, OSError):
+        pass
+    for cgroup_file in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(cgroup_file, 'r', encoding='utf-8') as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        if value.isdigit():
+            limits.append(int(value))
+    return min(limits) if limits else None
+
+def max_workers(worker_budget_bytes, job_count, memory_limit_bytes=None):
+    """并发进程数：同时受 CPU 核数、任务数与内存预算限制"""
+    cpu_count = os.cpu_count() or 1
+    memory_limit = memory_limit_bytes or available_memory()
+    by_memory = memory_limit // worker_budget_bytes if memory_limit else cpu_count
+    return max(1, min(cpu_count, job_count, by_memory))
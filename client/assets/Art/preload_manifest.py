@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+场景预加载清单
+根据 art_config.json 中的场景图层、工作台、UI 与音频配置，为每个场景生成预加载清单，
+分为三个优先级:
+  critical  进入场景即需要（可交互前必须就绪）
+  deferred  场景可交互后立即在后台加载
+  idle      空闲时预取（下一个场景、特效等）
+每个质量等级（low/medium/high）各生成一份清单：图片按 pipeline.py 输出的 index.json 取该等级的变体
+（无则取 common），字节数与所属图集页取自 build/manifest.json，即客户端实际下载的大小；
+图集页按首次出现的优先级计入字节数。音频等不经流水线的文件按 Art 目录中的文件计算。
+可交互时间只取决于 critical 层。
+
+场景配置默认取 SCENE_PRELOAD，可在 art_config.json 中以 "preload" 字段覆盖。
+选择器为配置中的点分路径（如 scenes.coffeeShop.layers.background），
+或相对 Art 目录的素材路径/与尺寸无关的素材键（含 '/'，如 Scenes/main_menu_bg/main_menu_bg）。
+
+用法: python preload_manifest.py [--build build] [--out build/preload] [--scene coffeeShop]
+输出 <out>/<等级>/<场景>.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import asset_graph
+
+BUILD_DIR = asset_graph.ART_DIR / 'build'
+PRELOAD_DIR = BUILD_DIR / 'preload'
+
+TIERS = ('critical', 'deferred', 'idle')
+
+# 对应 AdvancedResourceManager.AssetConfig.priority（数值越大越先加载）
+TIER_PRIORITY = {'critical': 3, 'deferred': 2, 'idle': 1}
+
+ASSET_TYPES = {
+    '.png': 'image', '.jpg': 'image', '.jpeg': 'image', '.webp': 'image',
+    '.mp3': 'audio', '.wav': 'audio', '.ogg': 'audio',
+    '.ttf': 'font', '.otf': 'font',
+    '.json': 'data',
+}
+
+# 场景 -> {优先级: [选择器]}
+SCENE_PRELOAD = {
+    'coffeeShop': {
+        # 工作台位于家具与设备图层上，二者就绪后才能点击
+        'critical': ['scenes.coffeeShop.layers.background', 'scenes.coffeeShop.layers.furniture',
+                     'scenes.coffeeShop.layers.equipment', 'ui.buttons.primary', 'UI/primary_states.png',
+                     'ui.buttons.icon',
+                     'ui.icons.resources', 'audio.sfx.button_click'],
+        'deferred': ['scenes.coffeeShop.layers.decorations', 'ui.icons.functions', 'ui.panels',
+                     'items.food.coffee', 'items.food.desserts', 'effects.particles.steam',
+                     'audio.bgm.main_scene', 'audio.sfx.coffee_brew', 'audio.sfx.coin_collect'],
+        'idle': ['scenes.coffeeShop.layers.effects', 'ui.icons.status', 'ui.progress',
+                 'items.food.ingredients', 'effects.animations', 'audio.sfx',
+                 'scenes.fishingArea.layers.background'],
+    },
+    'fishingArea': {
+        'critical': ['scenes.fishingArea.layers.background', 'scenes.fishingArea.layers.water',
+                     'scenes.fishingArea.layers.platform', 'ui.buttons.primary', 'UI/primary_states.png',
+                     'ui.buttons.icon',
+                     'ui.icons.resources', 'audio.sfx.button_click'],
+        'deferred': ['scenes.fishingArea.layers.landscape', 'scenes.fishingArea.layers.buildings',
+                     'ui.icons.functions', 'ui.panels', 'audio.bgm.fishing_area'],
+        'idle': ['scenes.fishingArea.layers.effects', 'effects.weather', 'ui.icons.status',
+                 'ui.progress', 'scenes.coffeeShop.layers.background'],
+    },
+    'mainMenu': {
+        'critical': ['Scenes/main_menu_bg/main_menu_bg', 'ui.buttons.primary',
+                     'ui.buttons.secondary', 'UI/primary_states.png', 'UI/secondary_states.png',
+                     'audio.sfx.button_click'],
+        'deferred': ['ui.buttons.icon', 'ui.icons.resources', 'ui.panels', 'audio.bgm.menu'],
+        # 菜单停留期间预取最常进入的咖啡馆场景
+        'idle': ['scenes.coffeeShop.layers.background', 'scenes.coffeeShop.layers.furniture',
+                 'scenes.coffeeShop.layers.equipment', 'ui.icons.functions'],
+    },
+}
+
+def art_relative(path):
+    """配置中的路径以 Art/ 开头，转为相对 Art 目录"""
+    return path[len('Art/'):] if path.startswith('Art/') else path
+
+def collect_files(node, base):
+    """递归收集配置子树中的文件名，子树的 basePath 覆盖上层"""
+    if isinstance(node, str):
+        return [art_relative(base + node)] if Path(node).suffix.lower() in ASSET_TYPES else []
+    files = []
+    if isinstance(node, dict):
+        base = node.get('basePath', base)
+        for key, value in node.items():
+            if key != 'basePath':
+                files.extend(collect_files(value, base))
+    elif isinstance(node, list):
+        for item in node:
+            files.extend(collect_files(item, base))
+    return files
+
+def resolve_selector(config, selector):
+    """选择器 -> 素材路径列表（相对 Art 目录）"""
+    if '/' in selector:
+        return [selector]
+    node = config
+    base = ''
+    for key in selector.split('.'):
+        if not isinstance(node, dict) or key not in node:
+            raise KeyError(f"配置中不存在: {selector}")
+        base = node.get('basePath', base)
+        node = node[key]
+    return collect_files(node, base)
+
+def locate_image(path, quality, bundles, index, key_of):
+    """素材路径或素材键 -> 该质量等级下实际下载的 (变体路径, 包, 图集页或 None, 字节数)；
+    不在构建产物中时为 None"""
+    from texture_budget import COMMON_TIER, locate
+    key = path if path in index else key_of.get(path)
+    if key is None:
+        return None
+    variants = index[key]
+    variant = variants.get(quality) or variants.get(COMMON_TIER)
+    if variant is None:
+        return None
+    _, name, is_atlas = locate(variant, bundles)
+    size = bundles[variant['bundle']]['entries'][name]['bytes']
+    return variant['path'], variant['bundle'], name if is_atlas else None, size
+
+def build_scene_manifest(scene, profile, config, quality, bundles, index):
+    """生成单个场景在指定质量等级下的清单字典"""
+    key_of = {entry['path']: key for key, variants in index.items() for entry in variants.values()}
+    manifest = {'scene': scene, 'quality': quality, 'tiers': {}}
+    seen = set()
+    loaded = set()
+    for tier in TIERS:
+        assets = []
+        tier_bytes = 0
+        for selector in profile.get(tier, []):
+            for path in resolve_selector(config, selector):
+                located = locate_image(path, quality, bundles, index, key_of)
+                if located:
+                    path, bundle, page, size = located
+                if path in seen:
+                    continue  # 已在更高优先级中
+                seen.add(path)
+                entry = {'path': path, 'type': ASSET_TYPES.get(Path(path).suffix.lower(), 'image')}
+                if located:
+                    entry['bundle'] = bundle
+                    entry['bytes'] = size
+                    if page:
+                        entry['atlas'] = {'bundle': bundle, 'page': page}
+                    # 图集页与独立文件都只在首次出现的优先级计入
+                    if (bundle, page or path) not in loaded:
+                        loaded.add((bundle, page or path))
+                        tier_bytes += size
+                elif entry['type'] == 'image':
+                    entry['bytes'] = None  # 图片应由流水线产出
+                else:
+                    file_path = asset_graph.ART_DIR / path
+                    entry['bytes'] = file_path.stat().st_size if file_path.is_file() else None
+                    tier_bytes += entry['bytes'] or 0
+                assets.append(entry)
+        manifest['tiers'][tier] = {'priority': TIER_PRIORITY[tier], 'bytes': tier_bytes, 'assets': assets}
+
+    workstations = config.get('scenes', {}).get(scene, {}).get('workstations')
+    if workstations:
+        manifest['workstations'] = workstations
+    return manifest
+
+def main():
+    """主函数"""
+    from texture_budget import QUALITY_TIERS, load_build
+    parser = argparse.ArgumentParser(description='生成各场景的预加载清单')
+    parser.add_argument('--out', type=Path, default=PRELOAD_DIR, help='输出目录')
+    parser.add_argument('--scene', action='append', help='只生成指定场景（可重复）')
+    parser.add_argument('--build', type=Path, default=BUILD_DIR, help='pipeline.py 的输出目录')
+    args = parser.parse_args()
+
+    print("=== 场景预加载清单 ===")
+    config = asset_graph.load_config()
+    profiles = config.get('preload', SCENE_PRELOAD)
+    bundles, index = load_build(args.build)
+
+    print(f"{'场景':<12}{'等级':<8}{'critical':>12}{'deferred':>12}{'idle':>12}{'缺失':>6}")
+    for quality in QUALITY_TIERS:
+        (args.out / quality).mkdir(parents=True, exist_ok=True)
+        for scene, profile in profiles.items():
+            if args.scene and scene not in args.scene:
+                continue
+            manifest = build_scene_manifest(scene, profile, config, quality, bundles, index)
+            with open(args.out / quality / f'{scene}.json', 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+            tiers = manifest['tiers']
+            missing = sum(1 for tier in tiers.values() for asset in tier['assets'] if asset['bytes'] is None)
+            sizes = ''.join(f"{tiers[tier]['bytes'] / 1024:>10.0f}KB" for tier in TIERS)
+            print(f"{scene:<14}{quality:<10}{sizes}{missing:>6}")
+            for asset in tiers['critical']['assets']:
+                if asset['bytes'] is None:
+                    print(f"  ⚠️  critical 素材缺失: {asset['path']}")
+    print(f"Created: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+流水线性能剖析
+按需为每个任务（即每个阶段中的每个素材）开启 cProfile 与 tracemalloc，
+在工作进程中将结果整理为可序列化的样本随任务结果返回，由主进程按阶段汇总:
+  <输出目录>/profile/cpu.collapsed      CPU 折叠栈（微秒），可直接交给 flamegraph.pl / speedscope
+  <输出目录>/profile/memory.collapsed   任务结束时仍持有的 Python 内存分配（字节）的折叠栈
+  终端                                  每个阶段自身耗时最多的函数、内存峰值最高的任务与分配位置
+
+折叠栈以 阶段;任务 开头，例如 render;render:UI/gold_coin/gold_coin_64.png;generate_assets.py:render_simple_icon;...
+cProfile 只记录调用边，栈由调用边的累计时间按比例展开（与 flameprof 等工具相同的近似）。
+
+tracemalloc 只跟踪 Python 分配器，Pillow 的像素缓冲区不在其中。tracemalloc 为进程级，
+线程池下各任务的 start()/stop() 会互相打断，因此 --trace-memory 只能与默认的进程池一起使用
+（pipeline.py 会拒绝 --executor thread）。
+
+用法: python pipeline.py --profile [--trace-memory] [--profile-top 10]
+"""
+
+from pathlib import Path
+
+# 展开调用栈的最大深度与 tracemalloc 记录的栈帧数
+MAX_DEPTH = 64
+MEMORY_FRAMES = 16
+
+# 展开时忽略不足 1 微秒的分支，避免调用图的路径数爆炸
+MIN_SECONDS = 1e-6
+
+TOP_N = 10
+
+def frame_label(func):
+    """pstats 的 (文件, 行号, 函数名) -> 栈帧名"""
+    filename, _, name = func
+    label = name if filename == '~' else f'{Path(filename).name}:{name}'
+    # 折叠栈格式以 ';' 分隔栈帧、以最后一个空格分隔数值
+    return label.replace(';', ':').replace(' ', '_')
+
+def cpu_samples(profiler):
+    """cProfile -> ({折叠栈: 微秒}, {函数: [调用次数, 自身微秒, 累计微秒]})"""
+    import pstats
+    stats = pstats.Stats(profiler).stats
+    children = {}
+    for callee, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children.setdefault(caller, []).append((callee, edge[3]))
+
+    stacks = {}
+
+    def walk(func, path, seconds, active):
+        # 该函数在本路径上的时间占其总累计时间的比例，按比例分摊自身时间与子调用
+        _, _, self_time, total, _ = stats[func]
+        share = seconds / total if total else 0
+        value = round(self_time * share * 1e6)
+        if value:
+            stacks[path] = stacks.get(path, 0) + value
+        if len(active) >= MAX_DEPTH:
+            return
+        for callee, edge_time in children.get(func, ()):
+            # 递归调用不再展开，其时间已计入栈上的同一函数
+            if callee not in active and edge_time * share >= MIN_SECONDS:
+                walk(callee, f'{path};{frame_label(callee)}', edge_time * share, active | {callee})
+
+    for func, (_, _, _, total, callers) in stats.items():
+        if not callers:
+            walk(func, frame_label(func), total, frozenset([func]))
+    functions = {frame_label(func): [calls, round(self_time * 1e6), round(total * 1e6)]
+                 for func, (_, calls, self_time, total, _) in stats.items()}
+    return stacks, functions
+
+def memory_samples(snapshot):
+    """tracemalloc 快照 -> {折叠栈: 字节}（Traceback 已按自外向内排列）"""
+    stacks = {}
+    for stat in snapshot.statistics('traceback'):
+        path = ';'.join(f'{Path(frame.filename).name}:{frame.lineno}' for frame in stat.traceback)
+        stacks[path] = stacks.get(path, 0) + stat.size
+    return stacks
+
+def profiled_call(func, args, cpu=False, memory=False):
+    """执行 func(*args)，返回 (结果, 样本)；样本只含基本类型，可跨进程传递"""
+    import tracemalloc
+    sample = {}
+    if memory:
+        tracemalloc.start(MEMORY_FRAMES)
+    profiler = None
+    if cpu:
+        import cProfile
+        profiler = cProfile.Profile()
+        result = profiler.runcall(func, *args)
+    else:
+        result = func(*args)
+    if memory:
+        sample['peak'] = tracemalloc.get_traced_memory()[1]
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        tracemalloc.stop()
+        sample['alloc'] = memory_samples(snapshot)
+    if profiler is not None:
+        sample['stacks'], sample['functions'] = cpu_samples(profiler)
+    return result, sample
+
+def aggregate(tasks, samples):
+    """{任务id: 样本} -> {阶段: 汇总}，折叠栈加上 阶段;任务 前缀"""
+    stages = {}
+    for task_id, sample in samples.items():
+        stage = tasks[task_id]['stage']
+        summary = stages.setdefault(stage, {'cpu': {}, 'alloc': {}, 'functions': {}, 'peaks': []})
+        prefix = f'{stage};{task_id.replace(";", ":").replace(" ", "_")}'
+        for key, target in (('stacks', summary['cpu']), ('alloc', summary['alloc'])):
+            for stack, value in sample.get(key, {}).items():
+                target[f'{prefix};{stack}'] = target.get(f'{prefix};{stack}', 0) + value
+        for label, (calls, self_us, total_us) in sample.get('functions', {}).items():
+            stats = summary['functions'].setdefault(label, [0, 0, 0])
+            stats[0] += calls
+            stats[1] += self_us
+            stats[2] += total_us
+        if 'peak' in sample:
+            summary['peaks'].append((sample['peak'], task_id))
+    return stages
+
+def write_collapsed(path, stages, key):
+    """写出折叠栈文件（按栈排序，便于比较两次剖析）"""
+    lines = sorted(f'{stack} {value}' for summary in stages.values()
+                   for stack, value in summary[key].items() if value > 0)
+    if not lines:
+        return None
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    print(f"Created: {path}（{len(lines)} 条栈）")
+    return path
+
+def print_tables(stages, top=TOP_N):
+    """每个阶段的 CPU 与内存 Top-N 表"""
+    for stage, summary in stages.items():
+        if summary['functions']:
+            total_ms = sum(self_us for _, self_us, _ in summary['functions'].values()) / 1000
+            print(f"\n[{stage}] CPU {total_ms:.0f} ms，自身耗时最多的函数:")
+            print(f"  {'自身ms':>9}{'累计ms':>10}{'调用':>9}  函数")
+            ranked = sorted(summary['functions'].items(), key=lambda item: -item[1][1])[:top]
+            for label, (calls, self_us, total_us) in ranked:
+                print(f"  {self_us / 1000:>9.1f}{total_us / 1000:>10.1f}{calls:>9}  {label}")
+        if summary['peaks']:
+            print(f"\n[{stage}] Python 内存峰值最高的任务:")
+            for peak, task_id in sorted(summary['peaks'], reverse=True)[:top]:
+                print(f"  {peak / 1024:>9.0f} KB  {task_id}")
+            sites = {}
+            for stack, size in summary['alloc'].items():
+                site = stack.rsplit(';', 1)[-1]
+                sites[site] = sites.get(site, 0) + size
+            if sites:
+                print(f"[{stage}] 任务结束时仍持有的分配:")
+                for site, size in sorted(sites.items(), key=lambda item: -item[1])[:top]:
+                    print(f"  {size / 1024:>9.1f} KB  {site}")
+
+def report(tasks, samples, out_dir, top=TOP_N):
+    """汇总样本、写出折叠栈并打印各阶段 Top-N"""
+    stages = aggregate(tasks, samples)
+    profile_dir = Path(out_dir) / 'profile'
+    write_collapsed(profile_dir / 'cpu.collapsed', stages, 'cpu')
+    write_collapsed(profile_dir / 'memory.collapsed', stages, 'alloc')
+    print_tables(stages, top)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+素材发布与增量补丁
+将 pipeline.py 的输出（清单、索引与各等级素材包）存档为一个版本，
+并与上一版本比较生成最小补丁，供热更新下发:
+  - 内容未变的文件跳过（按 SHA-256 判断）
+  - 变化的文件做分块二进制差分（rsync 式滚动校验和），未变化的素材数据只记录复制指令
+  - 补丁目录含 index.json，记录每个文件的动作、补丁前后校验和
+
+补丁格式（zlib 压缩）: b'CCDP1' + 指令序列
+  b'C' + >QI(旧文件偏移, 长度)   从旧文件复制
+  b'D' + >I(长度) + 数据           写入新数据
+
+用法:
+  python release.py cut 1.2.0                     # 存档 build/ 为新版本，并生成相对上一版本的补丁
+  python release.py diff 1.1.0 1.2.0              # 生成任意两个版本间的补丁
+  python release.py apply <补丁目录> <安装目录>     # 校验后应用补丁
+  python release.py verify <安装目录> <版本>        # 校验安装目录与版本一致
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import zlib
+from pathlib import Path
+
+import asset_graph
+
+BUILD_DIR = asset_graph.ART_DIR / 'build'
+RELEASES_DIR = BUILD_DIR / 'releases'
+
+PATCH_MAGIC = b'CCDP1'
+
+# 差分块大小：越小补丁越精确，索引与扫描开销越大
+BLOCK_SIZE = 2048
+
+# 滚动校验和模数
+_MOD = 1 << 16
+
+# 随版本存档的构建产物（相对 build 目录）
+RELEASE_FILES = ('manifest.json', 'index.json', 'manifest_*.json', 'bundles/**/*.zip')
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+def release_files(root):
+    """版本目录中的文件 -> 相对路径列表（排序）"""
+    root = Path(root)
+    files = {path for pattern in RELEASE_FILES for path in root.glob(pattern) if path.is_file()}
+    return sorted(path.relative_to(root).as_posix() for path in files)
+
+def _weak_checksum(block):
+    """rsync 弱校验和 (a, b)"""
+    a = sum(block) % _MOD
+    b = sum((len(block) - i) * x for i, x in enumerate(block)) % _MOD
+    return a, b
+
+def make_delta(old, new, block_size=BLOCK_SIZE):
+    """计算把 old 变为 new 的指令列表 [('copy', 偏移, 长度) | ('data', 字节)]"""
+    table = {}
+    for offset in range(0, len(old) - block_size + 1, block_size):
+        block = old[offset:offset + block_size]
+        a, b = _weak_checksum(block)
+        table.setdefault((b << 16) | a, {}).setdefault(hashlib.sha1(block).digest(), offset)
+
+    ops = []
+
+    def emit_copy(offset, length):
+        if ops and ops[-1][0] == 'copy' and ops[-1][1] + ops[-1][2] == offset:
+            ops[-1] = ('copy', ops[-1][1], ops[-1][2] + length)
+        else:
+            ops.append(('copy', offset, length))
+
+    literal_start = i = 0
+    if table and len(new) >= block_size:
+        a, b = _weak_checksum(new[:block_size])
+        while True:
+            candidates = table.get((b << 16) | a)
+            if candidates:
+                offset = candidates.get(hashlib.sha1(new[i:i + block_size]).digest())
+                if offset is not None:
+                    if literal_start < i:
+                        ops.append(('data', new[literal_start:i]))
+                    emit_copy(offset, block_size)
+                    i += block_size
+                    literal_start = i
+                    if i + block_size > len(new):
+                        break
+                    a, b = _weak_checksum(new[i:i + block_size])
+                    continue
+            if i + block_size >= len(new):
+                break
+            # 窗口右移一个字节
+            out_byte, in_byte = new[i], new[i + block_size]
+            a = (a - out_byte + in_byte) % _MOD
+            b = (b - block_size * out_byte + a) % _MOD
+            i += 1
+    if literal_start < len(new):
+        ops.append(('data', new[literal_start:]))
+    return ops
+
+def encode_delta(ops):
+    """指令列表 -> 压缩后的补丁字节"""
+    parts = [PATCH_MAGIC]
+    for op in ops:
+        if op[0] == 'copy':
+            parts.append(b'C' + struct.pack('>QI', op[1], op[2]))
+        else:
+            parts.append(b'D' + struct.pack('>I', len(op[1])) + op[1])
+    return zlib.compress(b''.join(parts), 9)
+
+def apply_delta(old, patch):
+    """将补丁应用到旧文件内容，返回新内容"""
+    data = zlib.decompress(patch)
+    if not data.startswith(PATCH_MAGIC):
+        raise ValueError("补丁格式无效")
+    out = bytearray()
+    pos = len(PATCH_MAGIC)
+    while pos < len(data):
+        tag = data[pos:pos + 1]
+        if tag == b'C':
+            offset, length = struct.unpack_from('>QI', data, pos + 1)
+            if offset + length > len(old):
+                raise ValueError("补丁复制范围超出旧文件")
+            out += old[offset:offset + length]
+            pos += 13
+        elif tag == b'D':
+            (length,) = struct.unpack_from('>I', data, pos + 1)
+            out += data[pos + 5:pos + 5 + length]
+            pos += 5 + length
+        else:
+            raise ValueError(f"未知补丁指令 {tag!r}")
+    return bytes(out)
+
+def make_patch(old_dir, new_dir, patch_dir, from_version, to_version):
+    """比较两个版本目录，写出补丁目录，返回补丁索引"""
+    old_dir, new_dir, patch_dir = Path(old_dir), Path(new_dir), Path(patch_dir)
+    shutil.rmtree(patch_dir, ignore_errors=True)
+    patch_dir.mkdir(parents=True)
+
+    old_files = set(release_files(old_dir))
+    files = {}
+    for name in release_files(new_dir):
+        new = (new_dir / name).read_bytes()
+        entry = {'to_sha256': sha256(new), 'bytes': len(new)}
+        if name not in old_files:
+            entry.update(action='add', patch=f'files/{name}', patch_bytes=len(new))
+            target = patch_dir / 'files' / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(new)
+        else:
+            old = (old_dir / name).read_bytes()
+            entry['from_sha256'] = sha256(old)
+            if entry['from_sha256'] == entry['to_sha256']:
+                entry['action'] = 'unchanged'
+            else:
+                patch = encode_delta(make_delta(old, new))
+                entry.update(action='patch', patch=f'deltas/{name}.patch', patch_bytes=len(patch))
+                target = patch_dir / 'deltas' / f'{name}.patch'
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(patch)
+        files[name] = entry
+    for name in sorted(old_files - set(files)):
+        files[name] = {'action': 'remove', 'from_sha256': sha256((old_dir / name).read_bytes())}
+
+    index = {'from': from_version, 'to': to_version, 'files': files}
+    with open(patch_dir / 'index.json', 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return index
+
+def print_patch_summary(index, patch_dir):
+    """打印补丁大小与各动作数量"""
+    counts = {}
+    for entry in index['files'].values():
+        counts[entry['action']] = counts.get(entry['action'], 0) + 1
+    patch_bytes = sum(entry.get('patch_bytes', 0) for entry in index['files'].values())
+    full_bytes = sum(entry.get('bytes', 0) for entry in index['files'].values())
+    summary = '，'.join(f'{action} {count}' for action, count in sorted(counts.items()))
+    print(f"✅ 补丁 {index['from']} → {index['to']}: {patch_dir}")
+    print(f"   {summary}；补丁 {patch_bytes / 1024:.1f} KB / 完整版本 {full_bytes / 1024:.1f} KB")
+
+def apply_patch(patch_dir, target_dir):
+    """校验安装目录后应用补丁；全部文件生成并校验通过后才替换，失败时安装目录保持不变"""
+    patch_dir, target_dir = Path(patch_dir), Path(target_dir)
+    with open(patch_dir / 'index.json', 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    staged = {}
+    for name, entry in index['files'].items():
+        action = entry['action']
+        if action in ('patch', 'remove', 'unchanged'):
+            current = target_dir / name
+            if not current.is_file() or sha256(current.read_bytes()) != entry['from_sha256']:
+                raise SystemExit(f"❌ {name} 与补丁起始版本 {index['from']} 不一致，无法应用")
+        if action == 'add':
+            staged[name] = (patch_dir / entry['patch']).read_bytes()
+        elif action == 'patch':
+            staged[name] = apply_delta((target_dir / name).read_bytes(),
+                                       (patch_dir / entry['patch']).read_bytes())
+        if name in staged and sha256(staged[name]) != entry['to_sha256']:
+            raise SystemExit(f"❌ {name} 应用补丁后校验失败")
+
+    for name, data in staged.items():
+        path = target_dir / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f'{path.name}.part')
+        temp_path.write_bytes(data)
+        os.replace(temp_path, path)
+    for name, entry in index['files'].items():
+        if entry['action'] == 'remove':
+            (target_dir / name).unlink()
+    print(f"✅ 已应用补丁 {index['from']} → {index['to']}: 更新 {len(staged)} 个文件")
+
+def verify(target_dir, release_dir):
+    """校验安装目录与版本目录内容一致，返回不一致的文件列表"""
+    target_dir, release_dir = Path(target_dir), Path(release_dir)
+    expected = release_files(release_dir)
+    mismatched = [name for name in expected
+                  if not (target_dir / name).is_file()
+                  or sha256((target_dir / name).read_bytes()) != sha256((release_dir / name).read_bytes())]
+    extra = sorted(set(release_files(target_dir)) - set(expected))
+    return mismatched + extra
+
+def load_history(releases_dir):
+    """版本历史（按发布顺序）"""
+    history_file = Path(releases_dir) / 'releases.json'
+    if not history_file.exists():
+        return []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        return json.load(f)['versions']
+
+def cut_release(version, build_dir, releases_dir):
+    """存档当前构建为新版本，并生成相对上一版本的补丁"""
+    releases_dir = Path(releases_dir)
+    history = load_history(releases_dir)
+    if version in history:
+        raise SystemExit(f"版本 {version} 已存在")
+    files = release_files(build_dir)
+    if not files:
+        raise SystemExit(f"{build_dir} 中没有构建产物，请先运行 pipeline.py")
+
+    release_dir = releases_dir / version
+    for name in files:
+        target = release_dir / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(Path(build_dir) / name, target)
+    with open(releases_dir / 'releases.json', 'w', encoding='utf-8') as f:
+        json.dump({'versions': history + [version]}, f, ensure_ascii=False, indent=2)
+    print(f"✅ 已存档版本 {version}: {len(files)} 个文件")
+
+    if history:
+        previous = history[-1]
+        patch_dir = releases_dir / 'patches' / f'{previous}_to_{version}'
+        index = make_patch(releases_dir / previous, release_dir, patch_dir, previous, version)
+        print_patch_summary(index, patch_dir)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='素材发布与增量补丁')
+    parser.add_argument('command', choices=['cut', 'diff', 'apply', 'verify'])
+    parser.add_argument('args', nargs='+', help='cut: 版本；diff: 旧版本 新版本；'
+                                                'apply: 补丁目录 安装目录；verify: 安装目录 版本')
+    parser.add_argument('--build', type=Path, default=BUILD_DIR, help='构建输出目录（cut）')
+    parser.add_argument('--releases', type=Path, default=RELEASES_DIR, help='版本存档目录')
+    args = parser.parse_args()
+
+    expected = {'cut': 1, 'diff': 2, 'apply': 2, 'verify': 2}[args.command]
+    if len(args.args) != expected:
+        parser.error(f"{args.command} 需要 {expected} 个参数")
+
+    if args.command == 'cut':
+        cut_release(args.args[0], args.build, args.releases)
+    elif args.command == 'diff':
+        old, new = args.args
+        patch_dir = args.releases / 'patches' / f'{old}_to_{new}'
+        index = make_patch(args.releases / old, args.releases / new, patch_dir, old, new)
+        print_patch_summary(index, patch_dir)
+    elif args.command == 'apply':
+        apply_patch(*args.args)
+    else:
+        target, version = args.args
+        problems = verify(target, args.releases / version)
+        for name in problems:
+            print(f"❌ {name}")
+        if problems:
+            raise SystemExit(1)
+        print(f"✅ {target} 与版本 {version} 一致")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+有向距离场（SDF）
+将单色形状蒙版转换为单通道距离场：128 为形状边缘，向内递增、向外递减，
+超过 spread 像素的距离截断为 255/0。客户端按 0.5 阈值加 smoothstep 绘制，
+一张小纹理可缩放到任意尺寸而边缘保持清晰。
+
+距离变换采用 Felzenszwalb 可分离精确欧氏距离变换：先逐列求竖直距离，
+再逐行求抛物线下包络，总复杂度 O(宽 × 高)。
+"""
+
+_INF = float('inf')
+
+def _edt_1d(f):
+    """一维平方距离变换：返回 d[q] = min_p((q - p)^2 + f[p])，f 中无穷大表示非特征点"""
+    sites = [q for q, value in enumerate(f) if value != _INF]
+    if not sites:
+        return [_INF] * len(f)
+    v = [sites[0]]       # 下包络中各抛物线的顶点
+    z = [-_INF, _INF]    # z[i], z[i + 1] 为抛物线 v[i] 的左右边界
+    for q in sites[1:]:
+        while True:
+            p = v[-1]
+            s = ((f[q] + q * q) - (f[p] + p * p)) / (2 * (q - p))
+            if s > z[-2]:
+                break
+            # 新抛物线完全覆盖最后一条
+            v.pop()
+            z.pop()
+            z[-1] = _INF
+        v.append(q)
+        z[-1] = s
+        z.append(_INF)
+
+    d = [0.0] * len(f)
+    k = 0
+    for q in range(len(f)):
+        while z[k + 1] < q:
+            k += 1
+        p = v[k]
+        d[q] = (q - p) * (q - p) + f[p]
+    return d
+
+def _column_distances(feature, width, height):
+    """逐列到最近特征像素的竖直距离（平方），无特征时为无穷大"""
+    columns = []
+    for x in range(width):
+        column = [0.0 if feature[y * width + x] else _INF for y in range(height)]
+        columns.append(_edt_1d(column))
+    return columns
+
+def squared_distances(feature, width, height):
+    """二维平方欧氏距离变换：feature 为按行展开的布尔序列"""
+    columns = _column_distances(feature, width, height)
+    result = [0.0] * (width * height)
+    for y in range(height):
+        row = _edt_1d([columns[x][y] for x in range(width)])
+        result[y * width:(y + 1) * width] = row
+    return result
+
+def signed_distance_bytes(mask, spread):
+    """L 模式蒙版（>127 为形状内部）-> 距离场字节，spread 为截断距离（像素）"""
+    width, height = mask.size
+    inside = [value > 127 for value in mask.getdata()]
+    to_inside = squared_distances(inside, width, height)
+    to_outside = squared_distances([not value for value in inside], width, height)
+
+    scale = 127 / spread
+    out = bytearray(width * height)
+    for i, is_inside in enumerate(inside):
+        # 像素中心到边缘相差半个像素
+        if is_inside:
+            distance = to_outside[i] ** 0.5 - 0.5
+        else:
+            distance = -(to_inside[i] ** 0.5 - 0.5)
+        out[i] = max(0, min(255, int(round(128 + distance * scale))))
+    return bytes(out)
+
+def render_sdf(mask, cell_size, spread):
+    """在蒙版分辨率下计算距离场后缩小到 cell_size；spread 以输出像素计"""
+    from PIL import Image
+    source_spread = spread * mask.width / cell_size
+    field = Image.frombytes('L', mask.size, signed_distance_bytes(mask, source_spread))
+    return field.resize((cell_size, cell_size), Image.BOX)
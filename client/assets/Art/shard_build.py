@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+分片构建
+将 art_config.json 派生的素材任务按路径哈希确定性地划分为 N 个分片，
+通过共享目录中的工作队列分发给多个进程或多台机器（离线可用，无需服务端）。
+工作者先处理自己的分片，空闲后从剩余最多的分片尾部窃取任务；队列取空后，若其他工作者
+仍有领取中的任务，则等待其完成或超时（工作者已退出）后放回队列接手，全部完成才退出。
+每个工作者追加写出部分清单，最后合并为 manifest.json，并写出各生成模块的元数据文件
+（UI/nine_slice.json、Scenes/tiling.json 等）。
+每个素材独立渲染、条带大小固定，输出与分片数量无关，逐字节一致。
+
+队列目录结构:
+  plan.json                  分片数与任务列表（含指纹，用于校验各机器代码/配置一致）
+  pending/<分片>/<任务>.json  待处理任务
+  claimed/<工作者>/<任务>.json 已领取任务（os.rename 原子领取）
+  done/<任务>.json            已完成任务
+  manifests/<工作者>.jsonl    部分清单
+  assets/                    输出素材
+
+用法:
+  python shard_build.py init --shards 4 [--queue build/shards]
+  python shard_build.py work --shard 0 [--worker 名称]     # 每台机器/进程各运行一个
+  python shard_build.py merge
+  python shard_build.py status
+  python shard_build.py local --shards 4                   # 本机启动 N 个工作进程并合并
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import asset_graph
+from asset_sinks import FileSink
+
+QUEUE_DIR = asset_graph.ART_DIR / 'build' / 'shards'
+
+# 流式写出的条带内存固定，保证 IDAT 分块与机器内存无关
+STRIP_BUDGET_BYTES = 16 * 1024 * 1024
+
+# 领取后超过该时间（秒）仍未完成的任务视为工作者已退出，重新放回队列
+DEFAULT_RECLAIM_AFTER = 600
+
+# 队列已空、仍有领取中的任务时的轮询间隔（秒）
+DRAIN_POLL_INTERVAL = 2
+
+def task_id(path):
+    """任务文件名（素材路径含目录分隔符，取哈希）"""
+    return hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+
+def shard_of(path, shard_count):
+    """按路径哈希分片，与任务顺序和机器无关"""
+    return int(hashlib.sha1(path.encode('utf-8')).hexdigest(), 16) % shard_count
+
+def load_graph():
+    """加载配置与生成模块，返回 (依赖图, 模块字典)"""
+    config = asset_graph.load_config()
+    modules = {name: asset_graph.load_generator(name) for name in asset_graph.BUILD_MODULES}
+    return asset_graph.build_asset_graph(config, modules), modules
+
+def load_plan(queue):
+    """读取 plan.json"""
+    with open(queue / 'plan.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def init_queue(queue, shard_count, keep_unreferenced=False):
+    """生成任务计划并写入队列目录"""
+    if (queue / 'plan.json').exists():
+        raise SystemExit(f"队列已存在: {queue}（请先删除或换一个目录）")
+    graph, modules = load_graph()
+    if not keep_unreferenced:
+        import asset_refs
+        graph = asset_refs.prune_graph(graph, asset_graph.load_config())
+    tasks = {}
+    for path in sorted(graph):
+        job = graph[path]
+        tasks[task_id(path)] = {
+            'path': path,
+            'shard': shard_of(path, shard_count),
+            'fingerprint': asset_graph.job_fingerprint(job, modules[job['module']]),
+        }
+
+    for shard in range(shard_count):
+        (queue / 'pending' / str(shard)).mkdir(parents=True, exist_ok=True)
+    for name in ('claimed', 'done', 'manifests', 'assets'):
+        (queue / name).mkdir(parents=True, exist_ok=True)
+    for tid, task in tasks.items():
+        with open(queue / 'pending' / str(task['shard']) / f'{tid}.json', 'w', encoding='utf-8') as f:
+            json.dump({'id': tid, **task}, f, ensure_ascii=False)
+
+    # plan.json 最后写出，工作者以它的存在判断队列已就绪
+    with open(queue / 'plan.json', 'w', encoding='utf-8') as f:
+        json.dump({'shards': shard_count, 'tasks': tasks}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"✅ 已创建队列: {queue}（{len(tasks)} 个任务，{shard_count} 个分片）")
+
+def claim(queue, worker, shard, steal=False):
+    """从指定分片领取一个任务，返回任务字典或 None。
+    自己的分片从头部取，窃取时从尾部取，减少与原工作者争抢同一任务"""
+    pending = queue / 'pending' / str(shard)
+    names = sorted(os.listdir(pending), reverse=steal)
+    claimed_dir = queue / 'claimed' / worker
+    for name in names:
+        target = claimed_dir / name
+        try:
+            # 改名前先以当前时间作为超时起点：rename 保留 mtime，否则改名后的旧 mtime
+            # 会被其他工作者的 reclaim_stale 视为超时
+            os.utime(pending / name)
+            os.rename(pending / name, target)
+            with open(target, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            continue  # 已被其他工作者领取，或领取后被放回队列
+    return None
+
+def reclaim_stale(queue, timeout):
+    """将领取超时的任务放回原分片，返回放回数量"""
+    now = time.time()
+    count = 0
+    for worker_dir in (queue / 'claimed').iterdir():
+        for claimed in worker_dir.iterdir():
+            try:
+                if now - claimed.stat().st_mtime < timeout:
+                    continue
+                with open(claimed, 'r', encoding='utf-8') as f:
+                    task = json.load(f)
+                os.rename(claimed, queue / 'pending' / str(task['shard']) / claimed.name)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            count += 1
+    return count
+
+def outstanding_claims(queue):
+    """所有工作者领取中、尚未完成的任务数"""
+    return sum(len(os.listdir(worker_dir)) for worker_dir in (queue / 'claimed').iterdir())
+
+def next_task(queue, worker, shard, shard_count):
+    """先取自己的分片，再从剩余任务最多的分片窃取"""
+    task = claim(queue, worker, shard)
+    if task is not None:
+        return task
+    others = [s for s in range(shard_count) if s != shard]
+    others.sort(key=lambda s: -len(os.listdir(queue / 'pending' / str(s))))
+    for other in others:
+        task = claim(queue, worker, other, steal=True)
+        if task is not None:
+            return task
+    return None
+
+def build_task(task, graph, modules, assets_dir):
+    """渲染单个任务到输出目录，返回清单条目"""
+    job = graph[task['path']]
+    module = modules[job['module']]
+    output_path = assets_dir / job['path']
+    if job.get('strip_func'):
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        asset_graph.stream_job(job, module, output_path, STRIP_BUDGET_BYTES)
+    else:
+        asset_graph.render_job(job, module, FileSink(assets_dir, verbose=False))
+    data = output_path.read_bytes()
+    return {'path': job['path'], 'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest(),
+            'fingerprint': task['fingerprint']}
+
+def run_worker(queue, shard, worker=None, reclaim_after=DEFAULT_RECLAIM_AFTER):
+    """工作者主循环，返回 (完成数, 窃取数)"""
+    queue = Path(queue)
+    worker = worker or f'{socket.gethostname()}-{os.getpid()}'
+    plan = load_plan(queue)
+    shard_count = plan['shards']
+    if not 0 <= shard < shard_count:
+        raise SystemExit(f"分片编号 {shard} 超出范围 0-{shard_count - 1}")
+
+    graph, modules = load_graph()
+    # 计划可能已剔除死素材，只校验计划中的任务
+    mismatched = [task['path'] for task in plan['tasks'].values()
+                  if task['path'] not in graph
+                  or asset_graph.job_fingerprint(graph[task['path']], modules[graph[task['path']]['module']])
+                  != task['fingerprint']]
+    if mismatched:
+        raise SystemExit(f"❌ {len(mismatched)} 个任务与本机代码/配置不一致（如 {mismatched[0]}），"
+                         f"请同步后重试")
+
+    (queue / 'claimed' / worker).mkdir(parents=True, exist_ok=True)
+    assets_dir = queue / 'assets'
+    done = stolen = 0
+    with open(queue / 'manifests' / f'{worker}.jsonl', 'a', encoding='utf-8') as manifest:
+        while True:
+            task = next_task(queue, worker, shard, shard_count)
+            if task is None:
+                if reclaim_stale(queue, reclaim_after):
+                    continue
+                # 其他工作者仍持有任务：等待其完成，或超时后放回队列由本工作者接手
+                if outstanding_claims(queue):
+                    time.sleep(min(DRAIN_POLL_INTERVAL, reclaim_after))
+                    continue
+                break
+            entry = build_task(task, graph, modules, assets_dir)
+            manifest.write(json.dumps(entry, ensure_ascii=False, sort_keys=True) + '\n')
+            manifest.flush()
+            try:
+                os.replace(queue / 'claimed' / worker / f"{task['id']}.json",
+                           queue / 'done' / f"{task['id']}.json")
+            except FileNotFoundError:
+                pass  # 已超时被放回队列，由其他工作者重复生成（结果相同）
+            done += 1
+            stolen += task['shard'] != shard
+    print(f"✅ 工作者 {worker}（分片 {shard}）完成 {done} 个任务，其中窃取 {stolen} 个")
+    return done, stolen
+
+def write_metadata(queue, paths):
+    """写出各生成模块的元数据文件（九宫格切片、平铺信息等，只含计划中的素材），
+    返回 {路径: 清单条目}"""
+    config = asset_graph.load_config()
+    written = {}
+    for name in asset_graph.BUILD_MODULES:
+        module = asset_graph.load_generator(name)
+        if not hasattr(module, 'METADATA_PATH'):
+            continue
+        metadata = {path: info for path, info in module.build_metadata(config).items() if path in paths}
+        if not metadata:
+            continue
+        data = json.dumps(metadata, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+        target = queue / 'assets' / module.METADATA_PATH
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(data)
+        written[module.METADATA_PATH] = {'bytes': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+    return written
+
+def merge_manifests(queue):
+    """合并部分清单为 manifest.json；缺少任务或同一素材哈希冲突时失败"""
+    queue = Path(queue)
+    plan = load_plan(queue)
+    entries = {}
+    conflicts = []
+    for partial in sorted((queue / 'manifests').glob('*.jsonl')):
+        with open(partial, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                previous = entries.setdefault(entry['path'], entry)
+                # 超时重领的任务可能被执行两次，结果必须一致
+                if previous['sha256'] != entry['sha256']:
+                    conflicts.append(entry['path'])
+
+    missing = sorted(task['path'] for task in plan['tasks'].values() if task['path'] not in entries)
+    for path in conflicts:
+        print(f"❌ 输出不一致: {path}")
+    for path in missing:
+        print(f"❌ 未完成: {path}")
+    if missing or conflicts:
+        raise SystemExit(1)
+
+    assets = {path: {'bytes': entry['bytes'], 'sha256': entry['sha256']}
+              for path, entry in sorted(entries.items())}
+    assets.update(write_metadata(queue, set(entries)))
+    with open(queue / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump({'assets': assets}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    digest = hashlib.sha256((queue / 'manifest.json').read_bytes()).hexdigest()
+    print(f"✅ 已合并 {len(assets)} 个素材: {queue / 'manifest.json'}（sha256 {digest[:16]}）")
+
+def show_status(queue):
+    """打印各分片的待处理、领取中与已完成数量"""
+    queue = Path(queue)
+    plan = load_plan(queue)
+    print(f"任务 {len(plan['tasks'])}，已完成 {len(os.listdir(queue / 'done'))}")
+    for shard in range(plan['shards']):
+        print(f"  分片 {shard}: 待处理 {len(os.listdir(queue / 'pending' / str(shard)))}")
+    for worker_dir in sorted((queue / 'claimed').iterdir()):
+        count = len(os.listdir(worker_dir))
+        if count:
+            print(f"  {worker_dir.name}: 领取中 {count}")
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='分片素材构建（共享目录工作队列）')
+    parser.add_argument('command', choices=['init', 'work', 'merge', 'status', 'local'])
+    parser.add_argument('--queue', type=Path, default=QUEUE_DIR, help='共享队列目录')
+    parser.add_argument('--shards', type=int, default=os.cpu_count(), help='分片数量（init/local）')
+    parser.add_argument('--shard', type=int, default=0, help='本工作者负责的分片（work）')
+    parser.add_argument('--worker', help='工作者名称，默认 主机名-进程号')
+    parser.add_argument('--reclaim-after', type=float, default=DEFAULT_RECLAIM_AFTER,
+                        help='领取超过该秒数未完成的任务重新放回队列')
+    parser.add_argument('--keep-unreferenced', action='store_true',
+                        help='不剔除客户端脚本未引用的素材（init/local）')
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        init_queue(args.queue, args.shards, args.keep_unreferenced)
+    elif args.command == 'work':
+        run_worker(args.queue, args.shard, args.worker, args.reclaim_after)
+    elif args.command == 'merge':
+        merge_manifests(args.queue)
+    elif args.command == 'status':
+        show_status(args.queue)
+    else:
+        print("=== 分片构建（本机）===")
+        init_queue(args.queue, args.shards, args.keep_unreferenced)
+        start = time.time()
+        with ProcessPoolExecutor(max_workers=args.shards) as pool:
+            futures = [pool.submit(run_worker, args.queue, shard, f'local-{shard}', args.reclaim_after)
+                       for shard in range(args.shards)]
+            for future in futures:
+                future.result()
+        print(f"构建用时 {time.time() - start:.1f} s")
+        merge_manifests(args.queue)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+精灵后期效果（烘焙）
+将投影、描边、辉光与闪光直接烘焙进精灵图，客户端与 SVG 栅格化都不再需要实时滤镜。
+
+高斯模糊用三次盒式模糊近似（Pillow BoxBlur 为可分离的横/纵两趟），
+各 sigma 对应的盒半径按 sigma 缓存；同一 alpha 轮廓（如同尺寸不同配色的猫咪）
+的模糊结果按 (轮廓, 参数) 缓存，只计算一次。
+
+效果定义（像素单位，按列表顺序叠加；投影/辉光/描边在精灵下方，闪光在上方）:
+  {'type': 'shadow', 'sigma': 3, 'offset': [2, 3], 'color': '#000000', 'opacity': 0.3}
+  {'type': 'glow', 'sigma': 6, 'spread': 2, 'color': '#B0E0E6', 'opacity': 0.9}
+  {'type': 'outline', 'width': 2, 'color': '#6D6D6D'}
+  {'type': 'sparkles', 'count': 6, 'size': 8, 'color': '#FFFFFF', 'seed': 1}
+color 为 'pastel_rainbow' 时按横向色相渐变着色。
+"""
+
+from functools import lru_cache
+
+# 三次盒式模糊近似高斯
+BOX_PASSES = 3
+
+# 稀有度 glowEffect -> 效果模板；sigma/size 等为相对精灵尺寸的比例
+RARITY_EFFECTS = {
+    'none': [],
+    'soft_glow': [{'type': 'glow', 'sigma': 0.04, 'spread': 0.01, 'opacity': 0.9}],
+    'sparkles': [{'type': 'glow', 'sigma': 0.05, 'spread': 0.015, 'opacity': 1.0},
+                 {'type': 'sparkles', 'count': 6, 'size': 0.06, 'color': '#FFFFFF'}],
+    'rainbow_sparkles': [{'type': 'glow', 'sigma': 0.05, 'spread': 0.015, 'opacity': 1.0},
+                         {'type': 'sparkles', 'count': 8, 'size': 0.07, 'color': '#FFFFFF'}],
+}
+
+# 模板中按尺寸缩放的字段
+SCALED_FIELDS = ('sigma', 'spread', 'size', 'width')
+
+@lru_cache(maxsize=None)
+def box_radii(sigma, passes=BOX_PASSES):
+    """sigma -> 各趟盒式模糊的半径（Kovesi 理想盒宽算法），按 sigma 缓存"""
+    ideal = (12 * sigma * sigma / passes + 1) ** 0.5
+    lower = int(ideal)
+    if lower % 2 == 0:
+        lower -= 1
+    upper = lower + 2
+    m = round((12 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes) / (-4 * lower - 4))
+    return tuple((lower if i < m else upper) // 2 for i in range(passes))
+
+def gaussian_blur(mask, sigma):
+    """近似高斯模糊（L 模式）"""
+    from PIL import ImageFilter
+    for radius in box_radii(sigma):
+        if radius > 0:
+            mask = mask.filter(ImageFilter.BoxBlur(radius))
+    return mask
+
+@lru_cache(maxsize=64)
+def _effect_mask(size, alpha_bytes, sigma, spread, offset):
+    """由 alpha 轮廓派生的效果蒙版：外扩 spread、模糊 sigma、平移 offset（按参数缓存）"""
+    from PIL import Image, ImageChops, ImageFilter
+    mask = Image.frombytes('L', size, alpha_bytes)
+    if spread:
+        mask = mask.filter(ImageFilter.MaxFilter(spread * 2 + 1))
+    if sigma:
+        mask = gaussian_blur(mask, sigma)
+    if offset != (0, 0):
+        mask = ImageChops.offset(mask, *offset)
+        # ImageChops.offset 循环平移，清除卷回的部分
+        dx, dy = offset
+        if dx:
+            mask.paste(0, (0, 0, dx, size[1]) if dx > 0 else (size[0] + dx, 0, size[0], size[1]))
+        if dy:
+            mask.paste(0, (0, 0, size[0], dy) if dy > 0 else (0, size[1] + dy, size[0], size[1]))
+    return mask
+
+def effect_mask(alpha, sigma=0, spread=0, offset=(0, 0)):
+    """按 alpha 轮廓取效果蒙版（同一轮廓与参数只计算一次）"""
+    return _effect_mask(alpha.size, alpha.tobytes(), sigma, spread, tuple(offset))
+
+def color_layer(size, color, mask, opacity=1.0):
+    """用蒙版着色的 RGBA 图层"""
+    from PIL import Image
+    if color == 'pastel_rainbow':
+        layer = rainbow_gradient(size)
+    else:
+        layer = Image.new('RGBA', size, color)
+    if opacity != 1.0:
+        mask = mask.point(lambda value: int(value * opacity + 0.5))
+    layer.putalpha(mask)
+    return layer
+
+@lru_cache(maxsize=8)
+def _rainbow_row(width):
+    """横向粉彩色相渐变的一行像素"""
+    import colorsys
+    row = bytearray()
+    for x in range(width):
+        r, g, b = colorsys.hsv_to_rgb(x / width, 0.35, 1.0)
+        row += bytes((round(r * 255), round(g * 255), round(b * 255), 255))
+    return bytes(row)
+
+def rainbow_gradient(size):
+    """粉彩彩虹渐变 RGBA 图像"""
+    from PIL import Image
+    return Image.frombytes('RGBA', (size[0], 1), _rainbow_row(size[0])).resize(size, Image.NEAREST)
+
+def draw_sparkles(img, count, size, color, seed):
+    """在精灵轮廓周围绘制四角星闪光（位置由 seed 决定）"""
+    import math
+    import random
+    from PIL import ImageDraw
+    rng = random.Random(seed)
+    draw = ImageDraw.Draw(img)
+    width, height = img.size
+    for index in range(count):
+        angle = 2 * math.pi * (index + rng.random() * 0.5) / count
+        distance = 0.36 + rng.random() * 0.08
+        x = width / 2 + math.cos(angle) * width * distance
+        y = height / 2 + math.sin(angle) * height * distance
+        r = size * (0.6 + rng.random() * 0.4) / 2
+        w = max(1.0, r / 4)
+        draw.polygon([(x, y - r), (x + w, y - w), (x + r, y), (x + w, y + w),
+                      (x, y + r), (x - w, y + w), (x - r, y), (x - w, y - w)], fill=color)
+
+def apply_effects(img, effects):
+    """按效果列表烘焙，返回新的 RGBA 图像"""
+    from PIL import Image
+    img = img.convert('RGBA')
+    alpha = img.getchannel('A')
+    under = Image.new('RGBA', img.size, (0, 0, 0, 0))
+    sparkles = []
+    for effect in effects:
+        kind = effect['type']
+        if kind == 'shadow':
+            mask = effect_mask(alpha, effect.get('sigma', 0), 0, effect.get('offset', (0, 0)))
+        elif kind == 'glow':
+            mask = effect_mask(alpha, effect.get('sigma', 0), effect.get('spread', 0))
+        elif kind == 'outline':
+            mask = effect_mask(alpha, 0, effect['width'])
+        elif kind == 'sparkles':
+            sparkles.append(effect)
+            continue
+        else:
+            raise ValueError(f"未知效果类型: {kind}")
+        layer = color_layer(img.size, effect.get('color', '#000000'), mask, effect.get('opacity', 1.0))
+        under = Image.alpha_composite(under, layer)
+    result = Image.alpha_composite(under, img)
+    for effect in sparkles:
+        draw_sparkles(result, effect['count'], effect['size'], effect.get('color', '#FFFFFF'),
+                      effect.get('seed', 0))
+    return result
+
+def scale_effects(template, size, color=None, seed=0):
+    """将效果模板按精灵尺寸换算为像素；未指定颜色的效果使用 color"""
+    effects = []
+    for effect in template:
+        resolved = dict(effect)
+        for field in SCALED_FIELDS:
+            if field in resolved:
+                resolved[field] = max(1, round(resolved[field] * size))
+        if 'color' not in resolved:
+            resolved['color'] = color or '#FFFFFF'
+        if resolved['type'] == 'sparkles':
+            resolved['seed'] = seed
+        effects.append(resolved)
+    return effects
+
+def rarity_of(config, name):
+    """角色名 -> 稀有度配置（characters.cats.rarities 中的 examples），未列出时为 None"""
+    rarities = (config or {}).get('characters', {}).get('cats', {}).get('rarities', {})
+    for rarity in rarities.values():
+        if name in rarity.get('examples', []):
+            return rarity
+    return None
+
+def rarity_effects(config, name, size):
+    """按稀有度的 glowEffect 与 borderColor 得到像素单位的效果列表"""
+    rarity = rarity_of(config, name)
+    if rarity is None:
+        return []
+    template = RARITY_EFFECTS.get(rarity.get('glowEffect', 'none'), [])
+    seed = sum(name.encode('utf-8'))
+    return scale_effects(template, size, rarity.get('borderColor'), seed)
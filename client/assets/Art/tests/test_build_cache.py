@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+build_cache 缓存键测试
+绘制文字的任务按实际使用的字体文件（路径与内容）区分缓存键，不含文字的任务不受字体影响。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import asset_graph  # noqa: E402
+import build_cache  # noqa: E402
+
+class FontCacheKeyTest(unittest.TestCase):
+    """以 CATCAFE_ASSET_FONT 指定不同的字体文件，比较缓存键"""
+
+    def setUp(self):
+        self.module = asset_graph.load_generator('generate_assets')
+        jobs = {job['path']: {**job, 'module': 'generate_assets'}
+                for job in self.module.asset_jobs(asset_graph.load_config())}
+        self.icon = jobs['UI/gold_coin/gold_coin_64.png']
+        self.scene = jobs['Scenes/coffee_shop_bg/coffee_shop_bg_512.png']
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def font(self, name, content):
+        path = self.root / name
+        path.write_bytes(content)
+        # 保证 mtime 变化（字体摘要按 mtime/大小缓存）
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        return str(path)
+
+    def key(self, job, font):
+        with mock.patch.dict(os.environ, {self.module.FONT_ENV: font}):
+            return build_cache.cache_key(job, self.module)
+
+    def test_font_path_and_content(self):
+        first = self.font('first.ttf', b'font-a')
+        second = self.font('second.ttf', b'font-a')
+        keys = {self.key(self.icon, first), self.key(self.icon, second)}
+        self.font('first.ttf', b'font-b')
+        keys.add(self.key(self.icon, first))
+        keys.add(self.key(self.icon, self.module.PILLOW_DEFAULT_FONT))
+        self.assertEqual(len(keys), 4)
+
+    def test_job_without_text(self):
+        font = self.font('first.ttf', b'font-a')
+        self.assertIsNone(self.module.job_font(self.scene))
+        self.assertEqual(self.key(self.scene, font), self.key(self.scene, self.module.PILLOW_DEFAULT_FONT))
+
+if __name__ == '__main__':
+    unittest.main()
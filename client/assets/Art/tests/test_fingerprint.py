@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+素材任务指纹测试
+渲染函数引用的其他 Art 目录模块（模块级导入、函数内导入及其传递依赖）改动后，指纹必须变化。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import importlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ART_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ART_DIR))
+
+import asset_graph  # noqa: E402
+
+# 在 Art 目录副本中计算指定任务的指纹（子进程中执行，模块缓存互不影响）
+FINGERPRINT_SCRIPT = '''
+import sys
+import asset_graph
+module = asset_graph.load_generator(sys.argv[1])
+for job in module.asset_jobs(asset_graph.load_config()):
+    if job['path'] == sys.argv[2]:
+        print(asset_graph.job_fingerprint(job, module))
+        break
+else:
+    raise SystemExit('任务不存在: ' + sys.argv[2])
+'''
+
+class ArtCopy:
+    """Art 目录的临时副本（只含脚本与配置），用于修改源码后重新计算指纹"""
+
+    def __init__(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.art = Path(self.tmp.name) / 'client' / 'assets' / 'Art'
+        self.art.mkdir(parents=True)
+        for path in [*ART_DIR.glob('*.py'), ART_DIR / 'art_config.json']:
+            shutil.copy2(path, self.art / path.name)
+
+    def fingerprint(self, module, path):
+        result = subprocess.run([sys.executable, '-c', FINGERPRINT_SCRIPT, module, path], cwd=self.art,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.split()[-1]
+
+    def edit(self, file_name, old, new):
+        path = self.art / file_name
+        source = path.read_text(encoding='utf-8')
+        if old not in source:
+            raise AssertionError(f'{file_name} 中不存在: {old}')
+        path.write_text(source.replace(old, new, 1), encoding='utf-8')
+
+    def cleanup(self):
+        self.tmp.cleanup()
+
+class FingerprintTestCase(unittest.TestCase):
+    """修改 Art 目录副本中的源码，断言任务指纹变化"""
+
+    def assert_edit_invalidates(self, module, path, file_name, old, new):
+        copy = ArtCopy()
+        self.addCleanup(copy.cleanup)
+        before = copy.fingerprint(module, path)
+        copy.edit(file_name, old, new)
+        self.assertNotEqual(before, copy.fingerprint(module, path), f'修改 {file_name} 后 {path} 的指纹未变化')
+
+class CatSpriteFingerprintTest(FingerprintTestCase):
+    """猫咪精灵的烘焙效果来自 sprite_effects"""
+
+    CAT = 'Characters/Cats/sakura_cat/sakura_cat_256.png'
+
+    def test_blur_passes(self):
+        self.assert_edit_invalidates('generate_assets', self.CAT, 'sprite_effects.py',
+                                     'BOX_PASSES = 3', 'BOX_PASSES = 1')
+
+    def test_blur_code(self):
+        self.assert_edit_invalidates('generate_assets', self.CAT, 'sprite_effects.py',
+                                     'mask = mask.filter(ImageFilter.BoxBlur(radius))',
+                                     'mask = mask.filter(ImageFilter.BoxBlur(radius + 1))')
+
+class ButtonStateFingerprintTest(FingerprintTestCase):
+    """按钮状态条带与从条带裁出的状态图，底图来自 nine_slice"""
+
+    def test_strip(self):
+        self.assert_edit_invalidates('button_states', 'UI/primary_states.png', 'nine_slice.py',
+                                     'SUPERSAMPLE = 4', 'SUPERSAMPLE = 2')
+
+    def test_cropped_state(self):
+        self.assert_edit_invalidates('button_states', 'UI/primary_pressed.png', 'nine_slice.py',
+                                     'SUPERSAMPLE = 4', 'SUPERSAMPLE = 2')
+
+class SdfAtlasFingerprintTest(FingerprintTestCase):
+    """SDF 图集的距离场来自 sdf_icons（渲染函数内导入）"""
+
+    def test_distance_scale(self):
+        self.assert_edit_invalidates('generate_assets', 'UI/SDF/ui_icons_sdf.png', 'sdf_icons.py',
+                                     'scale = 127 / spread', 'scale = 120 / spread')
+
+class TileFingerprintTest(FingerprintTestCase):
+    """平铺纹理以各自的渲染函数为任务函数，指纹覆盖渲染函数及其调用的噪声函数"""
+
+    def test_rain_density(self):
+        self.assert_edit_invalidates('tileable_textures', 'Effects/rain_drops.png', 'tileable_textures.py',
+                                     'width * height // 1100', 'width * height // 300')
+
+    def test_periodic_noise(self):
+        self.assert_edit_invalidates('tileable_textures', 'Scenes/FishingArea/sky_clouds.png',
+                                     'tileable_textures.py', 'pad = 2', 'pad = 3')
+
+class LocalizedFontFingerprintTest(unittest.TestCase):
+    """本地化素材的参数含解析后的字体文件，换用字体时指纹变化"""
+
+    PATH = 'Localization/zh-CN/UI/gold_coin/gold_coin_64.png'
+
+    def fingerprint(self, font_dir, file_name):
+        import localized_assets
+        (font_dir / 'Chinese' / Path(file_name).stem).mkdir(parents=True)
+        (font_dir / 'Chinese' / Path(file_name).stem / file_name).write_bytes(b'font')
+        config = asset_graph.load_config()
+        config['fonts'] = {'basePath': f'{font_dir}/', 'chinese': {'bold': file_name}}
+        for job in localized_assets.asset_jobs(config):
+            if job['path'] == self.PATH:
+                return job['args'][-1], asset_graph.job_fingerprint(job, localized_assets)
+        self.fail(f'任务不存在: {self.PATH}')
+
+    def test_font_change(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        first_font, first = self.fingerprint(Path(tmp.name), 'first.ttf')
+        second_font, second = self.fingerprint(Path(tmp.name), 'second.ttf')
+        self.assertTrue(first_font.endswith('first.ttf'), first_font)
+        self.assertTrue(second_font.endswith('second.ttf'), second_font)
+        self.assertNotEqual(first, second)
+
+class DependencyDigestTest(unittest.TestCase):
+    """用临时模块检查 code_digest 对依赖模块的跟踪"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = Path(self.tmp.name).resolve()
+        sys.path.insert(0, str(self.root))
+        self.addCleanup(sys.path.remove, str(self.root))
+        patcher = mock.patch.object(asset_graph, 'ART_DIR', self.root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.names = []
+        self.addCleanup(self.unload)
+
+    def unload(self):
+        for name in self.names:
+            sys.modules.pop(name, None)
+
+    def write(self, name, source):
+        path = self.root / f'{name}.py'
+        path.write_text(textwrap.dedent(source), encoding='utf-8')
+        # 保证 mtime 变化（缓存按 mtime/大小区分）
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9 * (len(self.names) + 1)))
+        if name not in self.names:
+            self.names.append(name)
+
+    def digest(self, module_name, func_name):
+        for name in self.names:
+            sys.modules.pop(name, None)
+        importlib.invalidate_caches()
+        module = importlib.import_module(module_name)
+        return asset_graph.code_digest(getattr(module, func_name))
+
+    def test_module_level_import(self):
+        self.write('fp_effects', 'PASSES = 3\ndef blur(x):\n    return x * PASSES\n')
+        self.write('fp_render', 'import fp_effects\ndef render():\n    return fp_effects.blur(1)\n')
+        before = self.digest('fp_render', 'render')
+        self.write('fp_effects', 'PASSES = 1\ndef blur(x):\n    return x * PASSES\n')
+        self.assertNotEqual(before, self.digest('fp_render', 'render'))
+
+    def test_imported_function_and_lazy_import(self):
+        self.write('fp_effects', 'RADIUS = 4\ndef glow(x):\n    return x + RADIUS\n')
+        self.write('fp_base', 'def outline(x):\n    return x\n')
+        self.write('fp_render', '''
+            from fp_base import outline
+            def render():
+                import fp_effects
+                return fp_effects.glow(outline(1))
+        ''')
+        self.assertEqual(asset_graph.code_dependencies(
+            importlib.import_module('fp_render').render),
+            sorted(str(self.root / f'{name}.py') for name in ('fp_base', 'fp_effects')))
+        before = self.digest('fp_render', 'render')
+        self.write('fp_effects', 'RADIUS = 8\ndef glow(x):\n    return x + RADIUS\n')
+        self.assertNotEqual(before, self.digest('fp_render', 'render'))
+
+    def test_transitive_dependency(self):
+        self.write('fp_blur', 'PASSES = 3\n')
+        self.write('fp_effects', 'import fp_blur\ndef glow(x):\n    return x * fp_blur.PASSES\n')
+        self.write('fp_render', 'import fp_effects\ndef render():\n    return fp_effects.glow(1)\n')
+        before = self.digest('fp_render', 'render')
+        self.write('fp_blur', 'PASSES = 2\n')
+        self.assertNotEqual(before, self.digest('fp_render', 'render'))
+
+    def test_unrelated_module_is_ignored(self):
+        self.write('fp_other', 'VALUE = 1\n')
+        self.write('fp_render', 'def render():\n    return 1\n')
+        before = self.digest('fp_render', 'render')
+        self.write('fp_other', 'VALUE = 2\n')
+        self.assertEqual(before, self.digest('fp_render', 'render'))
+
+if __name__ == '__main__':
+    unittest.main()
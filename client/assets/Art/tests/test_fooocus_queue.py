@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+fooocus_queue 队列测试
+以 make_mock_handler 启动本地替身服务，驱动 run_queue 检查重试、429 背压与缓存命中。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fooocus_queue  # noqa: E402
+from build_cache import DirectoryCache  # noqa: E402
+
+def make_payload(prompt, seed=1):
+    """最小请求体（替身服务只读取提示词、种子与分辨率）"""
+    return {'prompt': prompt, 'image_seed': seed, 'aspect_ratios_selection': '1024*1024'}
+
+class MockServerTest(unittest.TestCase):
+    """每个用例启动一个替身服务，记录返回的状态码"""
+
+    def start_server(self, fail_rate=0.0, latency=0.0, max_inflight=2):
+        statuses = []
+        base = fooocus_queue.make_mock_handler(fail_rate, latency, max_inflight)
+
+        class RecordingHandler(base):
+            def _send(self, status, body, headers=None):
+                statuses.append(status)
+                super()._send(status, body, headers)
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache = DirectoryCache(cache_dir.name)
+        return f'http://127.0.0.1:{server.server_address[1]}', statuses
+
+    def test_retries_server_errors(self):
+        url, statuses = self.start_server(fail_rate=0.5)
+        client = fooocus_queue.FooocusClient(url, retries=3, backoff=0.01)
+        # 前两次请求返回 503，第三次成功
+        with mock.patch('random.random', side_effect=[0.0, 0.0, 0.9]):
+            results, errors = fooocus_queue.run_queue([('UI/a.png', make_payload('a'))], client,
+                                                      self.cache, concurrency=1)
+        self.assertEqual(errors, {})
+        self.assertEqual(statuses, [503, 503, 200])
+        self.assertIsNotNone(self.cache.get(results['UI/a.png']))
+
+    def test_gives_up_after_retries(self):
+        url, statuses = self.start_server(fail_rate=1.0)
+        client = fooocus_queue.FooocusClient(url, retries=2, backoff=0.01)
+        results, errors = fooocus_queue.run_queue([('UI/a.png', make_payload('a'))], client, self.cache)
+        self.assertEqual(results, {})
+        self.assertEqual(getattr(errors['UI/a.png'], 'code', None), 503)
+        self.assertEqual(statuses, [503, 503, 503])
+
+    def test_backpressure_429_is_retried(self):
+        url, statuses = self.start_server(latency=0.3, max_inflight=1)
+        client = fooocus_queue.FooocusClient(url, retries=5, backoff=0.01)
+        requests = [(f'UI/{name}.png', make_payload(name)) for name in 'abc']
+        results, errors = fooocus_queue.run_queue(requests, client, self.cache, concurrency=3)
+        self.assertEqual(errors, {})
+        self.assertEqual(sorted(results), [path for path, _ in requests])
+        self.assertIn(429, statuses)
+        self.assertEqual(statuses.count(200), 3)
+
+    def test_max_pending_blocks_submission(self):
+        url, _ = self.start_server(latency=0.05, max_inflight=8)
+        client = fooocus_queue.FooocusClient(url)
+        active = []
+        peak = []
+        lock = threading.Lock()
+        generate = client.generate
+
+        def tracked(payload):
+            with lock:
+                active.append(payload['prompt'])
+                peak.append(len(active))
+            try:
+                return generate(payload)
+            finally:
+                with lock:
+                    active.remove(payload['prompt'])
+
+        client.generate = tracked
+        requests = [(f'UI/{index}.png', make_payload(str(index))) for index in range(6)]
+        results, errors = fooocus_queue.run_queue(requests, client, self.cache, concurrency=4, max_pending=2)
+        self.assertEqual((len(results), errors), (6, {}))
+        self.assertLessEqual(max(peak), 2)
+
+    def test_cache_hits_and_duplicates_are_not_submitted(self):
+        url, statuses = self.start_server()
+        client = fooocus_queue.FooocusClient(url, backoff=0.01)
+        # 两个路径请求体相同，只提交一次
+        requests = [('UI/a.png', make_payload('a')), ('UI/a_copy.png', make_payload('a')),
+                    ('UI/b.png', make_payload('b'))]
+        first, errors = fooocus_queue.run_queue(requests, client, self.cache)
+        self.assertEqual(errors, {})
+        self.assertEqual(statuses, [200, 200])
+        self.assertEqual(first['UI/a.png'], first['UI/a_copy.png'])
+
+        second, errors = fooocus_queue.run_queue(requests, client, self.cache)
+        self.assertEqual((second, errors), (first, {}))
+        self.assertEqual(statuses, [200, 200])
+
+class RetryAfterTest(unittest.TestCase):
+    """Retry-After 的秒数与 HTTP 日期形式"""
+
+    def test_seconds(self):
+        self.assertEqual(fooocus_queue.retry_after('3'), 3.0)
+        self.assertEqual(fooocus_queue.retry_after('-1'), 0.0)
+
+    def test_http_date(self):
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = fooocus_queue.retry_after(format_datetime(when, usegmt=True))
+        self.assertTrue(28 <= delay <= 30, delay)
+        self.assertEqual(fooocus_queue.retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0.0)
+
+    def test_missing_or_invalid(self):
+        self.assertIsNone(fooocus_queue.retry_after(None))
+        self.assertIsNone(fooocus_queue.retry_after('soon'))
+
+if __name__ == '__main__':
+    unittest.main()
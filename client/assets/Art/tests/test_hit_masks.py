@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+hit_masks 点击掩码测试
+降采样后每格取格内最大值：格内任一像素不透明即命中，单个像素在大格中也不能丢失。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+import hit_masks  # noqa: E402
+
+def sprite(width, height, pixels):
+    """透明图像，pixels 为 {(x, y): alpha}"""
+    img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    for (x, y), alpha in pixels.items():
+        img.putpixel((x, y), (255, 255, 255, alpha))
+    return img
+
+def hit_cells(mask):
+    """命中的格 {(列, 行)}"""
+    return {(col, row) for row in range(mask['h']) for col in range(mask['w'])
+            if hit_masks.hit_test(mask, col * mask['cell'], row * mask['cell'])}
+
+class CellSizeTest(unittest.TestCase):
+    """长边不超过 MAX_CELLS 格"""
+
+    def test_cell_size(self):
+        self.assertEqual(hit_masks.cell_size(64, 64), 1)
+        self.assertEqual(hit_masks.cell_size(256, 256), 4)
+        self.assertEqual(hit_masks.cell_size(65, 10), 2)
+        self.assertEqual(hit_masks.cell_size(100, 300), 5)
+
+class BuildMaskTest(unittest.TestCase):
+    """build_mask 与逐格暴力求解一致"""
+
+    def test_single_pixel_large_cells(self):
+        for cell in (2, 4, 8, 16, 32):
+            mask = hit_masks.build_mask(sprite(100, 100, {(37, 61): 255}), cell)
+            self.assertEqual(hit_cells(mask), {(37 // cell, 61 // cell)}, f'cell={cell}')
+            self.assertTrue(hit_masks.hit_test(mask, 37, 61))
+
+    def test_alpha_threshold(self):
+        threshold = hit_masks.ALPHA_THRESHOLD
+        for cell in (1, 8):
+            self.assertEqual(hit_cells(hit_masks.build_mask(sprite(16, 16, {(3, 3): threshold - 1}), cell)), set())
+            self.assertEqual(len(hit_cells(hit_masks.build_mask(sprite(16, 16, {(3, 3): threshold}), cell))), 1)
+
+    def test_partial_edge_cells(self):
+        # 宽 9、格 4：第 3 列只有 1 像素宽，补齐后仍参与判断
+        mask = hit_masks.build_mask(sprite(9, 5, {(8, 4): 255}), 4)
+        self.assertEqual((mask['w'], mask['h'], mask['stride']), (3, 2, 1))
+        self.assertEqual(hit_cells(mask), {(2, 1)})
+
+    def test_matches_brute_force(self):
+        rng = random.Random(11)
+        for _ in range(20):
+            width, height = rng.randint(1, 80), rng.randint(1, 80)
+            cell = rng.choice([1, 2, 3, 5, 8, 13])
+            pixels = {(rng.randrange(width), rng.randrange(height)): rng.randrange(256)
+                      for _ in range(rng.randint(0, 12))}
+            expected = {(x // cell, y // cell) for (x, y), alpha in pixels.items()
+                        if alpha >= hit_masks.ALPHA_THRESHOLD}
+            mask = hit_masks.build_mask(sprite(width, height, pixels), cell)
+            self.assertEqual((mask['w'], mask['h']), (-(-width // cell), -(-height // cell)))
+            self.assertEqual(hit_cells(mask), expected, f'{width}x{height} cell={cell}')
+
+    def test_row_stride(self):
+        # 9 列需 2 字节，每行补齐到整字节
+        mask = hit_masks.build_mask(sprite(9, 2, {(8, 0): 255, (0, 1): 255}), 1)
+        self.assertEqual(mask['stride'], 2)
+        self.assertEqual(hit_cells(mask), {(8, 0), (0, 1)})
+
+class HitTestTest(unittest.TestCase):
+    """越界坐标不命中，格内任意坐标结果相同"""
+
+    def setUp(self):
+        self.mask = hit_masks.build_mask(sprite(32, 32, {(9, 9): 255}), 8)
+
+    def test_same_cell(self):
+        for x, y in [(8, 8), (15, 15), (9.7, 12.2)]:
+            self.assertTrue(hit_masks.hit_test(self.mask, x, y), (x, y))
+        self.assertFalse(hit_masks.hit_test(self.mask, 16, 8))
+
+    def test_out_of_bounds(self):
+        for x, y in [(-1, 9), (9, -1), (32, 9), (9, 32)]:
+            self.assertFalse(hit_masks.hit_test(self.mask, x, y), (x, y))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+release 增量补丁测试
+随机构造新旧文件检查分块差分的往返一致性，并在临时版本目录中生成、应用与校验补丁。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import release  # noqa: E402
+
+def roundtrip(old, new, block_size=release.BLOCK_SIZE):
+    """差分 -> 编码 -> 应用，返回 (还原结果, 补丁字节)"""
+    patch = release.encode_delta(release.make_delta(old, new, block_size))
+    return release.apply_delta(old, patch), patch
+
+def mutate(rng, data):
+    """对字节串做一次随机插入/删除/替换/追加"""
+    data = bytearray(data)
+    kind = rng.choice(['insert', 'delete', 'replace', 'append', 'prepend'])
+    at = rng.randint(0, len(data))
+    chunk = rng.randbytes(rng.randint(1, 300))
+    if kind == 'insert':
+        data[at:at] = chunk
+    elif kind == 'delete':
+        del data[at:at + rng.randint(1, 300)]
+    elif kind == 'replace':
+        data[at:at + len(chunk)] = chunk
+    elif kind == 'append':
+        data += chunk
+    else:
+        data[:0] = chunk
+    return bytes(data)
+
+class DeltaTest(unittest.TestCase):
+    """make_delta / encode_delta / apply_delta"""
+
+    def test_random_roundtrip(self):
+        rng = random.Random(2024)
+        for case in range(30):
+            block_size = rng.choice([16, 64, 256, release.BLOCK_SIZE])
+            old = rng.randbytes(rng.randint(0, 20000))
+            new = old
+            for _ in range(rng.randint(0, 4)):
+                new = mutate(rng, new)
+            if case % 10 == 9:
+                new = rng.randbytes(rng.randint(0, 500))  # 与旧文件无关
+            restored, _ = roundtrip(old, new, block_size)
+            self.assertEqual(restored, new, f'第 {case} 组（块大小 {block_size}）还原不一致')
+
+    def test_unchanged_is_single_copy(self):
+        old = random.Random(1).randbytes(release.BLOCK_SIZE * 4)
+        self.assertEqual(release.make_delta(old, old), [('copy', 0, len(old))])
+
+    def test_small_edit_reuses_old_blocks(self):
+        rng = random.Random(3)
+        old = rng.randbytes(release.BLOCK_SIZE * 32)
+        new = old[:30000] + b'edit' + old[30000:]
+        restored, patch = roundtrip(old, new)
+        self.assertEqual(restored, new)
+        self.assertLess(len(patch), release.BLOCK_SIZE * 2)
+
+    def test_empty_files(self):
+        self.assertEqual(roundtrip(b'', b'abc')[0], b'abc')
+        self.assertEqual(roundtrip(b'abc', b'')[0], b'')
+
+    def test_invalid_patch(self):
+        with self.assertRaises(ValueError):
+            release.apply_delta(b'', zlib.compress(b'XXXX'))
+        copy_past_end = release.encode_delta([('copy', 0, 10)])
+        with self.assertRaises(ValueError):
+            release.apply_delta(b'short', copy_past_end)
+
+class PatchTest(unittest.TestCase):
+    """在临时目录中构造两个版本，生成并应用补丁，再校验安装目录"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        rng = random.Random(5)
+        bundle = rng.randbytes(release.BLOCK_SIZE * 8)
+        self.old = self.write_release('1.0.0', {
+            'manifest.json': b'{"version": "1.0.0"}',
+            'index.json': b'{}',
+            'bundles/low/ui.zip': bundle,
+            'bundles/low/cats.zip': rng.randbytes(3000),
+        })
+        self.new = self.write_release('1.1.0', {
+            'manifest.json': b'{"version": "1.1.0"}',
+            'index.json': b'{}',
+            'bundles/low/ui.zip': bundle[:5000] + b'changed' + bundle[5000:],
+            'bundles/high/ui.zip': rng.randbytes(1000),
+        })
+        self.patch_dir = self.root / 'patch'
+        self.index = release.make_patch(self.old, self.new, self.patch_dir, '1.0.0', '1.1.0')
+        self.install = self.root / 'install'
+        shutil.copytree(self.old, self.install)
+
+    def write_release(self, version, files):
+        root = self.root / version
+        for name, data in files.items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_bytes(data)
+        return root
+
+    def test_actions(self):
+        actions = {name: entry['action'] for name, entry in self.index['files'].items()}
+        self.assertEqual(actions, {'manifest.json': 'patch', 'index.json': 'unchanged',
+                                   'bundles/low/ui.zip': 'patch', 'bundles/high/ui.zip': 'add',
+                                   'bundles/low/cats.zip': 'remove'})
+        self.assertLess(self.index['files']['bundles/low/ui.zip']['patch_bytes'], release.BLOCK_SIZE * 2)
+
+    def test_apply_and_verify(self):
+        self.assertNotEqual(release.verify(self.install, self.new), [])
+        release.apply_patch(self.patch_dir, self.install)
+        self.assertEqual(release.verify(self.install, self.new), [])
+
+    def test_verify_reports_changed_missing_and_extra(self):
+        (self.install / 'manifest.json').write_bytes(b'tampered')
+        (self.install / 'bundles/low/cats.zip').unlink()
+        (self.install / 'bundles/low/extra.zip').write_bytes(b'extra')
+        self.assertEqual(release.verify(self.install, self.old),
+                         ['bundles/low/cats.zip', 'manifest.json', 'bundles/low/extra.zip'])
+
+    def test_refuses_mismatched_install(self):
+        (self.install / 'bundles/low/ui.zip').write_bytes(b'tampered')
+        with self.assertRaises(SystemExit):
+            release.apply_patch(self.patch_dir, self.install)
+        # 失败时安装目录保持不变
+        self.assertEqual((self.install / 'bundles/low/ui.zip').read_bytes(), b'tampered')
+        self.assertEqual(release.verify(self.install, self.old), ['bundles/low/ui.zip'])
+
+if __name__ == '__main__':
+    unittest.main()
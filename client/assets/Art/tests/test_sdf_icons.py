@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+sdf_icons 距离场测试
+用单像素蒙版固定已知距离处的取值，并与暴力求解的欧氏距离变换对照。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+import sdf_icons  # noqa: E402
+
+def single_pixel_mask(size=9):
+    """中心单个像素为形状内部的蒙版"""
+    mask = Image.new('L', (size, size), 0)
+    mask.putpixel((size // 2, size // 2), 255)
+    return mask
+
+class SignedDistanceTest(unittest.TestCase):
+    """128 为边缘，每像素距离对应 127 / spread 个灰度级"""
+
+    def setUp(self):
+        field = sdf_icons.signed_distance_bytes(single_pixel_mask(), 4)
+        self.value = lambda x, y: field[y * 9 + x]
+
+    def test_inside_pixel(self):
+        # 像素中心距边缘半个像素：128 + 0.5 * 127 / 4
+        self.assertEqual(self.value(4, 4), 144)
+
+    def test_outside_distances(self):
+        # 距形状像素中心 d 的外部像素，距边缘 d - 0.5
+        self.assertEqual(self.value(5, 4), 112)   # d = 1
+        self.assertEqual(self.value(4, 6), 80)    # d = 2
+        self.assertEqual(self.value(5, 5), 99)    # d = √2
+        self.assertEqual(self.value(8, 4), 17)    # d = 4
+
+    def test_clamped_beyond_spread(self):
+        self.assertEqual(self.value(0, 0), 0)
+
+    def test_symmetric(self):
+        for x, y in [(3, 4), (4, 3), (4, 5), (3, 3), (6, 5)]:
+            self.assertEqual(self.value(x, y), self.value(8 - x, 8 - y), (x, y))
+
+class SquaredDistanceTest(unittest.TestCase):
+    """可分离距离变换与逐点暴力求解一致"""
+
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(10):
+            width, height = rng.randint(1, 12), rng.randint(1, 12)
+            feature = [rng.random() < 0.15 for _ in range(width * height)]
+            points = [(i % width, i // width) for i, value in enumerate(feature) if value]
+            expected = [min(((x - px) ** 2 + (y - py) ** 2 for px, py in points), default=float('inf'))
+                        for y in range(height) for x in range(width)]
+            self.assertEqual(sdf_icons.squared_distances(feature, width, height), expected)
+
+class RenderSdfTest(unittest.TestCase):
+    """spread 以输出像素计，缩小后边缘距离保持不变"""
+
+    def test_same_size_matches_bytes(self):
+        mask = single_pixel_mask()
+        field = sdf_icons.render_sdf(mask, 9, 4)
+        self.assertEqual(field.tobytes(), sdf_icons.signed_distance_bytes(mask, 4))
+
+    def test_downscaled_spread(self):
+        # 64 像素的半平面缩小到 16 像素：边缘两侧的取值与在 16 像素下直接计算一致
+        mask = Image.new('L', (64, 64), 0)
+        mask.paste(255, (0, 0, 32, 64))
+        field = sdf_icons.render_sdf(mask, 16, 4)
+        row = [field.getpixel((x, 8)) for x in range(16)]
+        self.assertEqual(row[7] + row[8], 256)
+        self.assertEqual(row[0], 255)
+        self.assertEqual(row[15], 0)
+
+if __name__ == '__main__':
+    unittest.main()
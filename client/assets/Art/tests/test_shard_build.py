@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+shard_build 工作队列测试
+在临时目录中构造队列，检查领取、超时放回与任务窃取；
+工作者主循环以替身生成模块运行，不渲染真实素材。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import asset_graph  # noqa: E402
+import shard_build  # noqa: E402
+
+def render_text(text):
+    """替身渲染函数：直接返回字节"""
+    return text.encode('utf-8')
+
+def fake_graph(paths):
+    """替身依赖图与模块"""
+    module = types.ModuleType('fake_generator')
+    module.render_text = render_text
+    graph = {path: {'path': path, 'category': 'test', 'name': Path(path).stem, 'size': 1,
+                    'module': 'fake_generator', 'func': 'render_text', 'args': (path,)} for path in paths}
+    return graph, {'fake_generator': module}
+
+class QueueTestCase(unittest.TestCase):
+    """在临时目录中构造队列：tasks 为 {素材路径: 分片}"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.queue = Path(tmp.name)
+
+    def make_queue(self, tasks, shard_count, fingerprints=None):
+        fingerprints = fingerprints or {}
+        plan = {}
+        for shard in range(shard_count):
+            (self.queue / 'pending' / str(shard)).mkdir(parents=True)
+        for name in ('claimed', 'done', 'manifests', 'assets'):
+            (self.queue / name).mkdir()
+        for path, shard in tasks.items():
+            tid = shard_build.task_id(path)
+            plan[tid] = {'path': path, 'shard': shard, 'fingerprint': fingerprints.get(path, '')}
+            self.write_task(self.queue / 'pending' / str(shard) / f'{tid}.json', {'id': tid, **plan[tid]})
+        (self.queue / 'plan.json').write_text(json.dumps({'shards': shard_count, 'tasks': plan}), encoding='utf-8')
+        return plan
+
+    def write_task(self, target, task, age=0):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(task), encoding='utf-8')
+        if age:
+            past = time.time() - age
+            os.utime(target, (past, past))
+
+    def pending(self, shard):
+        return sorted(os.listdir(self.queue / 'pending' / str(shard)))
+
+    def claimed(self, worker):
+        return sorted(os.listdir(self.queue / 'claimed' / worker))
+
+class ShardOfTest(unittest.TestCase):
+    """分片只取决于路径与分片数"""
+
+    def test_deterministic(self):
+        paths = [f'UI/icon_{index}.png' for index in range(200)]
+        shards = [shard_build.shard_of(path, 4) for path in paths]
+        self.assertEqual(shards, [shard_build.shard_of(path, 4) for path in paths])
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+
+class ClaimTest(QueueTestCase):
+    """os.rename 原子领取；自己的分片取头部，窃取取尾部"""
+
+    def test_claim_moves_task(self):
+        plan = self.make_queue({'UI/a.png': 0}, 1)
+        (self.queue / 'claimed' / 'w0').mkdir()
+        task = shard_build.claim(self.queue, 'w0', 0)
+        self.assertEqual(task['path'], 'UI/a.png')
+        self.assertEqual(self.pending(0), [])
+        self.assertEqual(self.claimed('w0'), [f'{tid}.json' for tid in plan])
+        self.assertIsNone(shard_build.claim(self.queue, 'w0', 0))
+
+    def test_claim_refreshes_mtime(self):
+        # 排队已久的任务领取后不能立即被视为超时
+        self.make_queue({}, 1)
+        self.write_task(self.queue / 'pending' / '0' / 'old.json', {'id': 'old', 'path': 'UI/a.png', 'shard': 0},
+                        age=3600)
+        (self.queue / 'claimed' / 'w0').mkdir()
+        shard_build.claim(self.queue, 'w0', 0)
+        self.assertEqual(shard_build.reclaim_stale(self.queue, 60), 0)
+        self.assertEqual(self.claimed('w0'), ['old.json'])
+
+    def test_head_and_tail(self):
+        self.make_queue({f'UI/{name}.png': 0 for name in 'abcd'}, 1)
+        (self.queue / 'claimed' / 'w0').mkdir()
+        (self.queue / 'claimed' / 'w1').mkdir()
+        names = self.pending(0)
+        own = shard_build.claim(self.queue, 'w0', 0)
+        stolen = shard_build.claim(self.queue, 'w1', 0, steal=True)
+        self.assertEqual(f"{own['id']}.json", names[0])
+        self.assertEqual(f"{stolen['id']}.json", names[-1])
+
+class StealTest(QueueTestCase):
+    """自己的分片取空后，从剩余任务最多的分片窃取"""
+
+    def test_steals_from_fullest_shard(self):
+        self.make_queue({'UI/a.png': 1, 'UI/b.png': 2, 'UI/c.png': 2, 'UI/d.png': 2}, 3)
+        (self.queue / 'claimed' / 'w0').mkdir()
+        fullest = self.pending(2)
+        task = shard_build.next_task(self.queue, 'w0', 0, 3)
+        self.assertEqual(task['shard'], 2)
+        self.assertEqual(f"{task['id']}.json", fullest[-1])
+
+    def test_own_shard_first(self):
+        self.make_queue({'UI/a.png': 0, 'UI/b.png': 1, 'UI/c.png': 1}, 2)
+        (self.queue / 'claimed' / 'w0').mkdir()
+        self.assertEqual(shard_build.next_task(self.queue, 'w0', 0, 2)['path'], 'UI/a.png')
+        self.assertEqual(shard_build.next_task(self.queue, 'w0', 0, 2)['shard'], 1)
+        self.assertEqual(shard_build.next_task(self.queue, 'w0', 0, 2)['shard'], 1)
+        self.assertIsNone(shard_build.next_task(self.queue, 'w0', 0, 2))
+
+class ReclaimTest(QueueTestCase):
+    """超时的领取放回原分片，未超时的保留"""
+
+    def test_reclaim_stale(self):
+        self.make_queue({}, 2)
+        claimed = self.queue / 'claimed' / 'gone'
+        self.write_task(claimed / 'old.json', {'id': 'old', 'path': 'UI/a.png', 'shard': 1}, age=120)
+        self.write_task(claimed / 'new.json', {'id': 'new', 'path': 'UI/b.png', 'shard': 0})
+        self.assertEqual(shard_build.outstanding_claims(self.queue), 2)
+        self.assertEqual(shard_build.reclaim_stale(self.queue, 60), 1)
+        self.assertEqual(self.pending(1), ['old.json'])
+        self.assertEqual(self.claimed('gone'), ['new.json'])
+        self.assertEqual(shard_build.outstanding_claims(self.queue), 1)
+
+class WorkerTest(QueueTestCase):
+    """工作者取完自己的分片后窃取其他分片，并接手已退出工作者的超时任务"""
+
+    def test_drains_queue(self):
+        paths = [f'UI/{name}.png' for name in 'abcdef']
+        graph, modules = fake_graph(paths)
+        module = modules['fake_generator']
+        fingerprints = {path: asset_graph.job_fingerprint(graph[path], module) for path in paths}
+        plan = self.make_queue({path: index % 2 for index, path in enumerate(paths[:5])}, 2, fingerprints)
+        # 已退出的工作者留下的超时任务
+        tid = shard_build.task_id(paths[5])
+        plan[tid] = {'path': paths[5], 'shard': 1, 'fingerprint': fingerprints[paths[5]]}
+        self.write_task(self.queue / 'claimed' / 'gone' / f'{tid}.json', {'id': tid, **plan[tid]}, age=120)
+        (self.queue / 'plan.json').write_text(json.dumps({'shards': 2, 'tasks': plan}), encoding='utf-8')
+
+        with mock.patch.object(shard_build, 'load_graph', return_value=(graph, modules)):
+            done, stolen = shard_build.run_worker(self.queue, 0, worker='w0', reclaim_after=60)
+        self.assertEqual((done, stolen), (6, 3))
+        self.assertEqual(sorted(os.listdir(self.queue / 'done')), sorted(f'{tid}.json' for tid in plan))
+        self.assertEqual(shard_build.outstanding_claims(self.queue), 0)
+        for path in paths:
+            self.assertEqual((self.queue / 'assets' / path).read_bytes(), path.encode('utf-8'))
+        lines = (self.queue / 'manifests' / 'w0.jsonl').read_text(encoding='utf-8').splitlines()
+        self.assertEqual(sorted(json.loads(line)['path'] for line in lines), paths)
+
+    def test_rejects_mismatched_fingerprint(self):
+        graph, modules = fake_graph(['UI/a.png'])
+        self.make_queue({'UI/a.png': 0}, 1, {'UI/a.png': 'stale'})
+        with mock.patch.object(shard_build, 'load_graph', return_value=(graph, modules)):
+            with self.assertRaises(SystemExit):
+                shard_build.run_worker(self.queue, 0, worker='w0')
+
+if __name__ == '__main__':
+    unittest.main()
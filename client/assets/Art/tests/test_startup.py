@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+命令行启动耗时测试
+与 python -m catcafe_assets check-startup 相同：以 -X importtime 运行 list/status，
+导入耗时不得超过 STARTUP_BUDGET_MS，且不得加载 Pillow 等重型模块。
+
+用法: python -m unittest discover client/assets/Art/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catcafe_assets import __main__ as cli  # noqa: E402
+
+class StartupBudgetTest(unittest.TestCase):
+    """快速命令的导入预算"""
+
+    # 每个命令运行多次取最小导入耗时，抵消机器负载带来的抖动
+    RUNS = 3
+
+    @classmethod
+    def setUpClass(cls):
+        cls.baseline = cli.interpreter_modules()
+
+    def assert_within_budget(self, command):
+        timings = []
+        for _ in range(self.RUNS):
+            returncode, imports, import_ms, heavy, _, stderr = cli.measure_command(command, self.baseline)
+            self.assertEqual(returncode, 0, stderr)
+            self.assertEqual(heavy, [], f'{command} 不应导入 {heavy}')
+            timings.append((import_ms, sorted(imports, reverse=True)[:5]))
+        import_ms, slowest = min(timings)
+        self.assertLessEqual(import_ms, cli.STARTUP_BUDGET_MS,
+                             f'{command} 导入 {import_ms:.1f} ms，最慢: {slowest}')
+
+    def test_list(self):
+        self.assert_within_budget('list')
+
+    def test_status(self):
+        self.assert_within_budget('status')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+纹理显存预算
+按场景、质量等级与平台估算进入场景后常驻的纹理显存，超出预算时构建失败并列出占用最大的纹理。
+
+常驻集合 = 预加载清单（preload_manifest）的 critical 与 deferred 素材 + SCENE_CATEGORIES 中的
+流水线类别（如猫咪），每个素材按质量等级取 index.json 中的对应变体（无则取 common）；
+图集成员计入整张图集页，同一纹理只计一次。纹理尺寸与是否含透明通道取自 manifest.json。
+
+每个纹理计算两种占用:
+  decoded     解码后的 RGBA8
+  compressed  平台压缩格式（performance.texture_compression，如 mobile: ETC2、web: DXT），
+              含透明通道时取对应的 RGBA 变体，按 4x4 块向上取整
+performance.texture_memory.mipmaps 决定图集页（atlas）与独立纹理（texture）是否带完整 mip 链；
+预算 performance.texture_memory.budget_mb 按质量等级配置，与压缩后占用比较。
+
+输出 build/texture_budget.json；pipeline.py 结束时自动检查（--skip-budget 跳过）。
+
+用法: python texture_budget.py [--build build] [--include-idle] [--top 10] [--scene coffeeShop]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import asset_graph
+
+BUILD_DIR = asset_graph.ART_DIR / 'build'
+REPORT_FILE = 'texture_budget.json'
+
+# 纹理格式 -> (块宽, 块高, 不透明每块字节, 含透明每块字节)
+TEXTURE_FORMATS = {
+    'RGBA8': (1, 1, 4, 4),     # 解码后的未压缩纹理
+    'ETC2': (4, 4, 8, 16),     # ETC2 RGB8 / ETC2 RGBA8（EAC alpha）
+    'DXT': (4, 4, 8, 16),      # DXT1(BC1) / DXT5(BC3)
+    'ASTC': (4, 4, 16, 16),    # ASTC 4x4
+}
+DECODED_FORMAT = 'RGBA8'
+
+# 与 pipeline.py 的质量等级一致
+QUALITY_TIERS = ('low', 'medium', 'high')
+COMMON_TIER = 'common'
+
+# 场景中常驻、但不在预加载配置里的流水线类别
+SCENE_CATEGORIES = {
+    'coffeeShop': ['cats'],
+    'fishingArea': ['cats'],
+}
+
+# 计入常驻显存的预加载优先级（idle 为空闲预取，默认不计入）
+RESIDENT_TIERS = ('critical', 'deferred')
+
+TOP_N = 10
+
+MB = 1024 * 1024
+
+def level_bytes(width, height, fmt, has_alpha):
+    """单个 mip 层级的字节数（按压缩块向上取整）"""
+    block_w, block_h, opaque, alpha = TEXTURE_FORMATS[fmt]
+    return -(-width // block_w) * -(-height // block_h) * (alpha if has_alpha else opaque)
+
+def texture_bytes(width, height, fmt, has_alpha, mipmaps):
+    """纹理显存字节数，mipmaps 为真时含完整 mip 链（直到 1x1）"""
+    total = level_bytes(width, height, fmt, has_alpha)
+    while mipmaps and (width > 1 or height > 1):
+        width, height = max(1, width // 2), max(1, height // 2)
+        total += level_bytes(width, height, fmt, has_alpha)
+    return total
+
+def load_build(build_dir):
+    """读取流水线输出，返回 (包清单, 素材索引)"""
+    build_dir = Path(build_dir)
+    if not (build_dir / 'manifest.json').exists():
+        raise SystemExit(f"{build_dir} 中没有构建产物，请先运行 pipeline.py")
+    with open(build_dir / 'manifest.json', 'r', encoding='utf-8') as f:
+        bundles = json.load(f)['bundles']
+    with open(build_dir / 'index.json', 'r', encoding='utf-8') as f:
+        index = json.load(f)['assets']
+    return bundles, index
+
+def locate(variant, bundles):
+    """素材变体 -> (纹理键, 包内文件名, 是否为图集页)"""
+    bundle = variant['bundle']
+    frame = bundles[bundle].get('frames', {}).get(variant['path'])
+    name = frame['page'] if frame else variant['path']
+    return f'{bundle}/{name}', name, frame is not None
+
+def scene_assets(scene, profile, config, index, include_idle=False):
+    """场景常驻的素材键集合，以及不在流水线中的图片"""
+    import preload_manifest
+    key_of = {entry['path']: key for key, variants in index.items() for entry in variants.values()}
+    keys = set()
+    unbuilt = []
+    for tier in (*RESIDENT_TIERS, 'idle') if include_idle else RESIDENT_TIERS:
+        for selector in profile.get(tier, []):
+            for path in preload_manifest.resolve_selector(config, selector):
+                if path in index:
+                    keys.add(path)  # 与尺寸无关的素材键
+                    continue
+                if preload_manifest.ASSET_TYPES.get(Path(path).suffix.lower()) != 'image':
+                    continue
+                if path in key_of:
+                    keys.add(key_of[path])
+                else:
+                    unbuilt.append(path)
+    categories = SCENE_CATEGORIES.get(scene, [])
+    for key, variants in index.items():
+        if any(entry['bundle'].split('/', 1)[1] in categories for entry in variants.values()):
+            keys.add(key)
+    return keys, unbuilt
+
+def scene_textures(keys, quality, index, bundles, mipmaps):
+    """素材键 -> 该质量等级下加载的纹理 {纹理键: 信息}"""
+    textures = {}
+    for key in sorted(keys):
+        variants = index[key]
+        variant = variants.get(quality) or variants.get(COMMON_TIER)
+        if variant is None:
+            continue
+        texture, name, is_atlas = locate(variant, bundles)
+        entry = bundles[variant['bundle']]['entries'][name]
+        info = textures.setdefault(texture, {
+            'width': entry['width'], 'height': entry['height'], 'alpha': entry['alpha'],
+            'kind': 'atlas' if is_atlas else 'texture',
+            'mipmaps': mipmaps['atlas' if is_atlas else 'texture'], 'assets': []})
+        info['assets'].append(variant['path'])
+    return textures
+
+def analyze(config, bundles, index, include_idle=False, scenes=None):
+    """返回 [{scene, tier, platform, format, decoded, compressed, budget, textures}]"""
+    import preload_manifest
+    performance = config.get('performance', {})
+    platforms = performance.get('texture_compression', {})
+    memory = performance.get('texture_memory', {})
+    budgets = memory.get('budget_mb', {})
+    mipmaps = {'atlas': False, 'texture': True, **memory.get('mipmaps', {})}
+    for platform, fmt in platforms.items():
+        if fmt not in TEXTURE_FORMATS:
+            raise SystemExit(f"未知纹理格式 {platform}: {fmt}（支持 {', '.join(TEXTURE_FORMATS)}）")
+
+    rows = []
+    for scene, profile in config.get('preload', preload_manifest.SCENE_PRELOAD).items():
+        if scenes and scene not in scenes:
+            continue
+        keys, unbuilt = scene_assets(scene, profile, config, index, include_idle)
+        for quality in QUALITY_TIERS:
+            textures = scene_textures(keys, quality, index, bundles, mipmaps)
+            for info in textures.values():
+                info['decoded'] = texture_bytes(info['width'], info['height'], DECODED_FORMAT,
+                                                info['alpha'], info['mipmaps'])
+            for platform, fmt in platforms.items():
+                listed = []
+                for texture, info in textures.items():
+                    size = texture_bytes(info['width'], info['height'], fmt, info['alpha'], info['mipmaps'])
+                    listed.append({'texture': texture, **info, 'compressed': size})
+                listed.sort(key=lambda item: (-item['compressed'], item['texture']))
+                budget = budgets.get(quality)
+                rows.append({'scene': scene, 'tier': quality, 'platform': platform, 'format': fmt,
+                             'decoded': sum(item['decoded'] for item in listed),
+                             'compressed': sum(item['compressed'] for item in listed),
+                             'budget': budget * MB if budget is not None else None,
+                             'textures': listed, 'unbuilt': sorted(set(unbuilt))})
+    return rows
+
+def over_budget(row):
+    """该组合的压缩后占用是否超出预算"""
+    return row['budget'] is not None and row['compressed'] > row['budget']
+
+def print_report(rows, top=TOP_N):
+    """输出各场景/等级/平台的占用表，超出预算的组合列出最大的纹理"""
+    print(f"{'场景':<11}{'等级':<8}{'平台':<8}{'格式':<7}{'纹理':>5}{'解码':>10}{'压缩':>10}{'预算':>9}")
+    for row in rows:
+        budget = f"{row['budget'] / MB:.0f} MB" if row['budget'] is not None else '-'
+        mark = '❌' if over_budget(row) else '✅'
+        print(f"{row['scene']:<13}{row['tier']:<10}{row['platform']:<10}{row['format']:<9}"
+              f"{len(row['textures']):>5}{row['decoded'] / MB:>9.1f}M{row['compressed'] / MB:>9.1f}M"
+              f"{budget:>10} {mark}")
+    for row in rows:
+        if not over_budget(row):
+            continue
+        print(f"\n❌ {row['scene']} / {row['tier']} / {row['platform']}: "
+              f"{row['compressed'] / MB:.1f} MB 超出预算 {row['budget'] / MB:.0f} MB，占用最大的纹理:")
+        for item in row['textures'][:top]:
+            print(f"  {item['compressed'] / MB:>7.2f} MB  {item['width']}x{item['height']}"
+                  f"{' mip' if item['mipmaps'] else ''}  {item['texture']}（{len(item['assets'])} 个素材）")
+    unbuilt = sorted({path for row in rows for path in row['unbuilt']})
+    if unbuilt:
+        print(f"\n⚠️  {len(unbuilt)} 张预加载图片不在流水线产物中，未计入（如 {unbuilt[0]}）")
+
+def check(config, build_dir=BUILD_DIR, include_idle=False, top=TOP_N, scenes=None):
+    """计算并写出报告，全部组合都在预算内时返回 True"""
+    bundles, index = load_build(build_dir)
+    rows = analyze(config, bundles, index, include_idle, scenes)
+    print_report(rows, top)
+    report = []
+    for row in rows:
+        entry = {key: value for key, value in row.items() if key != 'textures'}
+        entry['over_budget'] = over_budget(row)
+        entry['top'] = [{key: item[key] for key in ('texture', 'width', 'height', 'mipmaps', 'decoded', 'compressed')}
+                        for item in row['textures'][:top]]
+        report.append(entry)
+    with open(Path(build_dir) / REPORT_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return not any(over_budget(row) for row in rows)
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='按场景/质量等级/平台估算纹理显存并检查预算')
+    parser.add_argument('--build', type=Path, default=BUILD_DIR, help='pipeline.py 的输出目录')
+    parser.add_argument('--include-idle', action='store_true', help='idle 预取的素材也计入常驻显存')
+    parser.add_argument('--top', type=int, default=TOP_N, help='超出预算时列出的纹理数')
+    parser.add_argument('--scene', action='append', help='只检查指定场景（可重复）')
+    args = parser.parse_args()
+
+    print("=== 纹理显存预算 ===")
+    ok = check(asset_graph.load_config(), args.build, args.include_idle, args.top, args.scene)
+    print(f"Created: {args.build / REPORT_FILE}")
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
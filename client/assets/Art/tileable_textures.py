@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+可平铺纹理生成
+天气特效（effects.weather）与钓鱼区的天空/远山/水面图层不再生成整张大图，
+改为生成小尺寸的环绕纹理，客户端以 REPEAT 方式平铺:
+  repeat     横纵均可平铺的小块（雨、雪、水面，256x256）
+  repeat-x   横向循环的视差条带（云、远山、光束，512x256），附视差系数
+
+噪声为周期值噪声：随机格点环绕填充后由 Pillow 整图双三次放大，格点数整除图像尺寸，
+放大结果在图像边界处首尾相接；多个频率加权叠加为分形噪声。
+点状元素（雨丝、雪花）在 3x3 的环绕位置各绘制一次，模糊也在环绕填充后进行。
+blend_edges 将任意图片（如手绘或 AI 生成的底图）边缘交叉淡化为可平铺纹理。
+
+平铺信息写入 Scenes/tiling.json 与流水线的 index.json；平铺纹理不打入图集（需要独立纹理才能 REPEAT 采样）。
+
+用法:
+  python tileable_textures.py                              # 生成全部平铺纹理并报告接缝误差
+  python tileable_textures.py --seamless 输入 输出 [--margin 32] [--repeat repeat-x]
+"""
+
+import json
+import os
+import random
+
+# 平铺纹理：素材名 -> 配置位置、渲染函数（即任务的 func）、尺寸、平铺方式与随机种子；视差条带附视差系数
+TILE_TEXTURES = {
+    'rain_drops': {'selector': 'effects.weather', 'render': 'render_rain', 'size': (256, 256),
+                   'repeat': 'repeat', 'seed': 11},
+    'snow_flakes': {'selector': 'effects.weather', 'render': 'render_snow', 'size': (256, 256),
+                    'repeat': 'repeat', 'seed': 12},
+    'sun_rays': {'selector': 'effects.weather', 'render': 'render_sun_rays', 'size': (512, 256),
+                 'repeat': 'repeat-x', 'seed': 13, 'parallax': 0.0},
+    'sky_clouds': {'selector': 'scenes.fishingArea.layers.background', 'render': 'render_clouds',
+                   'size': (512, 256), 'repeat': 'repeat-x', 'seed': 21, 'parallax': 0.1},
+    'distant_mountains': {'selector': 'scenes.fishingArea.layers.background', 'render': 'render_mountains',
+                          'size': (512, 256), 'repeat': 'repeat-x', 'seed': 22, 'parallax': 0.3},
+    'water_surface': {'selector': 'scenes.fishingArea.layers.water', 'render': 'render_water',
+                      'size': (256, 256), 'repeat': 'repeat', 'seed': 23},
+}
+
+# 替代的整图边长（用于报告节省的像素数）
+REPLACED_SIZE = 2048
+
+# 超采样倍数（雨丝、雪花放大绘制后按整块缩小，缩小不跨越平铺边界）
+SUPERSAMPLE = 2
+
+METADATA_PATH = 'Scenes/tiling.json'
+
+def art_relative(path):
+    """配置中的路径以 Art/ 开头，转为相对 Art 目录"""
+    return path[len('Art/'):] if path.startswith('Art/') else path
+
+def config_path(config, selector, name):
+    """配置节点中文件名为 <name>.png 的素材路径（相对 Art 目录），不存在时为 None"""
+    node = config
+    base = ''
+    for key in selector.split('.'):
+        if not isinstance(node, dict) or key not in node:
+            return None
+        base = node.get('basePath', base)
+        node = node[key]
+    files = node.values() if isinstance(node, dict) else node
+    filename = f'{name}.png'
+    return art_relative(base + filename) if filename in files else None
+
+def periodic_noise(width, height, cells_x, cells_y, seed):
+    """周期值噪声（L 模式），横纵均以图像尺寸为周期；格点数须整除对应尺寸"""
+    from PIL import Image
+    rng = random.Random(seed)
+    lattice = Image.frombytes('L', (cells_x, cells_y), bytes(rng.randrange(256) for _ in range(cells_x * cells_y)))
+    # 双三次插值只用到相邻 2 个格点，环绕填充 2 格后放大，再裁掉填充部分
+    pad = 2
+    tiles_x, tiles_y = 1 + 2 * -(-pad // cells_x), 1 + 2 * -(-pad // cells_y)
+    tiled = Image.new('L', (cells_x * tiles_x, cells_y * tiles_y))
+    for i in range(tiles_x):
+        for j in range(tiles_y):
+            tiled.paste(lattice, (i * cells_x, j * cells_y))
+    left, top = cells_x * (tiles_x // 2) - pad, cells_y * (tiles_y // 2) - pad
+    padded = tiled.crop((left, top, left + cells_x + pad * 2, top + cells_y + pad * 2))
+    cell_w, cell_h = width // cells_x, height // cells_y
+    scaled = padded.resize((padded.width * cell_w, padded.height * cell_h), Image.BICUBIC)
+    return scaled.crop((pad * cell_w, pad * cell_h, pad * cell_w + width, pad * cell_h + height))
+
+def fractal_noise(width, height, octaves, seed):
+    """多个频率的周期噪声加权平均并拉伸对比度；octaves 为 [(横向格点, 纵向格点, 权重)]"""
+    from PIL import Image, ImageOps
+    result = None
+    total = 0
+    for index, (cells_x, cells_y, weight) in enumerate(octaves):
+        layer = periodic_noise(width, height, cells_x, cells_y, seed * 31 + index)
+        total += weight
+        result = layer if result is None else Image.blend(result, layer, weight / total)
+    return ImageOps.autocontrast(result)
+
+def wrap_filter(img, image_filter):
+    """环绕填充后应用滤镜再裁回，平铺边界处无接缝"""
+    from PIL import Image
+    width, height = img.size
+    tiled = Image.new(img.mode, (width * 3, height * 3))
+    for i in range(3):
+        for j in range(3):
+            tiled.paste(img, (i * width, j * height))
+    return tiled.filter(image_filter).crop((width, height, width * 2, height * 2))
+
+def vertical_fade(width, height, top, bottom):
+    """自上而下从 top 线性过渡到 bottom 的 L 模式蒙版"""
+    from PIL import Image
+    column = bytes(round(top + (bottom - top) * y / max(1, height - 1)) for y in range(height))
+    return Image.frombytes('L', (1, height), column).resize((width, height))
+
+def draw_wrapped(width, height, color, shapes):
+    """在超采样画布上绘制元素，每个元素在 3x3 环绕位置各画一次，缩小后返回 RGBA"""
+    from PIL import Image, ImageDraw
+    scale = SUPERSAMPLE
+    # 透明像素取元素颜色，缩小与模糊时边缘不发暗
+    img = Image.new('RGBA', (width * scale, height * scale), (*color, 0))
+    draw = ImageDraw.Draw(img)
+    for kind, points, fill, line_width in shapes:
+        for dx in (-width, 0, width):
+            for dy in (-height, 0, height):
+                moved = [((x + dx) * scale, (y + dy) * scale) for x, y in points]
+                if kind == 'line':
+                    draw.line(moved, fill=fill, width=line_width * scale)
+                else:
+                    draw.ellipse(moved, fill=fill)
+    return img.reduce(scale)
+
+def render_rain(width, height, seed):
+    """斜向雨丝"""
+    rng = random.Random(seed)
+    color = (170, 200, 235)
+    shapes = []
+    for _ in range(width * height // 1100):
+        x, y = rng.uniform(0, width), rng.uniform(0, height)
+        length = rng.uniform(10, 22)
+        shapes.append(('line', [(x, y), (x - length * 0.25, y + length)], (*color, rng.randint(110, 170)), 1))
+    return draw_wrapped(width, height, color, shapes)
+
+def render_snow(width, height, seed):
+    """柔和的雪花"""
+    from PIL import ImageFilter
+    rng = random.Random(seed)
+    color = (255, 255, 255)
+    shapes = []
+    for _ in range(width * height // 900):
+        x, y, r = rng.uniform(0, width), rng.uniform(0, height), rng.uniform(1.5, 4)
+        shapes.append(('ellipse', [(x - r, y - r), (x + r, y + r)], (*color, rng.randint(170, 240)), 0))
+    return wrap_filter(draw_wrapped(width, height, color, shapes), ImageFilter.GaussianBlur(0.8))
+
+def render_sun_rays(width, height, seed):
+    """自上而下渐隐的光束（横向循环）"""
+    from PIL import Image, ImageChops
+    noise = fractal_noise(width, height, [(16, 2, 1.0), (32, 2, 0.4)], seed)
+    rays = noise.point(lambda v: max(0, v - 100) * 150 // 155)
+    img = Image.new('RGBA', (width, height), (255, 240, 190, 0))
+    img.putalpha(ImageChops.multiply(rays, vertical_fade(width, height, 255, 0)))
+    return img
+
+def render_clouds(width, height, seed):
+    """集中在上方的白云（横向循环）"""
+    from PIL import Image, ImageChops
+    noise = fractal_noise(width, height, [(4, 2, 1.0), (8, 4, 0.5), (16, 8, 0.25), (32, 16, 0.125)], seed)
+    clouds = noise.point(lambda v: min(255, max(0, (v - 110) * 2)))
+    img = Image.new('RGBA', (width, height), (255, 255, 255, 0))
+    img.putalpha(ImageChops.multiply(clouds, vertical_fade(width, height, 255, 60)))
+    return img
+
+def ridge_heights(width, seed, base, amplitude):
+    """周期分形噪声的一行作为山脊高度，首尾相接"""
+    row = fractal_noise(width, 2, [(4, 2, 1.0), (8, 2, 0.5), (16, 2, 0.25)], seed).tobytes()[:width]
+    return [base - (value / 255 - 0.5) * amplitude for value in row]
+
+def render_mountains(width, height, seed):
+    """远近两层山脊（横向循环）"""
+    from PIL import Image, ImageDraw
+    img = Image.new('RGBA', (width, height), (176, 196, 222, 0))
+    draw = ImageDraw.Draw(img)
+    for index, (base, amplitude, color) in enumerate([(0.45, 0.5, (176, 196, 222, 255)),
+                                                      (0.65, 0.35, (140, 164, 196, 255))]):
+        heights = ridge_heights(width, seed * 7 + index, base * height, amplitude * height)
+        # 最后一点落在 x=width 处、与 x=0 同高，保证首尾相接
+        points = [(x, y) for x, y in enumerate(heights)] + [(width, heights[0]), (width, height), (0, height)]
+        draw.polygon(points, fill=color)
+    return img
+
+def render_water(width, height, seed):
+    """水面波纹（横纵平铺）"""
+    from PIL import ImageOps
+    noise = fractal_noise(width, height, [(4, 4, 1.0), (8, 8, 0.5), (16, 16, 0.3), (32, 32, 0.15)], seed)
+    img = ImageOps.colorize(noise, (96, 170, 210), (205, 236, 250), mid=(140, 200, 230)).convert('RGBA')
+    img.putalpha(215)
+    return img
+
+def blend_edges(img, margin, repeat='repeat'):
+    """任意图片 -> 可平铺纹理：与错开半幅的副本在边缘 margin 像素内交叉淡化"""
+    from PIL import Image, ImageChops
+    img = img.convert('RGBA')
+    width, height = img.size
+    repeat_y = repeat == 'repeat'
+    shifted = ImageChops.offset(img, width // 2, height // 2 if repeat_y else 0)
+
+    def ramp(length):
+        return bytes(round(255 * min(1, (i + 0.5) / margin, (length - i - 0.5) / margin)) for i in range(length))
+
+    mask = Image.frombytes('L', (width, 1), ramp(width)).resize((width, height))
+    if repeat_y:
+        mask = ImageChops.multiply(mask, Image.frombytes('L', (1, height), ramp(height)).resize((width, height)))
+    # 中部保留原图，边缘取错开的副本（其边缘来自原图中部，首尾连续）
+    return Image.composite(img, shifted, mask)
+
+def seam_error(img, axis):
+    """平铺接缝处相邻像素的平均差值与图内全部相邻像素平均差值之比（约等于 1 即无可见接缝）"""
+    from PIL import ImageChops, ImageStat
+    img = img.convert('RGBA')
+    width, height = img.size
+    # 环绕平移 1 像素后与原图求差：第 0 列/行为接缝，其余为图内相邻像素
+    if axis == 'x':
+        diff = ImageChops.difference(img, ImageChops.offset(img, 1, 0))
+        seam, inner = diff.crop((0, 0, 1, height)), diff.crop((1, 0, width, height))
+    else:
+        diff = ImageChops.difference(img, ImageChops.offset(img, 0, 1))
+        seam, inner = diff.crop((0, 0, width, 1)), diff.crop((0, 1, width, height))
+    seam_diff = sum(ImageStat.Stat(seam).mean)
+    inner_diff = sum(ImageStat.Stat(inner).mean)
+    return seam_diff / inner_diff if inner_diff else (0.0 if seam_diff == 0 else float('inf'))
+
+def tiling_metadata(spec):
+    """客户端平铺信息"""
+    width, height = spec['size']
+    metadata = {'repeat': spec['repeat'], 'width': width, 'height': height}
+    if 'parallax' in spec:
+        metadata['parallax'] = spec['parallax']
+    return metadata
+
+def asset_jobs(config):
+    """配置中存在的平铺纹理任务（覆盖同路径的占位图）"""
+    jobs = []
+    for name, spec in TILE_TEXTURES.items():
+        path = config_path(config, spec['selector'], name)
+        if path is None:
+            continue
+        width, height = spec['size']
+        jobs.append({'path': path, 'category': 'tiles', 'name': name, 'size': max(width, height),
+                     'width': width, 'height': height, 'func': spec['render'],
+                     'args': (width, height, spec['seed']), 'tiling': tiling_metadata(spec),
+                     'overrides': True})
+    return jobs
+
+def build_metadata(config):
+    """全部平铺纹理的平铺信息 {路径: 信息}"""
+    return {job['path']: job['tiling'] for job in asset_jobs(config)}
+
+def main():
+    """主函数"""
+    import argparse
+    from PIL import Image
+    parser = argparse.ArgumentParser(description='生成可平铺的天气/水面/视差纹理')
+    parser.add_argument('--seamless', nargs=2, metavar=('输入', '输出'), help='将任意图片边缘淡化为可平铺纹理')
+    parser.add_argument('--margin', type=int, default=32, help='--seamless 的淡化宽度（像素）')
+    parser.add_argument('--repeat', choices=['repeat', 'repeat-x'], default='repeat', help='--seamless 的平铺方式')
+    args = parser.parse_args()
+
+    if args.seamless:
+        source, target = args.seamless
+        with Image.open(source) as img:
+            if args.margin * 2 > min(img.size):
+                raise SystemExit(f"淡化宽度 {args.margin} 超过图片短边的一半 {img.size}")
+            tile = blend_edges(img, args.margin, args.repeat)
+        tile.save(target)
+        print(f"Created: {target}（横向接缝 {seam_error(tile, 'x'):.2f}）")
+        return
+
+    print("=== 可平铺纹理生成 ===")
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    with open('art_config.json', 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    texels = 0
+    jobs = asset_jobs(config)
+    for job in jobs:
+        img = globals()[job['func']](*job['args'])
+        os.makedirs(os.path.dirname(job['path']), exist_ok=True)
+        img.save(job['path'])
+        texels += img.width * img.height
+        seams = f"横向接缝 {seam_error(img, 'x'):.2f}"
+        if job['tiling']['repeat'] == 'repeat':
+            seams += f"，纵向接缝 {seam_error(img, 'y'):.2f}"
+        print(f"Created: {job['path']} ({img.width}x{img.height}, {job['tiling']['repeat']}, {seams})")
+
+    with open(METADATA_PATH, 'w', encoding='utf-8') as f:
+        json.dump(build_metadata(config), f, ensure_ascii=False, indent=2, sort_keys=True)
+    print(f"Created: {METADATA_PATH}")
+    replaced = len(jobs) * REPLACED_SIZE * REPLACED_SIZE
+    print(f"平铺纹理共 {texels} 像素（{len(jobs)} 张 {REPLACED_SIZE}² 整图 {replaced} 像素，"
+          f"约 {replaced / max(1, texels):.0f} 分之一）")
+
+if __name__ == "__main__":
+    main()
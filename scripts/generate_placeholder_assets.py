@@ -1,12 +1,10 @@
 import json
 import re
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
 
-try:
-    from PIL import Image, ImageDraw, ImageFont  # type: ignore
-except ImportError:
-    raise SystemExit("Pillow 未安装，请先执行 `pip install pillow` 再运行本脚本。")
+if TYPE_CHECKING:
+    from PIL import Image  # type: ignore
 
 # 配置路径
 CLIENT_DIR = Path(__file__).resolve().parent.parent / "client" / "assets"
@@ -21,18 +19,32 @@ DEFAULT_SIZE = (256, 256)
 # 正则：尝试从文件名中提取尺寸，例如 gold_coin_128.png -> 128
 SIZE_PATTERN = re.compile(r"_(\d+)(?:x\d+)?\.[a-zA-Z]+$")
 
-# 使用系统自带字体（如果可用）
+def load_pil():
+    """按需导入 Pillow（仅渲染时需要），未安装时给出安装提示。"""
+    try:
+        from PIL import Image, ImageDraw, ImageFont  # type: ignore
+    except ImportError:
+        raise SystemExit("Pillow 未安装，请先执行 `pip install pillow` 再运行本脚本。")
+    return Image, ImageDraw, ImageFont
+
+
+# 使用系统自带字体（如果可用），常见 Linux 字体
+PLACEHOLDER_FONT = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
 
 def get_font(font_size: int = 24):
     """返回一个 PIL ImageFont 实例，如果系统字体不可用则使用默认字体。"""
+    _, _, ImageFont = load_pil()
     try:
-        # 常见 Linux 字体
-        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-        return ImageFont.truetype(font_path, font_size)
+        return ImageFont.truetype(PLACEHOLDER_FONT, font_size)
     except Exception:
         return ImageFont.load_default()
 
 
+def job_font(job: Dict[str, Any]) -> Optional[str]:
+    """占位图文字所用的字体文件（计入构建缓存键），不可用时为 None。"""
+    return PLACEHOLDER_FONT if Path(PLACEHOLDER_FONT).is_file() else None
+
+
 def extract_image_paths(config: Dict[str, Any], current_base: Path = Path("")) -> List[Path]:
     """递归遍历配置，提取所有图片相对路径。"""
     paths = []
@@ -78,14 +90,9 @@ def extract_image_paths(config: Dict[str, Any], current_base: Path = Path("")) -
     return paths
 
 
-def ensure_placeholder(img_path: Path):
-    """如果图片不存在，则创建占位图。"""
-    full_path = CLIENT_DIR / img_path
-    if full_path.exists():
-        return  # 已存在
-
-    # 确保目录存在
-    full_path.parent.mkdir(parents=True, exist_ok=True)
+def render_placeholder(img_path: Path) -> "Image.Image":
+    """在内存中绘制占位图：灰底 + 居中文件名，尺寸从文件名解析。"""
+    Image, ImageDraw, _ = load_pil()
 
     # 解析尺寸
     match = SIZE_PATTERN.search(img_path.name)
@@ -116,13 +123,56 @@ def ensure_placeholder(img_path: Path):
         fill=(0, 0, 0),
         font=font,
     )
+    return img
+
+
+def ensure_placeholder(img_path: Path, existing: Optional[Set[str]] = None):
+    """如果图片不存在，则创建占位图。existing 为已扫描的文件集合（相对 client/assets），
+    提供时不再逐个检查磁盘。"""
+    full_path = CLIENT_DIR / img_path
+    exists = img_path.as_posix() in existing if existing is not None else full_path.exists()
+    if exists:
+        return  # 已存在
+
+    # 确保目录存在
+    full_path.parent.mkdir(parents=True, exist_ok=True)
 
     # 保存
-    img.save(full_path)
+    render_placeholder(img_path).save(full_path)
     print(f"Created placeholder: {full_path.relative_to(Path.cwd())}")
 
 
+def asset_jobs(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """列出配置中的全部占位图任务，路径相对 Art 目录。"""
+    jobs = []
+    unique_paths = {p for p in extract_image_paths(config) if p.suffix.lower() in IMG_EXTS}
+    for rel_path in sorted(unique_paths):
+        match = SIZE_PATTERN.search(rel_path.name)
+        art_path = rel_path.relative_to("Art") if rel_path.parts[:1] == ("Art",) else rel_path
+        jobs.append({
+            "path": art_path.as_posix(),
+            "category": "placeholders",
+            # 素材名不含尺寸后缀，同一素材的各尺寸归为同一组（质量等级分包）
+            "name": rel_path.name[:match.start()] if match else rel_path.stem,
+            "size": int(match.group(1)) if match else DEFAULT_SIZE[0],
+            "func": "render_placeholder",
+            "args": (rel_path,),
+            "overwrite": False,
+        })
+    return jobs
+
+
 def main():
+    import argparse
+    import os
+    import sys
+
+    parser = argparse.ArgumentParser(description="为配置中缺失的图片生成占位图")
+    parser.add_argument("--cache", default=os.environ.get("CATCAFE_ASSET_CACHE"),
+                        help="构建缓存目录或 HTTP 地址（默认读取 CATCAFE_ASSET_CACHE）")
+    args = parser.parse_args()
+
+    load_pil()
     if not ART_CONFIG_PATH.exists():
         raise SystemExit(f"找不到配置文件: {ART_CONFIG_PATH}")
 
@@ -135,8 +185,22 @@ def main():
 
     print(f"共发现 {len(unique_paths)} 个图片资源，将为缺失的文件生成占位图像……")
 
+    # 缓存与对账模块位于 Art 目录
+    sys.path.insert(0, str(CLIENT_DIR / "Art"))
+    if args.cache:
+        import build_cache
+        from asset_sinks import FileSink
+
+        build_cache.build_with_cache(sys.modules[__name__], config, build_cache.open_cache(args.cache),
+                                     FileSink(CLIENT_DIR / "Art"))
+        print("占位图像生成完毕！")
+        return
+
+    # 一次扫描 Art 目录，代替逐个路径的 exists() 检查
+    import asset_index
+    existing = {f"Art/{path}" for path in asset_index.scan_tree()}
     for rel_path in sorted(unique_paths):
-        ensure_placeholder(rel_path)
+        ensure_placeholder(rel_path, existing)
 
     print("占位图像生成完毕！")
 